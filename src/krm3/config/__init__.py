@@ -84,6 +84,32 @@ DEFAULTS = dict(  # noqa: C408
     SOCIAL_AUTH_ALLOWED_REDIRECT_URIS=(list, ['http://localhost:3000/login', 'http://localhost:8000/login']),
     SOCIAL_AUTH_GOOGLE_OAUTH2_WHITELISTED_DOMAINS=(list, ['k-tech.it']),
     HOLIDAYS_CALENDAR=(str, 'IT-RM'),
+    EXTRA_HOLIDAYS_INDEX_TTL=(int, 300),
+    REPORT_CACHE=(str, 'reports'),
+    REPORT_CACHE_URL=(
+        str,
+        'dbcache://krm3_report_cache?max_entries=20000',
+        'The cache of the report outputs, shared by all the server processes',
+    ),
+    REPORT_CACHE_TIMEOUT=(int, 3600),
+    REPORT_FRAGMENT_CACHE=(str, 'report_fragments'),
+    REPORT_FRAGMENT_CACHE_URL=(
+        str,
+        'dbcache://krm3_report_fragment_cache?max_entries=50000',
+        'The cache of the HTML of the report blocks, shared by all the server processes',
+    ),
+    REPORT_CACHE_MAX_ITEMS=(int, 5000),
+    REPORT_STREAMING_DAYS=(int, 93),
+    REPORT_PROGRESSIVE_RENDERING=(bool, False),
+    EXPORT_JOB_WORKERS=(int, 2),
+    EXPORT_JOB_POLL_INTERVAL=(float, 5.0),
+    EXPORT_JOB_TIMEOUT=(int, 7200),
+    EXPORT_JOB_RETENTION_DAYS=(int, 7),
+    QUERY_STATS_SAMPLE_RATE=(float, 0.1),
+    QUERY_STATS_MAX_QUERIES=(int, 100),
+    QUERY_STATS_MAX_DB_TIME=(float, 1.0),
+    QUERY_STATS_MAX_DUPLICATES=(int, 20),
+    QUERY_STATS_MAX_WALL_TIME=(float, 5.0),
     DEFAULT_MODULE=(str, None),
     # Ticketing
     TICKETING_TOKEN=(str, None),
@@ -7,4 +7,5 @@ FLAGS = {
     'CONTACTS_ENABLED': [],
     'DDT_ENABLED': [('boolean', False)],
     'EVENTS_ENABLED': [('boolean', False)],
+    'QUERY_STATS_ENABLED': [('boolean', False)],
 }
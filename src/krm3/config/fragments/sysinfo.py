@@ -3,6 +3,7 @@ from django.conf import settings
 SYSINFO = {
     'extra': {
         'GIT': 'krm3.utils.sysinfo.get_commit_info',
+        'REPORT_CACHE': 'krm3.utils.sysinfo.get_report_cache_stats',
         'TICKETING_ENABLED': settings.TICKETING_ENABLED,
     },
     'masker': 'krm3.utils.sysinfo.masker',
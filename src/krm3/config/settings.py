@@ -124,6 +124,7 @@ MIDDLEWARE = (
         'django.middleware.common.CommonMiddleware',
         'django.middleware.csrf.CsrfViewMiddleware',
         'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'krm3.middlewares.query_stats.QueryStatsMiddleware',
         'django.contrib.messages.middleware.MessageMiddleware',
         'django.middleware.clickjacking.XFrameOptionsMiddleware',
     ]
@@ -185,6 +186,13 @@ DATABASES = {
 
 DATABASES['default']['OPTIONS'] = {'options': '-c search_path=django,public'}
 
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    # the database cache needs `createcachetable`, run by `upgrade`
+    'reports': env.cache_url('REPORT_CACHE_URL'),
+    'report_fragments': env.cache_url('REPORT_FRAGMENT_CACHE_URL'),
+}
+
 LANGUAGE_CODE = 'en-uk'
 
 LANGUAGES = [
@@ -272,6 +280,35 @@ if (_changelog := Path(krm3.__file__).parent / 'CHANGELOG.md').exists():
 else:
     CHANGELOG_PATH = Path(krm3.__file__).parents[2] / 'CHANGELOG.md'
 HOLIDAYS_CALENDAR = env('HOLIDAYS_CALENDAR')
+# seconds after which the in-memory extra holidays index is reloaded from the database
+EXTRA_HOLIDAYS_INDEX_TTL = env('EXTRA_HOLIDAYS_INDEX_TTL')
+# cache alias and seconds after which the cached report outputs and resource blocks HTML expire,
+# the alias must be shared by all the server processes, see `krm3.core.checks`
+REPORT_CACHE = env('REPORT_CACHE')
+REPORT_CACHE_TIMEOUT = env('REPORT_CACHE_TIMEOUT')
+# cache alias of the resource blocks HTML, one entry per resource and month: sized on its own
+# not to evict the report outputs
+REPORT_FRAGMENT_CACHE = env('REPORT_FRAGMENT_CACHE')
+# blocks or rows of a report sent as they are built kept in memory to cache it, longer reports are not cached
+REPORT_CACHE_MAX_ITEMS = env('REPORT_CACHE_MAX_ITEMS')
+# reports longer than these days load the data of one resource at a time, 0 to never do so
+REPORT_STREAMING_DAYS = env('REPORT_STREAMING_DAYS')
+# whether the report pages are sent to the browser one resource at a time, as they are built
+REPORT_PROGRESSIVE_RENDERING = env('REPORT_PROGRESSIVE_RENDERING')
+# worker processes and seconds between queue polls of `run_export_jobs`
+EXPORT_JOB_WORKERS = env('EXPORT_JOB_WORKERS')
+EXPORT_JOB_POLL_INTERVAL = env('EXPORT_JOB_POLL_INTERVAL')
+# seconds after which a running export job is taken as left behind by a stopped worker,
+# and days after which the finished export jobs and their files are deleted, 0 to keep them
+EXPORT_JOB_TIMEOUT = env('EXPORT_JOB_TIMEOUT')
+EXPORT_JOB_RETENTION_DAYS = env('EXPORT_JOB_RETENTION_DAYS')
+# fraction of the requests whose queries are measured while the QUERY_STATS_ENABLED flag is on,
+# and the queries, seconds in the database, repeats of a query and seconds in all over which they are logged
+QUERY_STATS_SAMPLE_RATE = env('QUERY_STATS_SAMPLE_RATE')
+QUERY_STATS_MAX_QUERIES = env('QUERY_STATS_MAX_QUERIES')
+QUERY_STATS_MAX_DB_TIME = env('QUERY_STATS_MAX_DB_TIME')
+QUERY_STATS_MAX_DUPLICATES = env('QUERY_STATS_MAX_DUPLICATES')
+QUERY_STATS_MAX_WALL_TIME = env('QUERY_STATS_MAX_WALL_TIME')
 
 # logging
 LOGGING = {
@@ -7,5 +7,6 @@ class AppConfig(BaseAppConfig):
     def ready(self) -> None:
         super().ready()
 
+        from . import checks as _  # noqa
         from . import djflags as _  # noqa
         from .api import serializers as _  # noqa
@@ -0,0 +1,30 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# cache backends keeping their entries in the memory of each process
+PROCESS_LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@register(Tags.caches)
+def check_report_cache(app_configs: Any, **kwargs: Any) -> list[Error]:
+    """Refuse a report cache each server process would keep to itself.
+
+    The model signals invalidate the cached reports in the process saving
+    the data only, the other processes would go on serving stale reports.
+    """
+    errors = []
+    for setting in ('REPORT_CACHE', 'REPORT_FRAGMENT_CACHE'):
+        alias = getattr(settings, setting)
+        if alias not in settings.CACHES:
+            errors.append(Error(f'{setting} is set to "{alias}", which is not in CACHES', id='krm3.E001'))
+        elif settings.CACHES[alias]['BACKEND'] in PROCESS_LOCAL_CACHES and not settings.DEBUG:
+            errors.append(
+                Error(
+                    f'The report cache "{alias}" is not shared by the server processes',
+                    hint=f'Set KRM3_{setting}_URL to a database or Redis cache',
+                    id='krm3.E002',
+                )
+            )
+    return errors
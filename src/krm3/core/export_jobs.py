@@ -0,0 +1,166 @@
+"""Exports running in the background, queued in the database.
+
+Exports too slow to run within an HTTP request are queued as
+`ExportJob`s and run by the `run_export_jobs` management command in a
+pool of worker processes. Jobs are claimed with `SELECT ... FOR UPDATE
+SKIP LOCKED`, so the queue needs no outside broker. The exported files
+are stored in the private media storage and downloaded through the
+media-auth views, until they are purged after
+`settings.EXPORT_JOB_RETENTION_DAYS`.
+
+A job whose worker process dies is failed, and the pool replaced. A job
+whose whole command stopped is claimed again once stale, see
+`ExportJobQuerySet.claim()`.
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING
+
+import django
+from django.conf import settings
+from django.utils import timezone, translation
+from django.utils.module_loading import import_string
+
+from krm3.core.models import ExportJob
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from concurrent.futures import Executor, Future
+
+type Progress = Callable[[int, int], None]
+type Exporter = Callable[[ExportJob, Progress], tuple[str, bytes]]
+"""Produce the file of a job, reporting the progress; return its name and content."""
+
+logger = logging.getLogger(__name__)
+
+EXPORTERS: dict[str, str] = {
+    ExportJob.Kind.REPORT: 'krm3.timesheet.report.payslip_report.export_report',
+    ExportJob.Kind.REIMBURSEMENT_EXPENSES: 'krm3.missions.exports.export_reimbursement_expenses',
+}
+
+
+def run(job_id: int) -> ExportJob.Status:
+    """Run a claimed job, storing its file or its error.
+
+    :param job_id: the id of the job
+    :return: the final status of the job.
+    """
+    try:
+        job = ExportJob.objects.select_related('user').get(pk=job_id)
+        exporter: Exporter = import_string(EXPORTERS[job.kind])
+        with translation.override(job.language):
+            filename, content = exporter(job, job.set_progress)
+        job.complete(filename, content)
+    except Exception as e:
+        logger.exception('Export job %s failed', job_id)
+        ExportJob.objects.filter(pk=job_id).fail(str(e) or type(e).__name__)
+        return ExportJob.Status.FAILED
+    return ExportJob.Status.DONE
+
+
+def serve(workers: int, *, once: bool = False, poll_interval: float = 5.0) -> int:
+    """Run the queued jobs in a pool of worker processes.
+
+    :param workers: the number of worker processes, 0 to run the jobs in
+      the current process
+    :param once: whether to return as soon as the queue is empty,
+      instead of waiting for more jobs
+    :param poll_interval: the seconds to wait before checking the queue
+      again when it is empty
+    :return: the number of jobs run.
+    """
+    if workers < 1:
+        return _serve_inline(once=once, poll_interval=poll_interval)
+
+    count = 0
+    pool = _new_pool(workers)
+    running: dict[Future, int] = {}
+    try:
+        while True:
+            while len(running) < workers and (job := ExportJob.objects.claim()) is not None:
+                try:
+                    future = pool.submit(run, job.pk)
+                except BrokenProcessPool:
+                    count += len(running)
+                    pool = _replace_broken_pool(pool, workers, [*running.values()])
+                    running.clear()
+                    future = pool.submit(run, job.pk)
+                running[future] = job.pk
+            if not running:
+                purge()
+                if once:
+                    return count
+                time.sleep(poll_interval)
+                continue
+            done, _pending = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            count += len(done)
+            if stopped := _collect(done, running):
+                count += len(running)
+                pool = _replace_broken_pool(pool, workers, [*stopped, *running.values()])
+                running.clear()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def purge() -> int:
+    """Delete the export jobs finished more than `settings.EXPORT_JOB_RETENTION_DAYS` ago, and their files.
+
+    :return: the number of jobs deleted.
+    """
+    if not settings.EXPORT_JOB_RETENTION_DAYS:
+        return 0
+    return ExportJob.objects.purge(timezone.now() - datetime.timedelta(days=settings.EXPORT_JOB_RETENTION_DAYS))
+
+
+def _new_pool(workers: int) -> Executor:
+    # NOTE: spawned rather than forked, so that workers do not share the
+    #       database connections of this process
+    context = multiprocessing.get_context('spawn')
+    return ProcessPoolExecutor(workers, mp_context=context, initializer=django.setup)
+
+
+def _collect(done: set[Future], running: dict[Future, int]) -> list[int]:
+    """Remove the jobs done from the running ones, and return those whose worker died."""
+    stopped = []
+    for future in done:
+        job_id = running.pop(future)
+        try:
+            future.result()
+        except BrokenProcessPool:
+            stopped.append(job_id)
+        except Exception as e:
+            # `run()` records its own failures, these come from the pool
+            logger.exception('Export job %s failed', job_id)
+            ExportJob.objects.filter(pk=job_id).fail(str(e) or type(e).__name__)
+    return stopped
+
+
+def _replace_broken_pool(pool: Executor, workers: int, job_ids: list[int]) -> Executor:
+    """Fail the jobs of a pool whose worker died, and return a new pool.
+
+    No job survives the death of a worker, and which job killed it cannot
+    be told.
+    """
+    logger.error('An export worker stopped abruptly, failing the jobs %s', job_ids)
+    ExportJob.objects.filter(pk__in=job_ids).fail('The export worker stopped abruptly')
+    pool.shutdown(wait=False, cancel_futures=True)
+    return _new_pool(workers)
+
+
+def _serve_inline(*, once: bool, poll_interval: float) -> int:
+    count = 0
+    while True:
+        while (job := ExportJob.objects.claim()) is not None:
+            run(job.pk)
+            count += 1
+        purge()
+        if once:
+            return count
+        time.sleep(poll_interval)
@@ -0,0 +1,217 @@
+"""In-memory index of the `ExtraHoliday`s.
+
+Extra holidays change rarely but are checked for every single day of
+timesheets and reports, so they are kept in a process-wide sorted
+interval index which is kept up to date by the `ExtraHoliday`
+post_save/post_delete signals once their transaction is committed.
+"""
+
+from __future__ import annotations
+
+import bisect
+import datetime
+import threading
+import time
+from typing import TYPE_CHECKING, NamedTuple
+
+from django.conf import settings
+from django.db import connection, transaction
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from krm3.core.models import ExtraHoliday
+
+
+class ExtraHolidayInterval(NamedTuple):
+    pk: int
+    lower: datetime.date
+    upper: datetime.date
+    """The day after the last day of the extra holiday."""
+    country_codes: tuple[str, ...]
+
+    def covers(self, date: datetime.date) -> bool:
+        return self.lower <= date < self.upper
+
+    def days(self) -> Iterable[datetime.date]:
+        """Iterate over the days of the extra holiday."""
+        for offset in range((self.upper - self.lower).days):
+            yield self.lower + datetime.timedelta(days=offset)
+
+
+class _Bucket:
+    """The intervals for a single country code, sorted by start date."""
+
+    def __init__(self, intervals: Iterable[ExtraHolidayInterval]) -> None:
+        self.intervals = sorted(intervals)
+        self.lowers = [i.lower for i in self.intervals]
+        # running maximum of the end dates, to stop scanning overlapping
+        # intervals as soon as none of the remaining ones can match
+        self.max_uppers = []
+        for interval in self.intervals:
+            self.max_uppers.append(max(interval.upper, self.max_uppers[-1]) if self.max_uppers else interval.upper)
+
+    def covers(self, date: datetime.date) -> bool:
+        idx = bisect.bisect_right(self.lowers, date) - 1
+        while idx >= 0 and self.max_uppers[idx] > date:
+            if self.intervals[idx].upper > date:
+                return True
+            idx -= 1
+        return False
+
+    def overlapping(self, start: datetime.date, end: datetime.date) -> list[ExtraHolidayInterval]:
+        """Return the intervals having at least one day in [start, end]."""
+        idx = bisect.bisect_right(self.lowers, end)
+        return [interval for interval in self.intervals[:idx] if interval.upper > start]
+
+
+def _short_code(country_calendar_code: str) -> str:
+    return country_calendar_code.split('-', maxsplit=1)[0]
+
+
+class ExtraHolidayIndex:
+    """Sorted interval index of all the `ExtraHoliday`s, bucketed by country code.
+
+    The index is loaded lazily, updated incrementally through `update()`
+    and `discard()`, and reloaded from the database once it is older than
+    `settings.EXTRA_HOLIDAYS_INDEX_TTL` seconds, so that changes made by
+    other processes are eventually picked up.
+
+    An index loaded inside a transaction may hold its uncommitted changes,
+    so it is reloaded unless that transaction is committed.
+    """
+
+    def __init__(self) -> None:
+        self._intervals: dict[int, ExtraHolidayInterval] | None = None
+        self._buckets: dict[str, _Bucket] = {}
+        self._loaded_at = 0.0
+        self._loaded_in: transaction.Atomic | None = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _outermost_atomic() -> transaction.Atomic | None:
+        return connection.atomic_blocks[0] if connection.in_atomic_block else None
+
+    def _is_fresh(self) -> bool:
+        if self._intervals is None:
+            return False
+        if self._loaded_in is not None and self._loaded_in is not self._outermost_atomic():
+            # loaded inside a transaction which ended without committing
+            return False
+        ttl = getattr(settings, 'EXTRA_HOLIDAYS_INDEX_TTL', None)
+        return ttl is None or time.monotonic() - self._loaded_at < ttl
+
+    def _ensure_loaded(self) -> None:
+        if self._is_fresh():
+            return
+        from krm3.core.models import ExtraHoliday  # noqa: PLC0415
+
+        self._intervals = {
+            pk: ExtraHolidayInterval(pk, period.lower, period.upper, tuple(codes))
+            for pk, period, codes in ExtraHoliday.objects.values_list('pk', 'period', 'country_codes')
+        }
+        self._loaded_at = time.monotonic()
+        self._loaded_in = loaded_in = self._outermost_atomic()
+        self._buckets = {}
+        self._rebuild(self._all_codes())
+        if loaded_in is not None:
+            transaction.on_commit(lambda: self._committed(loaded_in))
+
+    def _committed(self, loaded_in: transaction.Atomic) -> None:
+        with self._lock:
+            if self._loaded_in is loaded_in:
+                self._loaded_in = None
+
+    def _all_codes(self) -> set[str]:
+        return {code for interval in self._intervals.values() for code in interval.country_codes}
+
+    def _rebuild(self, codes: Iterable[str]) -> None:
+        """Rebuild the buckets of the given country codes only."""
+        for code in codes:
+            intervals = [interval for interval in self._intervals.values() if code in interval.country_codes]
+            if intervals:
+                self._buckets[code] = _Bucket(intervals)
+            else:
+                self._buckets.pop(code, None)
+
+    def update(self, extra_holiday: ExtraHoliday) -> None:
+        """Add or replace a committed `ExtraHoliday` in the index."""
+        with self._lock:
+            if self._intervals is None:
+                return
+            period = extra_holiday.period
+            lower, upper = (period[0], period[1]) if isinstance(period, list | tuple) else (period.lower, period.upper)
+            interval = ExtraHolidayInterval(extra_holiday.pk, lower, upper, tuple(extra_holiday.country_codes))
+            previous = self._intervals.get(interval.pk)
+            self._intervals[interval.pk] = interval
+            self._rebuild({*interval.country_codes, *(previous.country_codes if previous else ())})
+
+    def discard(self, pk: int) -> None:
+        """Remove a deleted `ExtraHoliday` from the index, once the deletion is committed."""
+        with self._lock:
+            if self._intervals is None:
+                return
+            if previous := self._intervals.pop(pk, None):
+                self._rebuild(previous.country_codes)
+
+    def clear(self) -> None:
+        """Drop the index, it will be reloaded on the next lookup."""
+        with self._lock:
+            self._intervals = None
+            self._loaded_in = None
+            self._buckets = {}
+
+    def _codes_for(self, country_calendar_code: str, include_country: bool) -> set[str]:
+        codes = {country_calendar_code}
+        if include_country:
+            codes.add(_short_code(country_calendar_code))
+        return codes
+
+    def is_extra_holiday(self, date: datetime.date, country_calendar_code: str, include_country: bool = False) -> bool:
+        """Check whether the date is an extra holiday for the country calendar code.
+
+        :param date: the date to check
+        :param country_calendar_code: the country calendar code, e.g. `IT-RM`
+        :param include_country: also consider the extra holidays of the
+          whole country (e.g. `IT` for `IT-RM`)
+        :return: `True` if the date is an extra holiday, `False` otherwise.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return any(
+                (bucket := self._buckets.get(code)) is not None and bucket.covers(date)
+                for code in self._codes_for(country_calendar_code, include_country)
+            )
+
+    def between(
+        self,
+        start: datetime.date,
+        end: datetime.date,
+        country_codes: Iterable[str] | None = None,
+        include_country: bool = False,
+    ) -> list[ExtraHolidayInterval]:
+        """Return the extra holidays having at least one day in [start, end].
+
+        :param start: the start of the interval (inclusive)
+        :param end: the end of the interval (inclusive)
+        :param country_codes: only return extra holidays for these codes, all if `None`
+        :param include_country: also consider the extra holidays of the
+          whole country of each of the `country_codes`
+        :return: the matching extra holidays, sorted by start date.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if country_codes is None:
+                codes = set(self._buckets)
+            else:
+                codes = set().union(*(self._codes_for(code, include_country) for code in country_codes))
+            found = {
+                interval.pk: interval
+                for code in codes
+                if (bucket := self._buckets.get(code)) is not None
+                for interval in bucket.overlapping(start, end)
+            }
+        return sorted(found.values())
+
+
+extra_holiday_index = ExtraHolidayIndex()
@@ -6,7 +6,12 @@ All endpoints require authentication. Permission checks will be added in future
 
 from django.urls import path
 
-from krm3.core.media_views import serve_contract_document, serve_document_file, serve_expense_image
+from krm3.core.media_views import (
+    serve_contract_document,
+    serve_document_file,
+    serve_expense_image,
+    serve_export_file,
+)
 
 app_name = 'media-auth'
 
@@ -14,4 +19,5 @@ urlpatterns = [
     path('expenses/<int:expense_id>/', serve_expense_image, name='expense-image'),
     path('contracts/<int:contract_id>/', serve_contract_document, name='contract-document'),
     path('documents/<int:document_id>/', serve_document_file, name='document-file'),
+    path('exports/<int:job_id>/', serve_export_file, name='export-file'),
 ]
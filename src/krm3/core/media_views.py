@@ -24,7 +24,7 @@ from django.http import Http404, HttpResponse
 
 from krm3.core.models.documents import ProtectedDocument as Document
 
-from krm3.core.models import Contract, Expense
+from krm3.core.models import Contract, ExportJob, Expense
 
 if TYPE_CHECKING:
     from django.db.models import Model
@@ -184,3 +184,25 @@ def serve_document_file(request: HttpRequest, document_id: int) -> HttpResponse:
     """
     doc = _get_object_with_permission_check(Document, document_id, request.user)
     return _serve_protected_file(doc.document, request)
+
+
+@login_required
+def serve_export_file(request: HttpRequest, job_id: int) -> HttpResponse:
+    """Serve the file produced by an export job via nginx X-Accel-Redirect.
+
+    URL: /media-auth/exports/<job_id>/
+
+    Args:
+        request: The HTTP request
+        job_id: The ID of the ExportJob record
+
+    Returns:
+        HttpResponse with X-Accel-Redirect header pointing to the file
+
+    Raises:
+        Http404: If job not found or not done yet
+        PermissionDenied: If the job was queued by another user
+
+    """
+    job = _get_object_with_permission_check(ExportJob, job_id, request.user)
+    return _serve_protected_file(job.file, request)
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.11 on 2026-10-17 00:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncMonth
+
+
+def forward(apps, schema_editor) -> None:  # noqa: ANN001
+    BankHoursCheckpoint = apps.get_model('core', 'BankHoursCheckpoint')  # noqa: N806
+    TimeEntry = apps.get_model('core', 'TimeEntry')  # noqa: N806
+
+    rows = (
+        TimeEntry.objects.filter(Q(bank_to__gt=0) | Q(bank_from__gt=0))
+        .annotate(month=TruncMonth('date'))
+        .values('resource_id', 'month')
+        .annotate(deposits=Sum('bank_to'), withdrawals=Sum('bank_from'))
+    )
+    BankHoursCheckpoint.objects.bulk_create(BankHoursCheckpoint(**row) for row in rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_contact_title_alter_contact_job_title_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankHoursCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('deposits', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('withdrawals', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.resource')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('resource', 'month'), name='unique_bank_hours_checkpoint')],
+            },
+        ),
+        migrations.RunPython(forward, migrations.RunPython.noop),
+    ]
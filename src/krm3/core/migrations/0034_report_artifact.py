@@ -0,0 +1,27 @@
+# Generated by Django 5.2.11 on 2026-10-17 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_bank_hours_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('report', 'Report'), ('task_report', 'Report by task'), ('report_export', 'Report export')], max_length=20)),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('scope', models.CharField(help_text='The resources, language and filters of the report', max_length=255)),
+                ('content', models.BinaryField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'month', 'scope'), name='unique_report_artifact')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.11 on 2026-10-17 03:41
+
+import django.db.models.deletion
+import krm3.core.storage
+import krm3.missions.media
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0034_report_artifact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('report', 'Report export'), ('reimbursement_expenses', 'Reimbursement expenses export')], max_length=30)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('language', models.CharField(help_text='The language the export is written in', max_length=10)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('progress', models.PositiveSmallIntegerField(default=0, help_text='Percentage of the export done')),
+                ('file', models.FileField(blank=True, null=True, storage=krm3.core.storage.PrivateMediaStorage(), upload_to=krm3.missions.media.export_directory_path)),
+                ('error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('started', models.DateTimeField(blank=True, null=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created'], name='export_job_queue')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-17 09:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0035_export_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportartifact',
+            name='scope',
+            field=models.CharField(help_text='The format version and the digest of the resources, language and filters', max_length=255),
+        ),
+    ]
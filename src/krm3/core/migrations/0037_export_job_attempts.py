@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-17 10:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0036_report_artifact_scope_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='The times the job was claimed'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def forward(apps, schema_editor) -> None:  # noqa: ANN001
+    # NOTE: the stored outputs pickle the report rows and days, whose
+    #       layout changed: they are rebuilt on the next request
+    ReportArtifact = apps.get_model('core', 'ReportArtifact')  # noqa: N806
+    ReportArtifact.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0037_export_job_attempts'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, migrations.RunPython.noop),
+    ]
@@ -2,12 +2,11 @@ from __future__ import annotations
 
 import datetime
 import json
-from decimal import Decimal
-from typing import Any, Self, TYPE_CHECKING
+from collections import defaultdict
+from typing import Any, Iterable, Self, TYPE_CHECKING
 
 from django.contrib.auth.base_user import BaseUserManager
 from django.core.exceptions import ValidationError
-from django.db.models import Sum
 from natural_keys import NaturalKeyModel
 from django.db import models
 from django.db.models.signals import post_save
@@ -21,6 +20,8 @@ from constance import config
 
 if TYPE_CHECKING:
     from datetime import date
+    from decimal import Decimal
+
     from krm3.core.models import Contract
 
 
@@ -100,6 +101,45 @@ class UserProfile(NaturalKeyModel):
         return cls.objects.create(user=user)
 
 
+class ResourceManager(models.Manager):
+    """Custom Manager for Resource with utility methods."""
+
+    def schedules(
+        self, resources: Iterable[Resource | int], start_day: date, end_day: date
+    ) -> dict[int, dict[date, float]]:
+        """Return the scheduled working hours of many resources at once.
+
+        Gives the same values as `Resource.get_schedule()`, but fetches
+        the contracts of all the `resources` in a single query.
+
+        :param resources: the resources, or their ids
+        :param start_day: the first day (inclusive)
+        :param end_day: the last day (inclusive)
+        :return: the scheduled hours by day, by resource id.
+        """
+        from krm3.core.models import Contract  # noqa: PLC0415
+
+        resource_ids = [getattr(resource, 'pk', resource) for resource in resources]
+        contracts_by_resource = defaultdict(list)
+        for contract in Contract.objects.filter(resource_id__in=resource_ids).active_between(start_day, end_day):
+            contracts_by_resource[contract.resource_id].append((contract, *contract.period_as_tuple()))
+
+        default_schedule = json.loads(config.DEFAULT_RESOURCE_SCHEDULE)
+        days = list(KrmCalendar().iter_dates(start_day, end_day))
+        result = {}
+        for resource_id in resource_ids:
+            contracts = contracts_by_resource[resource_id]
+            result[resource_id] = {
+                day.date: Resource._get_min_working_hours(
+                    next((contract for contract, lower, upper in contracts if lower <= day.date < upper), None),
+                    day,
+                    default_schedule,
+                )
+                for day in days
+            }
+        return result
+
+
 class Resource(models.Model):
     """A person, e.g. an employee or external contractor."""
 
@@ -113,6 +153,8 @@ class Resource(models.Model):
     fiscal_code = models.CharField(max_length=25, null=True, blank=True, unique=True)
     preferred_language = models.CharField(choices=settings.LANGUAGES, default=settings.LANGUAGE_CODE)
 
+    objects: ResourceManager = ResourceManager()
+
     class Meta:
         ordering = ['last_name', 'first_name']
 
@@ -157,15 +199,15 @@ class Resource(models.Model):
 
         :return: scheduled number of hours.
         """
-        from krm3.core.models import Contract  # noqa: PLC0415
+        return Resource.objects.schedules([self], day.date, day.date)[self.pk][day.date]
 
-        contract = Contract.objects.filter(resource=self, period__contains=day.date).first()
-        return self._get_min_working_hours(contract, day)
-
-    def _get_min_working_hours(self, contract: Contract | None, day: KrmDay) -> float:
+    @staticmethod
+    def _get_min_working_hours(contract: Contract | None, day: KrmDay, default_schedule: dict | None = None) -> float:
         """Return the minimum working hours for a given day."""
         if contract and contract.working_schedule:
             schedule = contract.working_schedule
+        elif default_schedule is not None:
+            schedule = default_schedule
         else:
             schedule = json.loads(config.DEFAULT_RESOURCE_SCHEDULE)
         if contract and contract.country_calendar_code:
@@ -227,25 +269,17 @@ class Resource(models.Model):
         return None
 
     def get_schedule(self, start_day: date, end_day: date) -> dict[date, float]:
-        calendar = KrmCalendar()
-        days = list(calendar.iter_dates(start_day, end_day))
+        return Resource.objects.schedules([self], start_day, end_day)[self.pk]
 
-        for day in days:
-            day.min_working_hours = self.scheduled_working_hours_for_day(day)
+    def get_bank_hours_balance(self, as_of: date | None = None) -> Decimal:
+        """Return the bank hours balance from the bank hours ledger.
 
-        return {day.date: day.min_working_hours for day in days}
-
-    def get_bank_hours_balance(self) -> Decimal:
-        """Calculate bank hours balance from all time entries."""
-        from krm3.core.models import TimeEntry  # noqa: PLC0415
-
-        queryset = TimeEntry.objects.filter(resource=self)
-        result = queryset.aggregate(total_deposits=Sum('bank_to'), total_withdrawals=Sum('bank_from'))
-
-        deposits = result['total_deposits'] or Decimal(0)
-        withdrawals = result['total_withdrawals'] or Decimal(0)
+        :param as_of: the last day (inclusive) to count transactions up to, `None` to count all of them
+        :return: the deposited minus the withdrawn hours.
+        """
+        from krm3.core.models import BankHoursCheckpoint  # noqa: PLC0415
 
-        return deposits - withdrawals
+        return BankHoursCheckpoint.objects.balance(self, as_of)
 
 
 @receiver(post_save, sender=User)
@@ -1,7 +1,7 @@
 import datetime
 import json
 from decimal import Decimal
-from typing import TYPE_CHECKING, Self
+from typing import TYPE_CHECKING, Any, Self
 
 from constance import config as constance_config
 from django.contrib.postgres.constraints import ExclusionConstraint
@@ -9,17 +9,21 @@ from django.contrib.postgres.fields import DateRangeField, RangeOperators
 from django.core.exceptions import ValidationError
 from django.core.validators import FileExtensionValidator
 from django.db import models
+from django.dispatch import receiver
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
 from krm3.config import settings
+from krm3.core.report_cache import report_cache
 from krm3.core.storage import PrivateMediaStorage
 from krm3.missions.media import contract_directory_path
 from krm3.timesheet.rules import Krm3Day
 from krm3.utils.dates import DATE_INFINITE, KrmDay, get_country_holidays
 
 if TYPE_CHECKING:
-    from krm3.core.models import Contract, Task, Resource
+    from collections.abc import Iterable
+
+    from krm3.core.models import Contract, Task, TimeEntry, Resource
     from krm3.core.models.auth import User
 
 
@@ -183,19 +187,31 @@ class Contract(models.Model):
                 ret.append(task)
         return ret
 
-    def get_due_hours(self, day: datetime.date | KrmDay) -> Decimal:
+    def get_due_hours(self, day: datetime.date | KrmDay, default_schedule: dict | None = None) -> Decimal:
         day = KrmDay(day)
         if not self.falls_in(day):
             raise RuntimeError(_('Unable to get due hours: date outside contract period'))
         if self.is_holiday(day):
             return Decimal(0)
-        schedule = self.working_schedule.get(day.day_of_week_short.casefold(), self.get_default_schedule(day))
+        day_of_week = day.day_of_week_short.casefold()
+        if day_of_week in self.working_schedule:
+            schedule = self.working_schedule[day_of_week]
+        else:
+            schedule = self.get_default_schedule(day, default_schedule)
         return Decimal(schedule)
 
     @classmethod
-    def get_default_schedule(cls, day: datetime.date | KrmDay) -> Decimal:
+    def get_default_schedule(cls, day: datetime.date | KrmDay, default_schedule: dict | None = None) -> Decimal:
+        """Return the hours due on the given day according to the default resource schedule.
+
+        :param day: the day
+        :param default_schedule: the already parsed `DEFAULT_RESOURCE_SCHEDULE`, if available
+        :return: the due hours.
+        """
+        if default_schedule is None:
+            default_schedule = json.loads(constance_config.DEFAULT_RESOURCE_SCHEDULE)
         day_of_week = KrmDay(day).day_of_week_short.casefold()
-        return json.loads(constance_config.DEFAULT_RESOURCE_SCHEDULE).get(day_of_week, 0)
+        return default_schedule.get(day_of_week, 0)
 
     @property
     def document_url(self) -> str | None:
@@ -204,16 +220,34 @@ class Contract(models.Model):
             return reverse('media-auth:contract-document', args=[self.pk])
         return None
 
-    def get_remaining_due_hours(self, day: datetime.date, task_id: int | None = None) -> Decimal:
-        """Calculate the difference between expected scheduled hours and hours logged thus far."""
+    def get_remaining_due_hours(
+        self,
+        day: datetime.date,
+        task_id: int | None = None,
+        time_entries: 'Iterable[TimeEntry] | None' = None,
+        default_schedule: dict | None = None,
+    ) -> Decimal:
+        """Calculate the difference between expected scheduled hours and hours logged thus far.
+
+        :param day: the day
+        :param task_id: the task being autofilled, whose day shift hours are not counted
+        :param time_entries: the time entries already logged on the day, if available
+        :param default_schedule: the already parsed `DEFAULT_RESOURCE_SCHEDULE`, if available
+        :return: the remaining hours.
+        """
         from krm3.core.models import TimeEntry  # noqa: PLC0415
 
         day_of_week = day.strftime('%a').casefold()
-        schedule = Decimal(self.working_schedule.get(day_of_week, self.get_default_schedule(day)))
-
-        time_entries = TimeEntry.objects.filter(resource=self.resource, date=day)
+        if day_of_week in self.working_schedule:
+            schedule = Decimal(self.working_schedule[day_of_week])
+        else:
+            schedule = Decimal(self.get_default_schedule(day, default_schedule))
+
+        if time_entries is None:
+            time_entries = TimeEntry.objects.filter(resource=self.resource, date=day)
+        time_entries = list(time_entries)
         # These are task_entries for task which is being autofilled
-        task_entries = time_entries.task_entries().filter(task_id=task_id)
+        task_entries = [entry for entry in time_entries if entry.task_id == task_id and entry.logs_task_hours_only]
 
         total_logged_hours = sum(entry.total_hours for entry in time_entries) - sum(
             entry.day_shift_hours for entry in task_entries
@@ -224,3 +258,38 @@ class Contract(models.Model):
     def fetch(self, resource: 'Resource', day: Krm3Day | datetime.date) -> 'Contract':
         """Fetch the contract from the resource and day."""
         return Contract.objects.get(resource=resource, period__in=day.date if isinstance(day, KrmDay) else day)
+
+
+@receiver(models.signals.post_save, sender=Contract)
+@receiver(models.signals.post_delete, sender=Contract)
+def invalidate_contract_reports(sender: Contract, instance: Contract, **kwargs: Any) -> None:
+    report_cache.invalidate(instance.resource_id)
+
+
+@receiver(models.signals.pre_save, sender=Contract)
+def discard_previous_period_report_artifacts(sender: Contract, instance: Contract, **kwargs: Any) -> None:
+    if instance.pk is None:
+        return
+    if (period := Contract.objects.filter(pk=instance.pk).values_list('period', flat=True).first()) is not None:
+        _discard_report_artifacts(period)
+
+
+@receiver(models.signals.post_save, sender=Contract)
+@receiver(models.signals.post_delete, sender=Contract)
+def discard_contract_report_artifacts(sender: Contract, instance: Contract, **kwargs: Any) -> None:
+    _discard_report_artifacts(instance.period)
+
+
+def _discard_report_artifacts(period: Any) -> None:
+    """Delete the artifacts of the months overlapping a contract period.
+
+    The contract decides whether the resource appears in the reports, and
+    their schedule, so the closed months it spans may no longer match.
+    """
+    from krm3.core.models import ReportArtifact  # noqa: PLC0415
+
+    if isinstance(period, (list | tuple)):
+        lower, upper = period[0], period[1]
+    else:
+        lower, upper = period.lower, period.upper
+    ReportArtifact.objects.discard(KrmDay(lower).date, DATE_INFINITE if upper is None else KrmDay(upper).date)
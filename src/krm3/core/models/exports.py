@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import datetime
+from functools import partial
+from typing import TYPE_CHECKING, Any, Self
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import models, transaction
+from django.db.models import Q
+from django.dispatch import receiver
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import get_language
+from django.utils.translation import gettext_lazy as _
+
+from krm3.core.storage import PrivateMediaStorage
+from krm3.missions.media import export_directory_path
+
+if TYPE_CHECKING:
+    from krm3.core.models.auth import User
+
+# runs of a job left behind by a stopped worker, before it is failed
+MAX_ATTEMPTS = 2
+
+
+class ExportJobQuerySet(models.QuerySet['ExportJob']):
+    def accessible_by(self, user: User) -> Self:
+        """Return the jobs whose output the user may download, i.e. the ones they queued."""
+        return self.filter(user=user)
+
+    def enqueue(self, user: User, kind: str, **params: Any) -> ExportJob:
+        """Queue an export, to be run by the `run_export_jobs` management command.
+
+        :param user: the user requesting the export
+        :param kind: the kind of export, see `ExportJob.Kind`
+        :param params: the parameters of the export, must be serializable to JSON
+        :return: the queued job.
+        """
+        return self.create(user=user, kind=kind, params=params, language=get_language() or settings.LANGUAGE_CODE)
+
+    def claim(self) -> ExportJob | None:
+        """Mark the oldest queued job as running and return it.
+
+        Queued jobs locked by other workers are skipped, so that several
+        workers can share the queue without claiming the same job.
+
+        A job still running `settings.EXPORT_JOB_TIMEOUT` seconds after it
+        started was left behind by a worker that stopped, e.g. on a
+        restart: it is claimed again, unless it already ran `MAX_ATTEMPTS`
+        times, in which case it is failed.
+
+        :return: the claimed job, `None` if no job is queued.
+        """
+        now = timezone.now()
+        stale = Q(
+            status=ExportJob.Status.RUNNING, started__lt=now - datetime.timedelta(seconds=settings.EXPORT_JOB_TIMEOUT)
+        )
+        with transaction.atomic():
+            self.filter(stale, attempts__gte=MAX_ATTEMPTS).fail('The export did not finish in time')
+            job = (
+                self.select_for_update(skip_locked=True)
+                .filter(Q(status=ExportJob.Status.QUEUED) | stale)
+                .order_by('created', 'pk')
+                .first()
+            )
+            if job is not None:
+                job.status = ExportJob.Status.RUNNING
+                job.started = now
+                job.attempts += 1
+                job.save(update_fields=['status', 'started', 'attempts'])
+        return job
+
+    def fail(self, error: str) -> int:
+        """Mark the running jobs as failed.
+
+        :param error: the reason of the failure
+        :return: the number of jobs failed.
+        """
+        return self.filter(status=ExportJob.Status.RUNNING).update(
+            status=ExportJob.Status.FAILED, error=error, finished=timezone.now()
+        )
+
+    def purge(self, before: datetime.datetime) -> int:
+        """Delete the jobs finished before a time, and their files.
+
+        :param before: the time the jobs must have finished before
+        :return: the number of jobs deleted.
+        """
+        deleted, _by_model = self.filter(finished__lt=before).delete()
+        return deleted
+
+
+class ExportJob(models.Model):
+    """An export running in the background, see `krm3.core.export_jobs`."""
+
+    class Kind(models.TextChoices):
+        REPORT = 'report', _('Report export')
+        REIMBURSEMENT_EXPENSES = 'reimbursement_expenses', _('Reimbursement expenses export')
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', _('Queued')
+        RUNNING = 'running', _('Running')
+        DONE = 'done', _('Done')
+        FAILED = 'failed', _('Failed')
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='export_jobs')
+    kind = models.CharField(max_length=30, choices=Kind)
+    params = models.JSONField(default=dict, blank=True)
+    language = models.CharField(max_length=10, help_text=_('The language the export is written in'))
+    status = models.CharField(max_length=10, choices=Status, default=Status.QUEUED)
+    progress = models.PositiveSmallIntegerField(default=0, help_text=_('Percentage of the export done'))
+    file = models.FileField(upload_to=export_directory_path, storage=PrivateMediaStorage(), null=True, blank=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0, help_text=_('The times the job was claimed'))
+
+    objects = ExportJobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=('status', 'created'), name='export_job_queue')]
+
+    def __str__(self) -> str:
+        return f'{self.get_kind_display()} #{self.pk} ({self.get_status_display()})'
+
+    @property
+    def file_url(self) -> str | None:
+        """Return the authenticated URL for the exported file, once the job is done."""
+        if self.file:
+            return reverse('media-auth:export-file', args=[self.pk])
+        return None
+
+    def set_progress(self, done: int, total: int) -> None:
+        """Record the progress of a running job, if it changed.
+
+        :param done: the units of work done so far
+        :param total: the units of work of the whole export
+        """
+        progress = min(100, done * 100 // total) if total else 0
+        if progress != self.progress:
+            self.progress = progress
+            type(self).objects.filter(pk=self.pk).update(progress=progress)
+
+    def complete(self, filename: str, content: bytes) -> None:
+        """Store the exported file and mark the job as done."""
+        self.file.save(filename, ContentFile(content), save=False)
+        self.status = self.Status.DONE
+        self.progress = 100
+        self.finished = timezone.now()
+        self.save(update_fields=['file', 'status', 'progress', 'finished'])
+
+
+@receiver(models.signals.post_delete, sender=ExportJob)
+def delete_export_file(sender: type[ExportJob], instance: ExportJob, **kwargs: Any) -> None:
+    if instance.file:
+        transaction.on_commit(partial(instance.file.storage.delete, instance.file.name))
@@ -1,11 +1,14 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Self, override, Iterable
+from typing import TYPE_CHECKING, Any, Self, override, Iterable
 
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from natural_keys import NaturalKeyModel, NaturalKeyModelManager
 
+from krm3.core.report_cache import report_cache
+
 from .auth import Resource
 from .contacts import Client
 from .timesheets import TimeEntry
@@ -259,3 +262,9 @@ class Task(models.Model):
             )
 
         return super().clean()
+
+
+@receiver(models.signals.post_save, sender=Task)
+@receiver(models.signals.post_delete, sender=Task)
+def invalidate_task_reports(sender: Task, instance: Task, **kwargs: Any) -> None:
+    report_cache.invalidate(instance.resource_id)
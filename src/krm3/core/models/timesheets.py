@@ -1,19 +1,28 @@
 from __future__ import annotations
 
+import copy
 import datetime
+import json
+from collections import defaultdict
 from decimal import Decimal
+from functools import cached_property, partial
 from textwrap import shorten
-from typing import TYPE_CHECKING, Any, Iterable, Self, cast, override
+from typing import TYPE_CHECKING, Any, Collection, Iterable, Iterator, Mapping, NamedTuple, Self, override
 
 from constance import config
+from constance.utils import get_values_for_keys
 from django.contrib.postgres.constraints import ExclusionConstraint
 from django.contrib.postgres.fields import ArrayField, DateRangeField, RangeOperators
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import Q, QuerySet
+from django.db import models, transaction
+from django.db.models import F, Q, QuerySet, Sum
+from django.db.models.functions import TruncMonth
 from django.dispatch import receiver
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from krm3.core.extra_holidays import extra_holiday_index
+from krm3.core.report_cache import report_cache
 from krm3.utils.dates import KrmDay
 
 from .auth import Resource
@@ -22,10 +31,29 @@ if TYPE_CHECKING:
     from django.contrib.auth.models import AbstractUser
     from django.db.models.base import ModelBase
 
+    from .contracts import Contract
+    from .projects import Task
+
 
 DAYTIME_WORK_HOURS_MAX = 16
 NIGHTTIME_WORK_HOURS_MAX = 8
 
+# the allowed range of each hours field of a time entry, enforced by a
+# `<field>_range` check constraint
+TIME_ENTRY_HOURS_RANGES = {
+    'day_shift_hours': (0, DAYTIME_WORK_HOURS_MAX),
+    'sick_hours': (0, 24),
+    'holiday_hours': (0, 24),
+    'leave_hours': (0, 24),
+    'special_leave_hours': (0, 24),
+    'night_shift_hours': (0, NIGHTTIME_WORK_HOURS_MAX),
+    'on_call_hours': (0, 24),
+    'travel_hours': (0, 24),
+    'rest_hours': (0, 24),
+    'bank_to': (0, 24),
+    'bank_from': (0, 24),
+}
+
 
 class SpecialLeaveReasonQuerySet(models.QuerySet):
     def valid_between(self, start_date: datetime.date | None, end_date: datetime.date | None) -> Self:
@@ -111,6 +139,24 @@ class TimesheetSubmissionManager(models.Manager):
             period__overlap=(from_date, to_date + datetime.timedelta(days=1)), closed=True, resource__in=resources
         )
 
+    def are_closed(self, from_date: datetime.date, to_date: datetime.date, resource_ids: Collection[int]) -> bool:
+        """Check whether all the resources have closed their timesheets for the whole date range.
+
+        :param from_date: the start of the date range (inclusive)
+        :param to_date: the end of the date range (inclusive)
+        :param resource_ids: the ids of the resources to check
+        :return: `True` if each resource has a closed submission covering the
+          whole date range, `False` otherwise or if there are no resources.
+        """
+        if not resource_ids:
+            return False
+        closed_resource_ids = self.filter(
+            period__contains=(from_date, to_date + datetime.timedelta(days=1)),
+            closed=True,
+            resource_id__in=resource_ids,
+        ).values_list('resource_id', flat=True)
+        return set(closed_resource_ids) == set(resource_ids)
+
 
 class TimesheetSubmission(models.Model):
     """A submitted timesheet."""
@@ -161,6 +207,9 @@ class TimesheetSubmission(models.Model):
         return TimesheetSerializer(timesheet).data
 
 
+_BULK_LOG_RELATED_FIELDS = ('resource', 'task', 'special_leave_reason')
+
+
 class TimeEntryQuerySet(models.QuerySet['TimeEntry']):
     _TASK_ENTRY_FILTER = (
         models.Q(day_shift_hours__gt=0)
@@ -181,6 +230,7 @@ class TimeEntryQuerySet(models.QuerySet['TimeEntry']):
 
     _REGULAR_LEAVE_ENTRY_FILTER = models.Q(leave_hours__gt=0)
     _SPECIAL_LEAVE_ENTRY_FILTER = models.Q(special_leave_hours__gt=0, special_leave_reason__isnull=False)
+    _SPECIAL_LEAVE_DAY_ENTRY_FILTER = _DAY_ENTRY_FILTER & ~_TASK_ENTRY_FILTER & _SPECIAL_LEAVE_ENTRY_FILTER
 
     def open(self) -> Self:
         """Select the open time entries in this queryset.
@@ -222,7 +272,18 @@ class TimeEntryQuerySet(models.QuerySet['TimeEntry']):
 
         :return: the filtered queryset.
         """
-        return self.day_entries().filter(self._SPECIAL_LEAVE_ENTRY_FILTER)
+        return self.filter(self._SPECIAL_LEAVE_DAY_ENTRY_FILTER)
+
+    def with_special_leave_flag(self) -> Self:
+        """Annotate `in_special_leaves`, i.e. whether the entry is selected by `special_leaves()`.
+
+        :return: the annotated queryset.
+        """
+        return self.annotate(
+            in_special_leaves=models.ExpressionWrapper(
+                self._SPECIAL_LEAVE_DAY_ENTRY_FILTER, output_field=models.BooleanField()
+            )
+        )
 
     def task_entries(self) -> Self:
         """Select all task entries in this queryset.
@@ -251,6 +312,355 @@ class TimeEntryQuerySet(models.QuerySet['TimeEntry']):
             return self.all()
         return self.filter(resource__user=user)
 
+    def bulk_log(  # noqa: C901, PLR0913, PLR0915
+        self,
+        resource: Resource,
+        dates: Iterable[datetime.date],
+        values: Mapping[str, Any],
+        *,
+        task: Task | None = None,
+        special_leave_reason: SpecialLeaveReason | None = None,
+        autofill: bool = False,
+    ) -> list[TimeEntry]:
+        """Log the same hours for the resource on many days at once.
+
+        Works like calling `update_or_create()` on each day in turn: the
+        entry on the same task and special leave reason is updated, and
+        the entries it overwrites are deleted. The data needed to validate
+        the entries is loaded once for all the days, though, and the
+        entries are written in bulk.
+
+        :param resource: the resource logging the hours
+        :param dates: the days to log the hours on
+        :param values: the hours and the other field values to log
+        :param task: the task to log the hours on, `None` for day entries
+        :param special_leave_reason: the reason of a special leave
+        :param autofill: whether to log the hours still due on each day as day shift hours
+        :raises ValidationError: with the errors of each invalid day, by ISO date
+        :return: the created and updated entries.
+        """
+        from .contracts import Contract  # noqa: PLC0415
+
+        dates = list(dict.fromkeys(dates))
+        if not dates:
+            return []
+        period = (min(dates), max(dates) + datetime.timedelta(days=1))
+        entries_by_date = defaultdict(list)
+        for entry in self.filter(resource=resource, date__in=dates).select_related('special_leave_reason'):
+            entries_by_date[entry.date].append(entry)
+        submissions = list(TimesheetSubmission.objects.filter(resource=resource, period__overlap=period).order_by('pk'))
+        contracts = list(Contract.objects.filter(resource=resource, period__overlap=period))
+        default_schedule = json.loads(config.DEFAULT_RESOURCE_SCHEDULE)
+        # each day is validated against the balance left by the previous ones
+        bank_hours_balance = resource.get_bank_hours_balance()
+        bank_hours_bounds = DayContext(resource, dates[0]).bank_hours_bounds
+
+        # the related objects are the same on every day: validate them once
+        TimeEntry(resource=resource, task=task, special_leave_reason=special_leave_reason).clean_fields(
+            exclude=[field.name for field in TimeEntry._meta.fields if field.name not in _BULK_LOG_RELATED_FIELDS]
+        )
+
+        task_id = task.pk if task else None
+        reason_id = special_leave_reason.pk if special_leave_reason else None
+        errors = {}
+        created, updated, overwritten = [], [], []
+        for date in dates:
+            day_entries = entries_by_date[date]
+            submission = next((submission for submission in submissions if date in submission.period), None)
+            contract = next((contract for contract in contracts if date in contract.period), None)
+
+            existing = next(
+                (e for e in day_entries if e.task_id == task_id and e.special_leave_reason_id == reason_id), None
+            )
+            if existing is None:
+                entry = TimeEntry(resource=resource, date=date, task=task, special_leave_reason=special_leave_reason)
+            else:
+                entry = copy.copy(existing)
+            for field, value in values.items():
+                setattr(entry, field, value)
+            if autofill and contract:
+                entry.day_shift_hours = contract.get_remaining_due_hours(date, task_id, day_entries, default_schedule)
+            entry.timesheet = submission
+
+            entry.day_context = DayContext(
+                resource,
+                date,
+                entries=day_entries,
+                submission=submission,
+                contract=contract,
+                scheduled_hours=Resource._get_min_working_hours(contract, KrmDay(date), default_schedule),
+                bank_hours_balance=bank_hours_balance,
+                bank_hours_bounds=bank_hours_bounds,
+            )
+            try:
+                # the related objects are validated above, the submission has just been loaded
+                entry.full_clean(exclude=(*_BULK_LOG_RELATED_FIELDS, 'timesheet'))
+            except ValidationError as e:
+                errors[date.isoformat()] = e.messages
+                continue
+            finally:
+                entry.day_context = None
+
+            replaced = [other for other in day_entries if other is not existing and entry.overwrites(other)]
+            overwritten.extend(replaced)
+            (created if existing is None else updated).append(entry)
+            bank_hours_balance += sum(
+                (other.net_bank_hours for other in replaced),
+                Decimal(0) if existing is None else existing.net_bank_hours,
+            )
+            bank_hours_balance -= entry.net_bank_hours
+
+        if errors:
+            raise ValidationError(errors)
+
+        with transaction.atomic():
+            # update first, so that the receivers of the deleted entries see the new values
+            now = timezone.now()
+            for entry in updated:
+                entry.last_modified = now
+            update_fields = {*values, 'timesheet', 'last_modified'} | ({'day_shift_hours'} if autofill else set())
+            self.bulk_update(updated, fields=sorted(update_fields))
+            if overwritten:
+                self.filter(pk__in=[entry.pk for entry in overwritten]).delete()
+            self.bulk_create(created)
+
+            BankHoursCheckpoint.objects.record_entries([*updated, *created])
+            report_cache.invalidate_days((entry.resource_id, entry.date) for entry in [*updated, *created])
+
+        return [*created, *updated]
+
+    def day_totals(self, *, by_task: bool = False) -> list[TimeEntryTotals]:
+        """Sum up the hours of the entries of each resource and day in the database.
+
+        The special leave reason and the protocol number cannot be summed
+        up, so they are loaded with a second query, only for the days
+        where some entry has them.
+
+        :param by_task: whether to sum up the hours of each task separately
+        :return: the totals, sorted by resource, date and task.
+        """
+        keys = ('resource_id', 'date', 'task_id') if by_task else ('resource_id', 'date')
+        rows = self._total_rows(keys)
+        totals = {tuple(row[: len(keys)]): row[len(keys) : -1] for row in rows}
+
+        details: dict[tuple, tuple[SpecialLeaveReason | None, str | None]] = {}
+        if days := {(row[0], row[1]) for row in rows if row[-1]}:
+            details = self._details(
+                keys,
+                self.filter(
+                    resource_id__in={resource_id for resource_id, _date in days}, date__in={d for _r, d in days}
+                ),
+            )
+
+        return [
+            TimeEntryTotals(key[0], key[1], key[2] if by_task else None, *sums, *details.get(key, (None, None)))
+            for key, sums in totals.items()
+        ]
+
+    def iter_day_totals(
+        self, *, by_task: bool = False, order_by: Iterable[str] = (), chunk_size: int = 2000
+    ) -> Iterator[TimeEntryTotals]:
+        """Sum up the hours like `day_totals()`, streaming them in chunks.
+
+        The totals are read through a server-side cursor, so only a chunk
+        of them is held in memory at a time. The special leave reasons and
+        the protocol numbers of all the entries having them are loaded up
+        front, they are few.
+
+        :param by_task: whether to sum up the hours of each task separately
+        :param order_by: the fields to sort the totals by before the resource,
+          e.g. to follow the order of the resources
+        :param chunk_size: the number of totals fetched at a time
+        :return: the totals, sorted by `order_by`, resource, date and task.
+        """
+        keys = ('resource_id', 'date', 'task_id') if by_task else ('resource_id', 'date')
+        details = self._details(keys, self)
+        for row in self._total_rows(keys, order_by).iterator(chunk_size=chunk_size):
+            key = tuple(row[: len(keys)])
+            yield TimeEntryTotals(
+                key[0], key[1], key[2] if by_task else None, *row[len(keys) : -1], *details.get(key, (None, None))
+            )
+
+    def _total_rows(self, keys: tuple[str, ...], order_by: Iterable[str] = ()) -> QuerySet:
+        """Return the rows of the keys, the sums of the hours and the count of entries with details."""
+        return (
+            self.order_by()
+            .values_list(*keys)
+            .annotate(**{f'total_{field}': Sum(field) for field in _TOTALS_FIELDS})
+            .annotate(details=models.Count('pk', filter=_HAS_DETAILS))
+            .order_by(*order_by, *keys)
+        )
+
+    @staticmethod
+    def _details(
+        keys: tuple[str, ...], entries: TimeEntryQuerySet
+    ) -> dict[tuple, tuple[SpecialLeaveReason | None, str | None]]:
+        """Return the special leave reason and the protocol number of the last entries having them, by key."""
+        details: dict[tuple, tuple[SpecialLeaveReason | None, str | None]] = {}
+        for entry in entries.filter(_HAS_DETAILS).select_related('special_leave_reason').order_by('pk'):
+            key = (entry.resource_id, entry.date, entry.task_id)[: len(keys)]
+            reason, protocol_number = details.get(key, (None, None))
+            details[key] = (entry.special_leave_reason or reason, entry.protocol_number or protocol_number)
+        return details
+
+    def bulk_clear(self) -> ClearedTimeEntries:
+        """Delete the entries of this queryset, like deleting each entry in turn.
+
+        The bank hours deposited on a day left with fewer task hours than
+        scheduled are deleted too, see `clear_bank_hours_when_no_work()`.
+
+        :return: a summary of the deleted entries.
+        """
+        with transaction.atomic():
+            entries = list(self.values_list('pk', 'resource_id', 'date'))
+            if not entries:
+                return ClearedTimeEntries(entries=0, bank_deposits=0, days=[])
+            pks = [pk for pk, _resource_id, _date in entries]
+            days = sorted({(resource_id, date) for _pk, resource_id, date in entries})
+            deposits = set(
+                self.model.objects.filter(
+                    resource_id__in={resource_id for resource_id, _date in days},
+                    date__in={date for _resource_id, date in days},
+                    bank_to__gt=0,
+                )
+                .exclude(pk__in=pks)
+                .values_list('pk', flat=True)
+            )
+            self.model.objects.filter(pk__in=pks).delete()
+            bank_deposits = len(deposits) - self.model.objects.filter(pk__in=deposits).count() if deposits else 0
+        return ClearedTimeEntries(entries=len(entries), bank_deposits=bank_deposits, days=days)
+
+
+class TimeEntryTotals(NamedTuple):
+    """The hours logged by a resource on a day, optionally on a single task.
+
+    Can stand in for the time entries it sums up wherever only their
+    hours are needed, see `TimeEntryQuerySet.day_totals()`.
+    """
+
+    resource_id: int
+    date: datetime.date
+    task_id: int | None
+    day_shift_hours: Decimal
+    night_shift_hours: Decimal
+    on_call_hours: Decimal
+    travel_hours: Decimal
+    holiday_hours: Decimal
+    leave_hours: Decimal
+    special_leave_hours: Decimal
+    rest_hours: Decimal
+    sick_hours: Decimal
+    bank_to: Decimal
+    bank_from: Decimal
+    special_leave_reason: SpecialLeaveReason | None = None
+    """The special leave reason of the last entry having one."""
+    protocol_number: str | None = None
+    """The protocol number of the last entry having one."""
+
+    @property
+    def total_task_hours(self) -> Decimal:
+        """See `TimeEntry.total_task_hours`."""
+        return self.day_shift_hours + self.night_shift_hours + self.travel_hours
+
+    @property
+    def special_hours(self) -> Decimal:
+        """See `TimeEntry.special_hours`."""
+        return self.special_leave_hours + self.sick_hours + self.holiday_hours
+
+
+# the fields summed up by `TimeEntryQuerySet.day_totals()`, in `TimeEntryTotals` order
+_TOTALS_FIELDS = TimeEntryTotals._fields[3:-2]
+# the entries with a special leave reason or a protocol number, which cannot be summed up
+_HAS_DETAILS = Q(special_leave_reason__isnull=False) | (Q(protocol_number__isnull=False) & ~Q(protocol_number=''))
+
+
+class ClearedTimeEntries(NamedTuple):
+    """The time entries deleted by `TimeEntryQuerySet.bulk_clear()`."""
+
+    entries: int
+    """The number of entries deleted."""
+    bank_deposits: int
+    """The number of bank hours deposits deleted because of the missing work hours."""
+    days: list[tuple[int, datetime.date]]
+    """The resource ids and dates of the days cleared."""
+
+
+class DayContext:
+    """The data about a resource's day shared by the `TimeEntry` validators.
+
+    Each piece of data is loaded lazily and at most once. Callers validating
+    many entries may build contexts in advance, optionally passing the
+    already known data as keyword arguments (e.g. `submitted=False`), and
+    inject them through `TimeEntry.day_context`.
+    """
+
+    def __init__(self, resource: Resource, date: datetime.date, **preloaded: Any) -> None:
+        self.resource = resource
+        self.date = date
+        for name, value in preloaded.items():
+            if not isinstance(getattr(type(self), name, None), cached_property):
+                raise TypeError(f'Unknown day context data: {name}')
+            self.__dict__[name] = value
+
+    @classmethod
+    def for_entry(cls, entry: TimeEntry) -> DayContext:
+        """Return the context injected into the entry, or a new one if missing or not matching."""
+        context = entry.day_context
+        if context is None or context.resource.pk != entry.resource_id or context.date != entry.date:
+            context = cls(entry.resource, entry.date)
+        return context
+
+    @cached_property
+    def entries(self) -> list[TimeEntry]:
+        """The time entries already saved for the day."""
+        return list(
+            TimeEntry.objects.filter(resource=self.resource, date=self.date).select_related('special_leave_reason')
+        )
+
+    @cached_property
+    def submission(self) -> TimesheetSubmission | None:
+        return TimesheetSubmission.objects.filter(resource=self.resource, period__contains=self.date).first()
+
+    @cached_property
+    def submitted(self) -> bool:
+        return self.submission is not None and self.submission.closed
+
+    @cached_property
+    def contract(self) -> Contract | None:
+        from .contracts import Contract  # noqa: PLC0415
+
+        return Contract.objects.filter(resource=self.resource, period__contains=self.date).first()
+
+    @cached_property
+    def settings(self) -> dict[str, Any]:
+        """The settings needed by the validators, read at once."""
+        return get_values_for_keys(['DEFAULT_RESOURCE_SCHEDULE', 'BANK_HOURS_LOWER_BOUND', 'BANK_HOURS_UPPER_BOUND'])
+
+    @cached_property
+    def scheduled_hours(self) -> float:
+        default_schedule = json.loads(self.settings['DEFAULT_RESOURCE_SCHEDULE'])
+        return Resource._get_min_working_hours(self.contract, KrmDay(self.date), default_schedule)
+
+    @cached_property
+    def bank_hours_balance(self) -> Decimal:
+        return self.resource.get_bank_hours_balance()
+
+    @cached_property
+    def bank_hours_bounds(self) -> tuple[Decimal, Decimal]:
+        """The lower and upper bounds of the bank hours balance."""
+        return (
+            Decimal(str(self.settings['BANK_HOURS_LOWER_BOUND'])),
+            Decimal(str(self.settings['BANK_HOURS_UPPER_BOUND'])),
+        )
+
+    def has_entry_blocking_overtime(self, excluded: TimeEntry) -> bool:
+        """Check whether a leave, special leave or rest is logged on the day, besides `excluded`."""
+        return any(
+            entry.is_leave or entry.is_special_leave or entry.is_rest
+            for entry in self.entries
+            if entry.pk != excluded.pk
+        )
+
 
 class TimeEntry(models.Model):
     """A timesheet entry."""
@@ -279,6 +689,9 @@ class TimeEntry(models.Model):
 
     objects = TimeEntryQuerySet.as_manager()
 
+    # optionally set by callers to share the data needed for validation
+    day_context: DayContext | None = None
+
     class Meta:
         verbose_name_plural = 'Time entries'
         permissions = [
@@ -286,24 +699,8 @@ class TimeEntry(models.Model):
             ('manage_any_timesheet', "Can view, and manage everybody's timesheets"),
         ]
         constraints = [
-            models.CheckConstraint(
-                condition=models.Q(day_shift_hours__range=(0, DAYTIME_WORK_HOURS_MAX)), name='day_shift_hours_range'
-            ),
-            models.CheckConstraint(condition=models.Q(sick_hours__range=(0, 24)), name='sick_hours_range'),
-            models.CheckConstraint(condition=models.Q(holiday_hours__range=(0, 24)), name='holiday_hours_range'),
-            models.CheckConstraint(condition=models.Q(leave_hours__range=(0, 24)), name='leave_hours_range'),
-            models.CheckConstraint(
-                condition=models.Q(special_leave_hours__range=(0, 24)), name='special_leave_hours_range'
-            ),
-            models.CheckConstraint(
-                condition=models.Q(night_shift_hours__range=(0, NIGHTTIME_WORK_HOURS_MAX)),
-                name='night_shift_hours_range',
-            ),
-            models.CheckConstraint(condition=models.Q(on_call_hours__range=(0, 24)), name='on_call_hours_range'),
-            models.CheckConstraint(condition=models.Q(travel_hours__range=(0, 24)), name='travel_hours_range'),
-            models.CheckConstraint(condition=models.Q(rest_hours__range=(0, 24)), name='rest_hours_range'),
-            models.CheckConstraint(condition=models.Q(bank_to__range=(0, 24)), name='bank_to_range'),
-            models.CheckConstraint(condition=models.Q(bank_from__range=(0, 24)), name='bank_from_range'),
+            models.CheckConstraint(condition=models.Q(**{f'{field}__range': bounds}), name=f'{field}_range')
+            for field, bounds in TIME_ENTRY_HOURS_RANGES.items()
         ]
 
     @override
@@ -320,9 +717,44 @@ class TimeEntry(models.Model):
         update_fields: Iterable[str] | None = None,
     ) -> None:
         self.full_clean()
-        return super().save(
-            force_insert=force_insert, force_update=force_update, using=using, update_fields=update_fields
-        )
+        # the entry and the bank hours ledger must be updated together
+        with transaction.atomic(using=using):
+            return super().save(
+                force_insert=force_insert, force_update=force_update, using=using, update_fields=update_fields
+            )
+
+    @override
+    @classmethod
+    def from_db(cls, db: str | None, field_names: Collection[str], values: Collection[Any]) -> Self:
+        instance = super().from_db(db, field_names, values)
+        if {'resource_id', 'date', 'bank_to', 'bank_from'}.issubset(field_names):
+            # remember what is recorded in the bank hours ledger
+            instance._recorded_bank_hours = instance._bank_hours_record()
+        return instance
+
+    def _bank_hours_record(self) -> tuple[int, datetime.date, Decimal, Decimal]:
+        return self.resource_id, self.date, Decimal(self.bank_to), Decimal(self.bank_from)
+
+    @override
+    def validate_constraints(self, exclude: Collection[str] | None = None) -> None:
+        """Validate the hours ranges in Python instead of running a query for each of their constraints."""
+        exclude = set(exclude or ())
+        errors = {}
+        try:
+            # the constraints on the hours fields are skipped
+            super().validate_constraints(exclude=exclude | TIME_ENTRY_HOURS_RANGES.keys())
+        except ValidationError as e:
+            errors = e.update_error_dict(errors)
+        constraints = {constraint.name: constraint for constraint in self._meta.constraints}
+        for field, (lower, upper) in TIME_ENTRY_HOURS_RANGES.items():
+            value = getattr(self, field)
+            if field in exclude or value is None or lower <= value <= upper:
+                continue
+            constraint = constraints[f'{field}_range']
+            error = ValidationError(constraint.get_violation_error_message(), code=constraint.violation_error_code)
+            errors = error.update_error_dict(errors)
+        if errors:
+            raise ValidationError(errors)
 
     @property
     def total_task_hours(self) -> Decimal:
@@ -394,19 +826,62 @@ class TimeEntry(models.Model):
     def has_task_entry_hours(self) -> bool:
         return self.total_task_hours > 0.0 or self.on_call_hours > 0.0
 
+    @property
+    def logs_task_hours_only(self) -> bool:
+        """Tell whether this entry is one of the `TimeEntryQuerySet.task_entries()`."""
+        return self.has_task_entry_hours and not self._logs_day_or_bank_hours
+
+    @property
+    def logs_day_hours_only(self) -> bool:
+        """Tell whether this entry is one of the `TimeEntryQuerySet.day_entries()`."""
+        return self._logs_day_or_bank_hours and not self.has_task_entry_hours
+
+    @property
+    def _logs_day_or_bank_hours(self) -> bool:
+        return any(
+            hours > 0
+            for hours in (
+                self.sick_hours,
+                self.holiday_hours,
+                self.rest_hours,
+                self.leave_hours,
+                self.special_leave_hours,
+                self.bank_to,
+                self.bank_from,
+            )
+        )
+
+    def overwrites(self, other: TimeEntry) -> bool:
+        """Tell whether saving this entry deletes another one logged on the same day.
+
+        See `clear_overwritten_entries_on_same_day()`.
+
+        :param other: the other entry
+        :return: `True` if `other` is overwritten, `False` otherwise.
+        """
+        if other.pk is not None and other.pk == self.pk:
+            return False
+        if self.is_task_entry and other.logs_day_hours_only and (other.is_sick_day or other.is_holiday):
+            return True
+        if self.is_day_entry and other.logs_day_hours_only:
+            return True
+        if self.is_sick_day or self.is_holiday:
+            return other.logs_task_hours_only
+        return self.is_task_entry and other.task_id == self.task_id
+
     @property
     def does_entry_blocking_overtime_exist_for_same_day(self) -> bool:
-        time_entries_for_same_day = TimeEntry.objects.filter(resource=self.resource, date=self.date).exclude(pk=self.pk)
-        for time_entry in time_entries_for_same_day:
-            if time_entry.is_leave or time_entry.is_special_leave or time_entry.is_rest:
-                return True
-        return False
+        return DayContext.for_entry(self).has_entry_blocking_overtime(excluded=self)
 
     @property
     def net_bank_hours(self) -> Decimal:
         """Calculate net bank hour change for this entry."""
         return Decimal(self.bank_from) - Decimal(self.bank_to)
 
+    def get_scheduled_hours(self) -> float:
+        """Return the hours the resource is scheduled to work on the day of this entry."""
+        return Resource.objects.schedules([self.resource_id], self.date, self.date)[self.resource_id][self.date]
+
     @property
     def special_hours(self) -> Decimal:
         """Return the total hours spent on "special activities".
@@ -435,23 +910,24 @@ class TimeEntry(models.Model):
         """
         super().clean()
 
+        context = DayContext.for_entry(self)
         errors = []
         validators = (
-            self._verify_timesheet_not_submitted,
+            partial(self._verify_timesheet_not_submitted, context),
             self._verify_no_negative_hours_and_bank_fields,
             self._verify_at_least_one_nonzero_hours_and_bank_field,
             self._verify_task_hours_not_logged_in_day_entry,
             self._verify_day_hours_not_logged_in_task_entry,
             self._verify_task_and_day_hours_not_logged_together,
             self._verify_at_most_one_absence,
-            self._verify_honors_total_hours_restrictions,
+            partial(self._verify_honors_total_hours_restrictions, context),
             self._verify_reason_only_on_special_leave,
             self._verify_special_leave_reason_is_valid,
-            self._verify_no_overtime_with_leave_or_rest_entry,
+            partial(self._verify_no_overtime_with_leave_or_rest_entry, context),
             self._verify_bank_hours_not_both_directions,
-            self._verify_bank_hours_balance_limits,
+            partial(self._verify_bank_hours_balance_limits, context),
             self._verify_bank_hours_restrictions_with_day_entries,
-            self._verify_bank_hours_against_scheduled_hours,
+            partial(self._verify_bank_hours_against_scheduled_hours, context),
             self._verify_protocol_number,
         )
 
@@ -464,12 +940,8 @@ class TimeEntry(models.Model):
         if errors:
             raise ValidationError(errors)
 
-    def _verify_timesheet_not_submitted(self) -> None:
-        submitted = TimesheetSubmission.objects.filter(
-            resource=self.resource, closed=True, period__contains=self.date
-        ).exists()
-
-        if submitted:
+    def _verify_timesheet_not_submitted(self, context: DayContext) -> None:
+        if context.submitted:
             raise ValidationError(_('Cannot modify time entries for submitted timesheets'), code='timesheet_submitted')
 
     def _verify_no_negative_hours_and_bank_fields(self) -> None:
@@ -538,7 +1010,7 @@ class TimeEntry(models.Model):
         if self.has_task_entry_hours and self.has_day_entry_hours:
             raise ValidationError(_('You cannot log task hours and non-task hours together'), code='work_while_absent')
 
-    def _verify_honors_total_hours_restrictions(self) -> None:
+    def _verify_honors_total_hours_restrictions(self, context: DayContext) -> None:
         if self.total_hours > 24:
             raise ValidationError(
                 _('Total hours on this time entry ({total_hours}) is over 24 hours').format(
@@ -549,7 +1021,7 @@ class TimeEntry(models.Model):
 
         # we might be overwriting an existing time entry on the same
         # task (even None) - exclude it, as it should no longer count
-        entries_on_same_day = TimeEntry.objects.filter(date=self.date, resource=self.resource).exclude(task=self.task)
+        entries_on_same_day = [entry for entry in context.entries if entry.task_id != self.task_id]
 
         total_hours_on_same_day = sum(entry.total_hours for entry in entries_on_same_day) + self.total_hours
         if total_hours_on_same_day > (DAYTIME_WORK_HOURS_MAX + NIGHTTIME_WORK_HOURS_MAX):
@@ -584,25 +1056,22 @@ class TimeEntry(models.Model):
                 code='invalid_special_leave_reason',
             )
 
-    def _verify_no_overtime_with_leave_or_rest_entry(self) -> None:
+    def _verify_no_overtime_with_leave_or_rest_entry(self, context: DayContext) -> None:
         # we might be overwriting an existing time entry on the same
         # task (even None) - exclude it, as it should no longer count
         # if we're updating the model directly, the current row on the
         # db should not count as well because we're replacing it
-        all_entries = cast('TimeEntryQuerySet', TimeEntry.objects.filter(date=self.date, resource=self.resource))
-
-        other_entries_on_same_day = all_entries.exclude(task=self.task).exclude(pk=self.pk)
+        other_entries_on_same_day = [
+            entry for entry in context.entries if entry.task_id != self.task_id and entry.pk != self.pk
+        ]
 
         if not (
-            self.does_entry_blocking_overtime_exist_for_same_day
-            or self.is_special_leave
-            or self.is_rest
-            or self.is_leave
+            context.has_entry_blocking_overtime(excluded=self) or self.is_special_leave or self.is_rest or self.is_leave
         ):
             return
 
         total_hours_on_same_day = sum(entry.total_hours for entry in other_entries_on_same_day) + self.total_hours
-        scheduled_hours = self.resource.scheduled_working_hours_for_day(KrmDay(self.date))
+        scheduled_hours = context.scheduled_hours
 
         if total_hours_on_same_day > scheduled_hours:
             raise ValidationError(
@@ -623,11 +1092,10 @@ class TimeEntry(models.Model):
                 _('Cannot both withdraw from and deposit to bank hours on the same day'), code='bank_both_directions'
             )
 
-    def _verify_bank_hours_balance_limits(self) -> None:
+    def _verify_bank_hours_balance_limits(self, context: DayContext) -> None:
         """Verify that the transaction won't exceed total balance limits (-16 to +16)."""
-        balance_upper = Decimal(str(config.BANK_HOURS_UPPER_BOUND))
-        balance_lower = Decimal(str(config.BANK_HOURS_LOWER_BOUND))
-        current_balance = self.resource.get_bank_hours_balance()
+        balance_lower, balance_upper = context.bank_hours_bounds
+        current_balance = context.bank_hours_balance
         new_balance = current_balance + self.bank_to - self.bank_from
 
         if new_balance > balance_upper:
@@ -662,16 +1130,14 @@ class TimeEntry(models.Model):
                 code='bank_deposits_not_allowed_on_day_entries',
             )
 
-    def _verify_bank_hours_against_scheduled_hours(self) -> None:
+    def _verify_bank_hours_against_scheduled_hours(self, context: DayContext) -> None:
         """Verify bank hours usage against scheduled hours for task entries."""
-        if not self.is_day_entry:
+        if not self.is_day_entry or (self.bank_to == 0 and self.bank_from == 0):
             return
 
-        all_entries = TimeEntry.objects.filter(date=self.date, resource=self.resource)
-        total_hours_on_same_day = sum(entry.total_hours for entry in all_entries)
+        total_hours_on_same_day = sum(entry.total_hours for entry in context.entries)
         total_hours_with_bank_hours = total_hours_on_same_day + self.net_bank_hours
-        schedule = self.resource.get_schedule(self.date, self.date + datetime.timedelta(days=1))
-        scheduled_hours = schedule[self.date]
+        scheduled_hours = context.scheduled_hours
         if scheduled_hours is None:
             return
 
@@ -697,45 +1163,32 @@ class TimeEntry(models.Model):
 
 
 @receiver(models.signals.pre_save, sender=TimeEntry)
-def clear_sick_day_or_holiday_entry_on_same_day(sender: TimeEntry, instance: TimeEntry, **kwargs: Any) -> None:
-    entries = cast('TimeEntryQuerySet', TimeEntry.objects).filter(date=instance.date, resource=instance.resource)
-    if instance.is_task_entry:
-        overwritten = entries.sick_days_and_holidays()
-    elif instance.is_day_entry:
-        # just to be safe: remove any other existing day entry
-        overwritten = entries.day_entries().exclude(pk=instance.pk)
-    else:
-        # we should never get there
-        overwritten = TimeEntry.objects.none()
-    overwritten.delete()
+def clear_overwritten_entries_on_same_day(sender: TimeEntry, instance: TimeEntry, **kwargs: Any) -> None:
+    """Delete the entries of the same day overwritten by the saved one.
+
+    A task entry overwrites the sick days and holidays, and the other
+    entries of its task; a day entry overwrites the other day entries; a
+    sick day or holiday also overwrites the task entries.
+    """
+    entries = TimeEntry.objects.filter(date=instance.date, resource=instance.resource)
+    if overwritten := [entry.pk for entry in entries if instance.overwrites(entry)]:
+        TimeEntry.objects.filter(pk__in=overwritten).delete()
 
 
 @receiver(models.signals.post_delete, sender=TimeEntry)
 def clear_bank_hours_when_no_work(sender: TimeEntry, instance: TimeEntry, **kwargs: Any) -> None:
     """Auto-clear bank deposits if there are no work hours."""
-    entries: TimeEntryQuerySet = TimeEntry.objects.filter(date=instance.date, resource=instance.resource)
+    if instance.task_id is None:
+        return
+    entries: TimeEntryQuerySet = TimeEntry.objects.filter(date=instance.date, resource_id=instance.resource_id)
     bank_to_entry = entries.filter(bank_to__gt=0).first()
+    if bank_to_entry is None:
+        return
     total_task_hours = sum(entry.total_task_hours for entry in entries)
-    schedule = instance.resource.get_schedule(instance.date, instance.date + datetime.timedelta(days=1))
-    scheduled_hours = schedule[instance.date]
-    if instance.is_task_entry and total_task_hours < scheduled_hours and bank_to_entry:
+    if total_task_hours < instance.get_scheduled_hours():
         bank_to_entry.delete()
 
 
-@receiver(models.signals.pre_save, sender=TimeEntry)
-def clear_task_entries_on_same_day(sender: TimeEntry, instance: TimeEntry, **kwargs: Any) -> None:
-    entries = cast('TimeEntryQuerySet', TimeEntry.objects).filter(date=instance.date, resource=instance.resource)
-    if instance.is_sick_day or instance.is_holiday:
-        overwritten = entries.task_entries()
-    elif instance.is_task_entry:
-        # just to be safe: remove any other existing task entry for the
-        # `instance`'s task
-        overwritten = entries.filter(task=instance.task).exclude(pk=instance.pk)
-    else:
-        overwritten = TimeEntry.objects.none()
-    overwritten.delete()
-
-
 @receiver(models.signals.post_save, sender=TimesheetSubmission)
 def link_entries(sender: TimesheetSubmission, instance: TimesheetSubmission | list | tuple, **kwargs: Any) -> None:
     instance.timeentry_set.update(timesheet=None)
@@ -746,12 +1199,294 @@ def link_entries(sender: TimesheetSubmission, instance: TimesheetSubmission | li
     TimeEntry.objects.filter(resource=instance.resource, date__gte=lower, date__lt=upper).update(timesheet=instance)
 
 
+@receiver(models.signals.post_save, sender=TimesheetSubmission)
+def discard_reopened_report_artifacts(
+    sender: TimesheetSubmission, instance: TimesheetSubmission, **kwargs: Any
+) -> None:
+    if not instance.closed:
+        _discard_report_artifacts(instance)
+
+
+@receiver(models.signals.post_delete, sender=TimesheetSubmission)
+def discard_deleted_report_artifacts(sender: TimesheetSubmission, instance: TimesheetSubmission, **kwargs: Any) -> None:
+    _discard_report_artifacts(instance)
+
+
+def _discard_report_artifacts(submission: TimesheetSubmission) -> None:
+    ReportArtifact.objects.discard(*_submission_bounds(submission))
+
+
+@receiver(models.signals.post_save, sender=TimesheetSubmission)
+@receiver(models.signals.post_delete, sender=TimesheetSubmission)
+def invalidate_submission_reports(sender: TimesheetSubmission, instance: TimesheetSubmission, **kwargs: Any) -> None:
+    lower, upper = _submission_bounds(instance)
+    report_cache.invalidate(instance.resource_id, lower, upper - datetime.timedelta(days=1))
+
+
+def _submission_bounds(submission: TimesheetSubmission) -> tuple[datetime.date, datetime.date]:
+    if isinstance(submission.period, (list | tuple)):
+        lower, upper = submission.period[0], submission.period[1]
+    else:
+        lower, upper = submission.period.lower, submission.period.upper
+    return KrmDay(lower).date, KrmDay(upper).date
+
+
 @receiver(models.signals.pre_save, sender=TimeEntry)
 def link_to_timesheet(sender: TimeEntry, instance: TimeEntry, **kwargs: Any) -> None:
     timesheet = TimesheetSubmission.objects.filter(resource=instance.resource, period__contains=instance.date).first()
     instance.timesheet = timesheet
 
 
+class BankHoursCheckpointManager(models.Manager):
+    """Custom Manager for BankHoursCheckpoint, maintaining the bank hours ledger."""
+
+    def record(
+        self, resource_id: int, date: datetime.date, deposits: Decimal, withdrawals: Decimal, *, create: bool = True
+    ) -> None:
+        """Add a bank hours transaction to the checkpoint of its month.
+
+        :param resource_id: the id of the resource owning the bank hours
+        :param date: the day of the transaction
+        :param deposits: the hours deposited, negative to revert a deposit
+        :param withdrawals: the hours withdrawn, negative to revert a withdrawal
+        :param create: whether to create the checkpoint if it does not exist
+        """
+        if not deposits and not withdrawals:
+            return
+        month = date.replace(day=1)
+        checkpoints = self.filter(resource_id=resource_id, month=month)
+        changes = {'deposits': F('deposits') + deposits, 'withdrawals': F('withdrawals') + withdrawals}
+        if not checkpoints.update(**changes) and create:
+            _checkpoint, created = self.get_or_create(
+                resource_id=resource_id, month=month, defaults={'deposits': deposits, 'withdrawals': withdrawals}
+            )
+            if not created:
+                # created concurrently
+                checkpoints.update(**changes)
+
+    def record_entries(self, entries: Iterable[TimeEntry]) -> None:
+        """Record the bank hours of time entries saved without sending signals.
+
+        :param entries: the created or updated entries, whose previously
+          recorded bank hours (if any) are reverted
+        """
+        changes = []
+        for entry in entries:
+            if previous := getattr(entry, '_recorded_bank_hours', None):
+                resource_id, date, deposits, withdrawals = previous
+                changes.append((resource_id, date, -deposits, -withdrawals))
+            entry._recorded_bank_hours = entry._bank_hours_record()
+            changes.append(entry._recorded_bank_hours)
+        self._record_by_month(changes)
+
+    def _record_by_month(self, changes: Iterable[tuple[int, datetime.date, Decimal, Decimal]]) -> None:
+        totals = defaultdict(lambda: [Decimal(0), Decimal(0)])
+        for resource_id, date, deposits, withdrawals in changes:
+            totals[resource_id, date.replace(day=1)][0] += deposits
+            totals[resource_id, date.replace(day=1)][1] += withdrawals
+        for (resource_id, month), (deposits, withdrawals) in totals.items():
+            self.record(resource_id, month, deposits, withdrawals)
+
+    def balance(self, resource: Resource, as_of: datetime.date | None = None) -> Decimal:
+        """Return the bank hours balance of the resource.
+
+        :param resource: the resource owning the bank hours
+        :param as_of: the last day (inclusive) to count transactions up to, `None` to count all of them
+        :return: the deposited minus the withdrawn hours.
+        """
+        checkpoints = self.filter(resource=resource)
+        if as_of is None:
+            totals = checkpoints.aggregate(deposits=Sum('deposits'), withdrawals=Sum('withdrawals'))
+            return (totals['deposits'] or Decimal(0)) - (totals['withdrawals'] or Decimal(0))
+
+        # sum up the whole months before `as_of`, then the days of its month
+        month = as_of.replace(day=1)
+        totals = checkpoints.filter(month__lt=month).aggregate(deposits=Sum('deposits'), withdrawals=Sum('withdrawals'))
+        month_totals = TimeEntry.objects.filter(resource=resource, date__gte=month, date__lte=as_of).aggregate(
+            deposits=Sum('bank_to'), withdrawals=Sum('bank_from')
+        )
+        return sum(
+            (
+                (totals['deposits'] or Decimal(0)),
+                (month_totals['deposits'] or Decimal(0)),
+                -(totals['withdrawals'] or Decimal(0)),
+                -(month_totals['withdrawals'] or Decimal(0)),
+            ),
+            Decimal(0),
+        )
+
+    def _expected(
+        self, resources: Iterable[Resource] | None
+    ) -> dict[tuple[int, datetime.date], tuple[Decimal, Decimal]]:
+        entries = TimeEntry.objects.filter(Q(bank_to__gt=0) | Q(bank_from__gt=0))
+        if resources is not None:
+            entries = entries.filter(resource__in=resources)
+        rows = (
+            entries.annotate(month=TruncMonth('date'))
+            .values('resource_id', 'month')
+            .annotate(deposits=Sum('bank_to'), withdrawals=Sum('bank_from'))
+        )
+        return {(row['resource_id'], row['month']): (row['deposits'], row['withdrawals']) for row in rows}
+
+    def rebuild(self, resources: Iterable[Resource] | None = None) -> int:
+        """Recompute the checkpoints from the time entries.
+
+        :param resources: the resources to rebuild the ledger for, `None` for all of them
+        :return: the number of checkpoints written.
+        """
+        expected = self._expected(resources)
+        checkpoints = self.all() if resources is None else self.filter(resource__in=resources)
+        with transaction.atomic():
+            checkpoints.delete()
+            self.bulk_create(
+                BankHoursCheckpoint(resource_id=resource_id, month=month, deposits=deposits, withdrawals=withdrawals)
+                for (resource_id, month), (deposits, withdrawals) in expected.items()
+            )
+        return len(expected)
+
+    def mismatches(
+        self, resources: Iterable[Resource] | None = None
+    ) -> dict[tuple[int, datetime.date], tuple[tuple[Decimal, Decimal], tuple[Decimal, Decimal]]]:
+        """Compare the checkpoints against the time entries.
+
+        :param resources: the resources to verify the ledger for, `None` for all of them
+        :return: the expected and the actual deposits and withdrawals of each
+          wrong checkpoint, by resource id and month.
+        """
+        expected = self._expected(resources)
+        checkpoints = self.all() if resources is None else self.filter(resource__in=resources)
+        actual = {
+            (resource_id, month): (deposits, withdrawals)
+            for resource_id, month, deposits, withdrawals in checkpoints.values_list(
+                'resource_id', 'month', 'deposits', 'withdrawals'
+            )
+            if deposits or withdrawals
+        }
+        zero = (Decimal(0), Decimal(0))
+        return {
+            key: (expected.get(key, zero), actual.get(key, zero))
+            for key in expected.keys() | actual.keys()
+            if expected.get(key) != actual.get(key)
+        }
+
+
+class BankHoursCheckpoint(models.Model):
+    """The bank hours deposited and withdrawn by a resource in a month.
+
+    Kept up to date on every `TimeEntry` save and delete, so that the
+    bank hours balance does not need to aggregate the whole history of
+    time entries.
+    """
+
+    resource = models.ForeignKey(Resource, on_delete=models.CASCADE)
+    month = models.DateField(help_text=_('First day of the month'))
+    deposits = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    withdrawals = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+
+    objects: BankHoursCheckpointManager = BankHoursCheckpointManager()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=('resource', 'month'), name='unique_bank_hours_checkpoint')]
+
+    def __str__(self) -> str:
+        return f'{self.resource} {self.month.strftime("%Y %b")}: +{self.deposits} -{self.withdrawals}'
+
+
+class ReportArtifactManager(models.Manager['ReportArtifact']):
+    def fetch(self, kind: str, month: datetime.date, scope: str) -> bytes | None:
+        """Return the content of the artifact, if it has been stored."""
+        content = self.filter(kind=kind, month=month, scope=scope).values_list('content', flat=True).first()
+        return None if content is None else bytes(content)
+
+    def store(self, kind: str, month: datetime.date, scope: str, content: bytes) -> None:
+        """Store the content of an artifact, replacing the previous one."""
+        self.update_or_create(kind=kind, month=month, scope=scope, defaults={'content': content})
+
+    def discard(self, from_date: datetime.date, to_date: datetime.date) -> None:
+        """Delete the artifacts of all the months overlapping a date range.
+
+        :param from_date: the start of the date range (inclusive)
+        :param to_date: the end of the date range (exclusive)
+        """
+        self.filter(month__gte=from_date.replace(day=1), month__lt=to_date).delete()
+
+
+class ReportArtifact(models.Model):
+    """The pre-rendered output of a report for a month where all timesheets are closed.
+
+    Such a report can no longer change, so it is computed once and
+    served from here until a submission for the month is reopened or
+    deleted.
+    """
+
+    class Kind(models.TextChoices):
+        REPORT = 'report', _('Report')
+        TASK_REPORT = 'task_report', _('Report by task')
+        REPORT_EXPORT = 'report_export', _('Report export')
+
+    kind = models.CharField(max_length=20, choices=Kind)
+    month = models.DateField(help_text=_('First day of the month'))
+    scope = models.CharField(
+        max_length=255, help_text=_('The format version and the digest of the resources, language and filters')
+    )
+    content = models.BinaryField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    objects: ReportArtifactManager = ReportArtifactManager()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=('kind', 'month', 'scope'), name='unique_report_artifact')]
+
+    def __str__(self) -> str:
+        return f'{self.get_kind_display()} {self.month.strftime("%Y %b")} ({self.scope})'
+
+
+@receiver(models.signals.pre_save, sender=TimeEntry)
+def remember_recorded_bank_hours(sender: TimeEntry, instance: TimeEntry, **kwargs: Any) -> None:
+    if hasattr(instance, '_recorded_bank_hours'):
+        return
+    instance._recorded_bank_hours = (
+        None
+        if instance.pk is None
+        else TimeEntry.objects.filter(pk=instance.pk).values_list('resource_id', 'date', 'bank_to', 'bank_from').first()
+    )
+
+
+# NOTE: connected before `record_bank_hours`, which replaces the recorded date
+@receiver(models.signals.post_save, sender=TimeEntry)
+def invalidate_time_entry_reports(sender: TimeEntry, instance: TimeEntry, **kwargs: Any) -> None:
+    days = [(instance.resource_id, instance.date)]
+    if previous := instance._recorded_bank_hours:
+        resource_id, date, _deposits, _withdrawals = previous
+        days.append((resource_id, date))
+    report_cache.invalidate_days(days)
+
+
+@receiver(models.signals.post_delete, sender=TimeEntry)
+def invalidate_deleted_time_entry_reports(sender: TimeEntry, instance: TimeEntry, **kwargs: Any) -> None:
+    report_cache.invalidate(instance.resource_id, instance.date, instance.date)
+
+
+@receiver(models.signals.post_save, sender=TimeEntry)
+def record_bank_hours(sender: TimeEntry, instance: TimeEntry, **kwargs: Any) -> None:
+    previous, current = instance._recorded_bank_hours, instance._bank_hours_record()
+    if previous != current:
+        if previous:
+            resource_id, date, deposits, withdrawals = previous
+            BankHoursCheckpoint.objects.record(resource_id, date, -deposits, -withdrawals)
+        BankHoursCheckpoint.objects.record(*current)
+    instance._recorded_bank_hours = current
+
+
+@receiver(models.signals.post_delete, sender=TimeEntry)
+def revert_bank_hours(sender: TimeEntry, instance: TimeEntry, **kwargs: Any) -> None:
+    recorded = getattr(instance, '_recorded_bank_hours', None) or instance._bank_hours_record()
+    resource_id, date, deposits, withdrawals = recorded
+    # the checkpoint is already gone if the resource is being deleted
+    BankHoursCheckpoint.objects.record(resource_id, date, -deposits, -withdrawals, create=False)
+    instance._recorded_bank_hours = None
+
+
 class ExtraHoliday(models.Model):
     period = DateRangeField(help_text=_('N.B.: End date is the day after the actual end date'))
     # see https://holidays.readthedocs.io/en/latest/
@@ -775,3 +1510,21 @@ class ExtraHoliday(models.Model):
         super().clean()
         if self.period.upper < self.period.lower + datetime.timedelta(days=1):
             raise ValidationError({'period': 'End date must be at least one day after start date.'})
+
+
+@receiver(models.signals.post_save, sender=ExtraHoliday)
+def index_extra_holiday(sender: ExtraHoliday, instance: ExtraHoliday, **kwargs: Any) -> None:
+    transaction.on_commit(partial(extra_holiday_index.update, instance))
+
+
+@receiver(models.signals.post_delete, sender=ExtraHoliday)
+def unindex_extra_holiday(sender: ExtraHoliday, instance: ExtraHoliday, **kwargs: Any) -> None:
+    transaction.on_commit(partial(extra_holiday_index.discard, instance.pk))
+
+
+@receiver(models.signals.post_save, sender=ExtraHoliday)
+@receiver(models.signals.post_delete, sender=ExtraHoliday)
+def invalidate_extra_holiday_reports(sender: ExtraHoliday, instance: ExtraHoliday, **kwargs: Any) -> None:
+    period = instance.period
+    lower, upper = (period[0], period[1]) if isinstance(period, list | tuple) else (period.lower, period.upper)
+    report_cache.invalidate(None, lower, KrmDay(upper).date - datetime.timedelta(days=1))
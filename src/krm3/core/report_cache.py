@@ -0,0 +1,314 @@
+"""Cache of the report outputs, invalidated through model signals.
+
+Reports are rebuilt from scratch on every page load, while the data
+behind them changes far less often. Each cached output remembers the
+generation of every dependency it was built from: the months of the
+resources it shows, or of all the resources. The signals of the models
+feeding the reports bump the generations of the resources and months
+they touch, so an output is served only until one of them changes.
+
+The generations are bumped once the change is committed: an output
+built by another process in the meantime, from the data as it was,
+is never served afterwards.
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import uuid
+from functools import partial
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import get_language
+
+from krm3.utils.dates import KrmDay
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Collection, Iterable, Iterator
+
+    from django.core.cache.backends.base import BaseCache
+
+_PREFIX = 'krm3:report'
+
+# bumped whenever the cached outputs, and the stored report artifacts, can
+# no longer be loaded, e.g. when the classes they pickle change their layout
+FORMAT_VERSION = 2
+
+# the dependency owners - any resource, no resource in particular
+# (e.g. extra holidays), a specific resource
+_ANY = 'any'
+_GLOBAL = 'global'
+
+
+class ReportCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    invalidations: int
+
+
+class OutputCollector[T]:
+    """The items of a streamed report output, kept as they are yielded to store them once all are built.
+
+    Only outputs of up to `settings.REPORT_CACHE_MAX_ITEMS` items are
+    kept, so the memory the collector takes is bounded: the items of a
+    longer output are dropped as soon as the limit is exceeded, and the
+    output is not stored.
+    """
+
+    def __init__(self) -> None:
+        self.items: list[T] | None = []
+        self._limit = getattr(settings, 'REPORT_CACHE_MAX_ITEMS', 0)
+
+    def __call__(self, items: Iterable[T]) -> Iterator[T]:
+        """Yield the items, keeping them while within the limit."""
+        for item in items:
+            if self.items is not None:
+                self.items.append(item)
+                if self._limit and len(self.items) > self._limit:
+                    self.items = None
+            yield item
+
+
+class ReportCache:
+    """Cache of the report outputs, see the module docstring.
+
+    The cache backend is the `settings.REPORT_CACHE` alias, but for the
+    fragments kept in the `settings.REPORT_FRAGMENT_CACHE` one, and the
+    outputs expire after `settings.REPORT_CACHE_TIMEOUT` seconds.
+    """
+
+    @property
+    def _cache(self) -> BaseCache:
+        return caches[getattr(settings, 'REPORT_CACHE', 'default')]
+
+    @property
+    def _fragment_cache(self) -> BaseCache:
+        return caches[getattr(settings, 'REPORT_FRAGMENT_CACHE', 'default')]
+
+    def get_or_build[T](  # noqa: PLR0913
+        self,
+        report: str,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        resource_ids: Collection[int] | None,
+        build: Callable[[], T],
+        **filters: Any,
+    ) -> T:
+        """Return the output of a report, from the cache if none of its data changed.
+
+        :param report: the name of the report
+        :param from_date: the first day of the report (inclusive)
+        :param to_date: the last day of the report (inclusive)
+        :param resource_ids: the ids of the only resources the report may
+          show, `None` if it may show any resource
+        :param build: computes the report output
+        :param filters: any other parameter affecting the report output
+        :return: the report output.
+        """
+        key, generations, entry = self._lookup(report, from_date, to_date, resource_ids, filters)
+        if entry is not None:
+            return entry[1]
+
+        output = build()
+        self._store(key, generations, output)
+        return output
+
+    def iter_or_build[T](  # noqa: PLR0913
+        self,
+        report: str,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        resource_ids: Collection[int] | None,
+        build: Callable[[], Iterable[T]],
+        **filters: Any,
+    ) -> Iterator[T]:
+        """Yield the items of a report output, like `get_or_build()` without waiting for the whole output.
+
+        On a miss, the items are yielded as soon as `build` produces
+        them, and their list is cached once they are all built; the
+        output is the same list `get_or_build()` caches. The list is
+        only kept while within `settings.REPORT_CACHE_MAX_ITEMS` items,
+        see `OutputCollector`: longer outputs are streamed, not cached.
+
+        :param report: the name of the report
+        :param from_date: the first day of the report (inclusive)
+        :param to_date: the last day of the report (inclusive)
+        :param resource_ids: the ids of the only resources the report may
+          show, `None` if it may show any resource
+        :param build: produces the items of the report output
+        :param filters: any other parameter affecting the report output
+        :return: the items of the report output.
+        """
+        key, generations, entry = self._lookup(report, from_date, to_date, resource_ids, filters)
+        if entry is not None:
+            yield from entry[1]
+            return
+
+        collected = OutputCollector()
+        yield from collected(build())
+        if collected.items is not None:
+            self._store(key, generations, collected.items)
+
+    def get_or_build_fragment(
+        self,
+        fragment: str,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        resource_id: int,
+        build: Callable[[], str],
+        **filters: Any,
+    ) -> str:
+        """Return a fragment of a report output showing a single resource, like `get_or_build()`.
+
+        Fragments are not counted in the `stats()`, which are about whole
+        report outputs.
+
+        :param fragment: the name of the fragment
+        :param from_date: the first day of the fragment (inclusive)
+        :param to_date: the last day of the fragment (inclusive)
+        :param resource_id: the id of the resource the fragment shows
+        :param build: computes the fragment
+        :param filters: any other parameter affecting the fragment
+        :return: the fragment.
+        """
+        cache = self._fragment_cache
+        key, generations, entry = self._lookup(
+            fragment, from_date, to_date, [resource_id], filters, count=False, outputs=cache
+        )
+        if entry is not None:
+            return entry[1]
+
+        output = build()
+        self._store(key, generations, output, cache)
+        return output
+
+    def invalidate(
+        self,
+        resource_id: int | None,
+        from_date: datetime.date | str | None = None,
+        to_date: datetime.date | str | None = None,
+    ) -> None:
+        """Discard the cached outputs showing data of a resource in a date range, when the transaction commits.
+
+        :param resource_id: the resource whose data changed, `None` if the
+          change affects all the resources
+        :param from_date: the first day of the changed data (inclusive),
+          `None` together with `to_date` if the change affects any day
+        :param to_date: the last day of the changed data (inclusive)
+        """
+        owners = [_ANY, _GLOBAL if resource_id is None else _resource(resource_id)]
+        if from_date is None or to_date is None:
+            keys = [_generation_key(owner) for owner in owners]
+        else:
+            from_date, to_date = KrmDay(from_date).date, KrmDay(to_date).date
+            keys = [_generation_key(owner, month) for owner in owners for month in _months(from_date, to_date)]
+        transaction.on_commit(partial(self._bump, keys))
+
+    def invalidate_days(self, days: Iterable[tuple[int, datetime.date | str]]) -> None:
+        """Discard the cached outputs showing data of resources on given days, when the transaction commits.
+
+        :param days: the resource id and date of each changed day
+        """
+        ranges: dict[int, tuple[datetime.date, datetime.date]] = {}
+        for resource_id, day in days:
+            date = KrmDay(day).date
+            lower, upper = ranges.get(resource_id, (date, date))
+            ranges[resource_id] = (min(lower, date), max(upper, date))
+        for resource_id, (from_date, to_date) in ranges.items():
+            self.invalidate(resource_id, from_date, to_date)
+
+    def stats(self) -> ReportCacheStats:
+        """Return the hit, miss and invalidation counts, across all processes sharing the cache."""
+        names = ReportCacheStats._fields
+        counts = self._cache.get_many([f'{_PREFIX}:stats:{name}' for name in names])
+        return ReportCacheStats(*(counts.get(f'{_PREFIX}:stats:{name}', 0) for name in names))
+
+    def _lookup(  # noqa: PLR0913
+        self,
+        report: str,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        resource_ids: Collection[int] | None,
+        filters: dict[str, Any],
+        *,
+        count: bool = True,
+        outputs: BaseCache | None = None,
+    ) -> tuple[str, list[str | None], tuple[list[str | None], Any] | None]:
+        """Return the cache key of a report, the current generations of its dependencies and its valid entry.
+
+        The entry is read from the `outputs` cache, the report cache by default.
+        """
+        owners = [_ANY] if resource_ids is None else [_GLOBAL, *(_resource(pk) for pk in sorted(resource_ids))]
+        dependencies = [key for owner in owners for key in _generation_keys(owner, from_date, to_date)]
+        key = _entry_key(report, from_date, to_date, owners, filters)
+
+        cache = self._cache
+        if outputs is None or outputs is cache:
+            found = cache.get_many([key, *dependencies])
+        else:
+            found = cache.get_many(dependencies) | outputs.get_many([key])
+        if missing := [dependency for dependency in dependencies if dependency not in found]:
+            for dependency in missing:
+                cache.add(dependency, uuid.uuid4().hex, timeout=None)
+            found |= cache.get_many(missing)
+        # NOTE: read before building, so that an output built while its
+        #       data changes is never served afterwards
+        generations = [found.get(dependency) for dependency in dependencies]
+
+        entry = found.get(key)
+        hit = entry is not None and entry[0] == generations
+        if count:
+            self._count('hits' if hit else 'misses')
+        return key, generations, entry if hit else None
+
+    def _bump(self, keys: list[str]) -> None:
+        self._cache.set_many({key: uuid.uuid4().hex for key in keys}, timeout=None)
+        self._count('invalidations')
+
+    def _store(self, key: str, generations: list[str | None], output: Any, cache: BaseCache | None = None) -> None:
+        cache = self._cache if cache is None else cache
+        cache.set(key, (generations, output), timeout=getattr(settings, 'REPORT_CACHE_TIMEOUT', None))
+
+    def _count(self, name: str) -> None:
+        key = f'{_PREFIX}:stats:{name}'
+        cache = self._cache
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, timeout=None):
+                cache.incr(key)
+
+
+def _resource(resource_id: int) -> str:
+    return f'resource-{resource_id}'
+
+
+def _generation_key(owner: str, month: datetime.date | None = None) -> str:
+    return f'{_PREFIX}:generation:{owner}' if month is None else f'{_PREFIX}:generation:{owner}:{month:%Y-%m}'
+
+
+def _generation_keys(owner: str, from_date: datetime.date, to_date: datetime.date) -> list[str]:
+    return [_generation_key(owner), *(_generation_key(owner, month) for month in _months(from_date, to_date))]
+
+
+def _months(from_date: datetime.date, to_date: datetime.date) -> list[datetime.date]:
+    months = []
+    month = from_date.replace(day=1)
+    while month <= to_date:
+        months.append(month)
+        month = (month + datetime.timedelta(days=32)).replace(day=1)
+    return months
+
+
+def _entry_key(
+    report: str, from_date: datetime.date, to_date: datetime.date, owners: list[str], filters: dict[str, Any]
+) -> str:
+    params = repr((from_date, to_date, owners, get_language(), sorted(filters.items())))
+    return f'{_PREFIX}:output:v{FORMAT_VERSION}:{report}:{hashlib.sha256(params.encode()).hexdigest()}'
+
+
+report_cache = ReportCache()
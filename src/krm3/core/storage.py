@@ -2,6 +2,7 @@
 
 from django.conf import settings
 from django.core.files.storage import FileSystemStorage
+from django.utils.functional import cached_property
 
 from krm3.core.exceptions import PrivateMediaDirectUrlError
 
@@ -25,11 +26,29 @@ class PrivateMediaStorage(FileSystemStorage):
     """
 
     def __init__(self, *args, **kwargs) -> None:
-        """Initialize storage with private media settings."""
-        kwargs['location'] = settings.PRIVATE_MEDIA_ROOT
-        kwargs['base_url'] = settings.PRIVATE_MEDIA_URL
+        """Initialize storage with private media settings, read when first used."""
+        kwargs.pop('location', None)
+        kwargs.pop('base_url', None)
         super().__init__(*args, **kwargs)
 
+    @cached_property
+    def base_location(self) -> str:
+        return settings.PRIVATE_MEDIA_ROOT
+
+    @cached_property
+    def base_url(self) -> str:
+        url = settings.PRIVATE_MEDIA_URL
+        return url if url.endswith('/') else f'{url}/'
+
+    def _clear_cached_properties(self, setting: str, **kwargs) -> None:
+        """Follow the changes of the private media settings, like the default storage follows the media ones."""
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == 'PRIVATE_MEDIA_ROOT':
+            self.__dict__.pop('base_location', None)
+            self.__dict__.pop('location', None)
+        elif setting == 'PRIVATE_MEDIA_URL':
+            self.__dict__.pop('base_url', None)
+
     def url(self, name: str) -> str:
         """Raise an error to prevent direct URL access.
 
@@ -0,0 +1,50 @@
+"""Management command to verify or rebuild the bank hours ledger.
+
+The ledger keeps the bank hours deposited and withdrawn by each resource
+in monthly checkpoints, updated on every time entry save and delete.
+This command compares it against the aggregate of all the time entries.
+"""
+
+from __future__ import annotations
+
+import djclick as click
+
+from krm3.core.models import BankHoursCheckpoint, Resource
+
+
+@click.command()
+@click.option(
+    '--rebuild',
+    is_flag=True,
+    default=False,
+    help='Recompute the ledger from the time entries before verifying it.',
+)
+@click.option(
+    '--resource',
+    'resource_ids',
+    type=int,
+    multiple=True,
+    help='Only process the resource with this id. Can be repeated.',
+)
+def command(rebuild: bool, resource_ids: tuple[int, ...]) -> None:
+    """Verify the bank hours ledger, optionally rebuilding it first.
+
+    Exits with status 1 if any checkpoint does not match the time entries.
+    """
+    resources = Resource.objects.filter(pk__in=resource_ids) if resource_ids else None
+
+    if rebuild:
+        written = BankHoursCheckpoint.objects.rebuild(resources)
+        click.echo(f'Rebuilt {written} checkpoints.')
+
+    mismatches = BankHoursCheckpoint.objects.mismatches(resources)
+    if mismatches:
+        click.echo(f'Mismatches ({len(mismatches)}):')
+        for (resource_id, month), (expected, actual) in sorted(mismatches.items()):
+            click.echo(
+                f'  - resource {resource_id}, {month:%Y-%m}: '
+                f'expected +{expected[0]} -{expected[1]}, recorded +{actual[0]} -{actual[1]}'
+            )
+        raise SystemExit(1)
+
+    click.echo('The bank hours ledger is consistent.')
@@ -0,0 +1,38 @@
+"""Management command to run the export jobs queued in the database.
+
+See `krm3.core.export_jobs`.
+"""
+
+from __future__ import annotations
+
+import djclick as click
+from django.conf import settings
+
+from krm3.core import export_jobs
+
+
+@click.command()
+@click.option(
+    '--workers',
+    type=int,
+    default=lambda: settings.EXPORT_JOB_WORKERS,
+    show_default='EXPORT_JOB_WORKERS',
+    help='Number of worker processes, 0 to run the jobs in this process.',
+)
+@click.option(
+    '--once',
+    is_flag=True,
+    default=False,
+    help='Exit as soon as the queue is empty, instead of waiting for more jobs.',
+)
+@click.option(
+    '--poll-interval',
+    type=float,
+    default=lambda: settings.EXPORT_JOB_POLL_INTERVAL,
+    show_default='EXPORT_JOB_POLL_INTERVAL',
+    help='Seconds to wait before checking the queue again when it is empty.',
+)
+def command(workers: int, once: bool, poll_interval: float) -> None:
+    """Run the queued export jobs in a pool of worker processes."""
+    count = export_jobs.serve(workers, once=once, poll_interval=poll_interval)
+    click.echo(f'Ran {count} export jobs.')
@@ -84,6 +84,10 @@ def command(  # noqa: PLR0912, PLR0913, C901
 
         configure_dirs(prompt, verbosity)
 
+        if verbosity >= 1:
+            click.echo('Run system checks')
+        call_command('check')
+
         if static:
             if verbosity == 1:
                 click.echo('Run collectstatic')
@@ -93,6 +97,7 @@ def command(  # noqa: PLR0912, PLR0913, C901
             if verbosity >= 1:
                 click.echo('Run migrations')
             call_command('migrate', **extra)
+            call_command('createcachetable', verbosity=extra['verbosity'])
 
         if i18n:
             if verbosity >= 1:
@@ -0,0 +1,167 @@
+"""Query statistics of a sample of the requests, to spot the N+1-heavy ones in production.
+
+The statistics of a sampled request are attached to the Sentry
+transaction of the request, logged as a warning when over the thresholds
+and, to staff users only or in DEBUG, sent back in the `Server-Timing`
+header:
+
+- QUERY_STATS_SAMPLE_RATE: the fraction of the requests measured
+- QUERY_STATS_MAX_QUERIES, QUERY_STATS_MAX_DB_TIME, QUERY_STATS_MAX_DUPLICATES,
+  QUERY_STATS_MAX_WALL_TIME: the thresholds, seconds for the times, 0 to disable one
+
+Requests are only measured while the QUERY_STATS_ENABLED flag is on.
+"""
+
+import contextlib
+import logging
+import random
+import time
+import typing
+from collections import Counter
+from collections.abc import Iterator
+
+import sentry_sdk
+from django.conf import settings
+from django.db import connections
+from flags.state import flag_enabled
+
+from krm3.utils.queries import fingerprint
+
+if typing.TYPE_CHECKING:
+    from django.http import HttpRequest
+    from django.http.response import HttpResponseBase
+    from sentry_sdk.tracing import Transaction
+
+    GetResponse = typing.Callable[[HttpRequest], HttpResponseBase]
+
+logger = logging.getLogger(__name__)
+
+# repeated queries detailed in the log
+_TOP_DUPLICATES = 3
+
+
+class QueryStats:
+    """The queries run while recording, installed as an execute wrapper of the connections."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self._sql: Counter[str] = Counter()
+
+    def __call__(self, execute, sql, params, many, context):  # noqa: ANN001, ANN204
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+            self._sql[sql] += 1
+
+    def start(self) -> None:
+        for connection in connections.all():
+            connection.execute_wrappers.append(self)
+
+    def stop(self) -> None:
+        for connection in connections.all():
+            with contextlib.suppress(ValueError):
+                connection.execute_wrappers.remove(self)
+
+    @property
+    def wall_time(self) -> float:
+        return time.perf_counter() - self.started
+
+    def duplicates(self) -> Counter[str]:
+        """Count the executions of the fingerprints run more than once, the most repeated first."""
+        # NOTE: the SQL has placeholders unless the ORM inlined the values, so
+        #       only the distinct statements need a fingerprint
+        counts: Counter[str] = Counter()
+        for sql, count in self._sql.items():
+            counts[fingerprint(sql)] += count
+        return Counter({sql: count for sql, count in counts.most_common() if count > 1})
+
+    def server_timing(self) -> str:
+        duplicated = sum(self.duplicates().values())
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries ({duplicated} repeated)",'
+            f' app;dur={self.wall_time * 1000:.1f}'
+        )
+
+
+class QueryStatsMiddleware:
+    def __init__(self, get_response: 'GetResponse') -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: 'HttpRequest') -> 'HttpResponseBase':
+        # NOTE: sampling first keeps the flag lookup, a query, off most requests
+        if random.random() >= settings.QUERY_STATS_SAMPLE_RATE or not flag_enabled(  # noqa: S311
+            'QUERY_STATS_ENABLED', request=request
+        ):
+            return self.get_response(request)
+
+        stats = QueryStats()
+        transaction = sentry_sdk.Hub.current.scope.transaction
+        stats.start()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            stats.stop()
+            raise
+
+        if settings.DEBUG or getattr(getattr(request, 'user', None), 'is_staff', False):
+            response['Server-Timing'] = stats.server_timing()
+        if response.streaming:
+            # the content runs more queries as it is sent, after the headers
+            response.streaming_content = self._record_streaming(request, response.streaming_content, stats, transaction)
+            # NOTE: a response closed before its content is read, e.g. when
+            #       the client disconnects, never runs `_record_streaming()`
+            response._resource_closers.append(stats.stop)
+        else:
+            stats.stop()
+            self._report(request, stats, transaction)
+        return response
+
+    def _record_streaming(
+        self, request: 'HttpRequest', content: Iterator[bytes], stats: QueryStats, transaction: 'Transaction | None'
+    ) -> Iterator[bytes]:
+        try:
+            yield from content
+        finally:
+            stats.stop()
+            self._report(request, stats, transaction)
+
+    def _report(self, request: 'HttpRequest', stats: QueryStats, transaction: 'Transaction | None') -> None:
+        duplicates = stats.duplicates()
+        data = {
+            'path': request.path,
+            'method': request.method,
+            'queries': stats.queries,
+            'db_time': round(stats.db_time, 4),
+            'duplicated_queries': sum(duplicates.values()),
+            'wall_time': round(stats.wall_time, 4),
+        }
+        if transaction is not None:
+            for key in ('queries', 'db_time', 'duplicated_queries', 'wall_time'):
+                transaction.set_data(f'krm3.{key}', data[key])
+
+        exceeded = [
+            name
+            for name, value, threshold in (
+                ('queries', stats.queries, settings.QUERY_STATS_MAX_QUERIES),
+                ('db_time', stats.db_time, settings.QUERY_STATS_MAX_DB_TIME),
+                ('duplicates', max(duplicates.values(), default=0), settings.QUERY_STATS_MAX_DUPLICATES),
+                ('wall_time', stats.wall_time, settings.QUERY_STATS_MAX_WALL_TIME),
+            )
+            if threshold and value > threshold
+        ]
+        if exceeded:
+            data['exceeded'] = exceeded
+            data['top_duplicates'] = [
+                {'sql': sql[:200], 'count': count} for sql, count in duplicates.most_common(_TOP_DUPLICATES)
+            ]
+            logger.warning(
+                f'{request.method} {request.path} over the query thresholds ({", ".join(exceeded)}):'
+                f' {stats.queries} queries in {stats.db_time:.3f}s, {data["duplicated_queries"]} repeated,'
+                f' {stats.wall_time:.3f}s in all',
+                extra={'query_stats': data},
+            )
@@ -17,7 +17,7 @@ from django_tables2.export import TableExport
 
 from krm3.missions.admin.expenses import ExpenseInline
 from krm3.missions.forms import ReimbursementAdminForm
-from krm3.core.models import Mission, Reimbursement, Expense, Resource, ExpenseCategory
+from krm3.core.models import Mission, Reimbursement, Expense, ExportJob, Resource, ExpenseCategory
 from krm3.missions.tables import ReimbursementExpenseExportTable, ReimbursementExpenseTable
 from krm3.missions.utilities import calculate_reimbursement_summaries, ReimbursementSummaryEnum
 from krm3.styles.buttons import NORMAL
@@ -177,6 +177,8 @@ class ReimbursementAdmin(ACLMixin, ExtraButtonsMixin, AdminFiltersMixin):
         expenses = ReimbursementExpenseTable(qs, order_by=['day'])
 
         if export_format := request.GET.get('_export', None):
+            if request.GET.get('_background') and TableExport.is_valid_format(export_format):
+                return self.enqueue_export(request, reimbursement, export_format)
             expenses = ReimbursementExpenseExportTable(qs, order_by=['day'])
             return self.export_table(reimbursement, expenses, export_format, request)
         expenses = ReimbursementExpenseTable(qs, order_by=['day'])
@@ -215,6 +217,22 @@ class ReimbursementAdmin(ACLMixin, ExtraButtonsMixin, AdminFiltersMixin):
             )
         return None
 
+    def enqueue_export(self, request: HttpRequest, reimbursement: Reimbursement, export_format: str) -> HttpResponse:
+        """Queue the export of the reimbursement expenses, to be run in the background."""
+        job = ExportJob.objects.enqueue(
+            request.user,
+            ExportJob.Kind.REIMBURSEMENT_EXPENSES,
+            reimbursement=reimbursement.pk,
+            format=export_format,
+        )
+        self.message_user(
+            request,
+            format_html(
+                'Export queued, follow its progress <a href="{}">here</a>.', reverse('export-job', args=[job.pk])
+            ),
+        )
+        return redirect(request.path)
+
     @admin.action(description='Reimbursement report')
     def report(self, request: HttpRequest, queryset: QuerySet[Reimbursement]) -> TemplateResponse:
         """View reimbursement report."""
@@ -0,0 +1,26 @@
+"""Reimbursement exports running in the background, see `krm3.core.export_jobs`."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from django_tables2.export import TableExport
+
+from krm3.core.models import Reimbursement
+from krm3.missions.tables import ReimbursementExpenseExportTable
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from krm3.core.models import ExportJob
+
+
+def export_reimbursement_expenses(job: ExportJob, on_progress: Callable[[int, int], None]) -> tuple[str, bytes]:
+    """Export the expenses of a reimbursement in the format given in the job parameters."""
+    reimbursement = Reimbursement.objects.get(pk=job.params['reimbursement'])
+    export_format = job.params['format']
+    table = ReimbursementExpenseExportTable(reimbursement.expenses.all(), order_by=['day'])
+    content = TableExport(export_format, table).export()
+    if isinstance(content, str):
+        content = content.encode()
+    return f'reimbursement_{reimbursement.year}_{reimbursement.number}_expenses.{export_format}', content
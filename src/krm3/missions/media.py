@@ -1,10 +1,11 @@
 import typing
 
 if typing.TYPE_CHECKING:
-    from krm3.core.models import Mission, Contract
+    from krm3.core.models import Mission, Contract, ExportJob
 
 EXPENSES_IMAGE_PREFIX = 'missions/expenses'
 CONTRACT_DOCUMENT_PREFIX = 'contracts/documents'
+EXPORT_PREFIX = 'exports'
 
 
 def mission_directory_path(instance: 'Mission', filename: str) -> str:
@@ -15,3 +16,8 @@ def mission_directory_path(instance: 'Mission', filename: str) -> str:
 def contract_directory_path(instance: 'Contract', filename: str) -> str:
     # file will be uploaded to MEDIA_ROOT/contracts/documents/R<resource_id>/C<contract_id>/<filename>
     return f'{CONTRACT_DOCUMENT_PREFIX}/R{instance.resource.id}/C{instance.id}/{filename}'
+
+
+def export_directory_path(instance: 'ExportJob', filename: str) -> str:
+    # file will be uploaded to MEDIA_ROOT/exports/U<user_id>/J<job_id>/<filename>
+    return f'{EXPORT_PREFIX}/U{instance.user_id}/J{instance.id}/{filename}'
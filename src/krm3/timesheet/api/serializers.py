@@ -1,8 +1,11 @@
-from collections.abc import Iterable, Mapping
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
 import datetime
+import json
 from decimal import Decimal
 from typing import Any, override
 
+from constance import config
 from django.db import IntegrityError
 from django.urls.base import reverse
 from django.utils.translation import gettext_lazy as _
@@ -12,11 +15,25 @@ from rest_framework import exceptions, serializers
 
 from krm3.core.models.contracts import Contract
 from krm3.core.models.projects import Task
-from krm3.core.models.timesheets import SpecialLeaveReason, TimeEntryQuerySet, TimesheetSubmission, TimeEntry
+from krm3.core.models.timesheets import ClearedTimeEntries, SpecialLeaveReason, TimesheetSubmission, TimeEntry
 from krm3.timesheet import dto, utils
 
 type Hours = Decimal | float | int
 
+# hours summed up for each day of the timesheet, in the serialized order
+_DAY_TOTALS = (
+    'day_shift_hours',
+    'night_shift_hours',
+    'on_call_hours',
+    'travel_hours',
+    'holiday_hours',
+    'leave_hours',
+    'rest_hours',
+    'sick_hours',
+    'bank_from',
+    'bank_to',
+)
+
 
 class BaseTimeEntrySerializer(serializers.ModelSerializer):
     class Meta:
@@ -137,6 +154,28 @@ class TimeEntryCreateSerializer(BaseTimeEntrySerializer):
         )
         return entry
 
+    def create_many(self, dates: Sequence[datetime.date], *, autofill: bool = False) -> list[TimeEntry]:
+        """Create or update the validated time entry on each of the dates at once.
+
+        :param dates: the days to log the entry on, in place of the validated date
+        :param autofill: whether to log the hours still due on each day as day shift hours
+        :raises django.core.exceptions.ValidationError: with the errors of each invalid day, by ISO date
+        :return: the created and updated entries.
+        """
+        validated_data = dict(self.validated_data)
+        validated_data.pop('date', None)
+        resource = validated_data.pop('resource')
+        task = validated_data.pop('task', None)
+        reason = validated_data.pop('special_leave_reason', None)
+        for date in dates:
+            self._verify_reason_is_valid(reason, date)
+
+        entries = TimeEntry.objects.bulk_log(
+            resource, dates, validated_data, task=task, special_leave_reason=reason, autofill=autofill
+        )
+        self.instance = entries[-1] if entries else None
+        return entries
+
     def _verify_reason_is_valid(
         self, reason: SpecialLeaveReason | None, date: datetime.date
     ) -> SpecialLeaveReason | None:
@@ -156,6 +195,17 @@ class TimeEntryCreateSerializer(BaseTimeEntrySerializer):
         return reason
 
 
+class ClearedTimeEntriesSerializer(serializers.Serializer):
+    """Summary of the time entries deleted by `TimeEntryQuerySet.bulk_clear()`."""
+
+    entries = serializers.IntegerField()
+    bank_deposits = serializers.IntegerField()
+    days = serializers.SerializerMethodField()
+
+    def get_days(self, obj: ClearedTimeEntries) -> list[dict[str, Any]]:
+        return [{'resource': resource_id, 'date': date.isoformat()} for resource_id, date in obj.days]
+
+
 class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
@@ -206,15 +256,30 @@ class TimesheetSerializer(serializers.Serializer):
         return TimesheetTaskSerializer(timesheet.tasks, context={'requestor': timesheet.requested_by}, many=True).data
 
     def get_days(self, timesheet: dto.TimesheetDTO) -> dict[str, dict[str, bool]]:
-        days_result = {}
-
-        timesheet_submissions = TimesheetSubmission.objects.filter(resource=timesheet.resource)
+        days = list(timesheet.days)
+        if not days:
+            return {}
+
+        # NOTE: the time entries queryset is shared with the `time_entries`
+        #       field, so it is evaluated only once
+        time_entries_by_day = defaultdict(list)
+        for entry in timesheet.time_entries:
+            time_entries_by_day[entry.date].append(entry)
+        contracts = list(timesheet.contracts)
+        timesheet_submissions = list(
+            TimesheetSubmission.objects.filter(
+                resource=timesheet.resource,
+                period__overlap=(days[0].date, days[-1].date + datetime.timedelta(days=1)),
+            ).order_by('pk')
+        )
+        default_schedule = json.loads(config.DEFAULT_RESOURCE_SCHEDULE)
 
-        for day in timesheet.days:
-            timesheet_submission = timesheet_submissions.filter(period__contains=day.date).first()
+        days_result = {}
+        for day in days:
+            timesheet_submission = _first_covering(timesheet_submissions, day.date)
             this_day_data = {'closed': timesheet_submission is not None and timesheet_submission.closed}
 
-            contract = timesheet.contracts.filter(period__contains=day.date).first()
+            contract = _first_covering(contracts, day.date)
 
             if contract and contract.country_calendar_code:
                 this_day_data['hol'] = day.is_holiday(contract.country_calendar_code)
@@ -228,26 +293,18 @@ class TimesheetSerializer(serializers.Serializer):
                 'sun' if is_non_working_day else day.day_of_week_short.casefold()
             )
 
-            this_day_time_entries = timesheet.time_entries.filter(date=day.date)
-            this_day_data['day_shift_hours'] = float(sum(entry.day_shift_hours for entry in this_day_time_entries))
-            this_day_data['night_shift_hours'] = float(sum(entry.night_shift_hours for entry in this_day_time_entries))
-            this_day_data['on_call_hours'] = float(sum(entry.on_call_hours for entry in this_day_time_entries))
-            this_day_data['travel_hours'] = float(sum(entry.travel_hours for entry in this_day_time_entries))
-            this_day_data['holiday_hours'] = float(sum(entry.holiday_hours for entry in this_day_time_entries))
-            this_day_data['leave_hours'] = float(sum(entry.leave_hours for entry in this_day_time_entries))
-            this_day_data['rest_hours'] = float(sum(entry.rest_hours for entry in this_day_time_entries))
-            this_day_data['sick_hours'] = float(sum(entry.sick_hours for entry in this_day_time_entries))
-
-            bank_from = sum(entry.bank_from for entry in this_day_time_entries)
-            bank_to = sum(entry.bank_to for entry in this_day_time_entries)
-            this_day_data['bank_from'] = float(bank_from)
-            this_day_data['bank_to'] = float(bank_to)
+            this_day_time_entries = time_entries_by_day[day.date]
+            totals = dict.fromkeys(_DAY_TOTALS, 0)
+            for entry in this_day_time_entries:
+                for field in _DAY_TOTALS:
+                    totals[field] += getattr(entry, field)
+            this_day_data.update((field, float(total)) for field, total in totals.items())
 
             special_leave_hours, special_leave_reason = self._get_special_leave_data(this_day_time_entries)
             this_day_data['special_leave_hours'] = 0.0 if special_leave_hours is None else float(special_leave_hours)
             this_day_data['special_leave_reason'] = special_leave_reason
 
-            due_hours = self._get_due_hours(contract, day)
+            due_hours = self._get_due_hours(contract, day, default_schedule)
             overtime = utils.overtime(this_day_time_entries, due_hours)
             this_day_data['overtime'] = 0.0 if overtime is None else float(overtime)
 
@@ -255,18 +312,24 @@ class TimesheetSerializer(serializers.Serializer):
 
         return days_result
 
-    def _get_special_leave_data(self, time_entries: TimeEntryQuerySet) -> tuple[Decimal, str] | tuple[None, None]:
-        try:
-            entry = time_entries.special_leaves().get()
-        except (TimeEntry.DoesNotExist, TimeEntry.MultipleObjectsReturned):
+    def _get_special_leave_data(self, time_entries: Iterable[TimeEntry]) -> tuple[Decimal, str] | tuple[None, None]:
+        # NOTE: `in_special_leaves` is annotated by `TimeEntryQuerySet.with_special_leave_flag()`
+        special_leaves = [entry for entry in time_entries if entry.in_special_leaves]
+        if len(special_leaves) != 1:
             return (None, None)
 
+        entry = special_leaves[0]
         return (entry.special_leave_hours, entry.special_leave_reason.title)
 
-    def _get_due_hours(self, contract: Contract | None, day: Krm3Day) -> Decimal:
+    def _get_due_hours(self, contract: Contract | None, day: Krm3Day, default_schedule: dict) -> Decimal:
         if contract:
-            return contract.get_due_hours(day.date)
-        return Contract.get_default_schedule(day)
+            return contract.get_due_hours(day.date, default_schedule)
+        return Contract.get_default_schedule(day, default_schedule)
+
+
+def _first_covering[T: (Contract, TimesheetSubmission)](objs: Iterable[T], date: datetime.date) -> T | None:
+    """Return the first of the objects whose `period` contains the date."""
+    return next((obj for obj in objs if date in obj.period), None)
 
 
 class StartEndDateRangeField(serializers.Field):
@@ -1,23 +1,24 @@
 import datetime
-from collections.abc import Iterable, Sequence
+from collections.abc import Iterable, Mapping, Sequence
 from typing import TYPE_CHECKING, Any, cast, override
 
 from django.core import exceptions as django_exceptions
 from django.db import transaction
-from django.db.models import BooleanField, ExpressionWrapper, Q, QuerySet
+from django.db.models import QuerySet
 from django.utils.translation import gettext as _
 from drf_spectacular.utils import OpenApiExample, OpenApiParameter, OpenApiResponse, extend_schema
-from rest_framework import mixins, permissions, status, viewsets
+from rest_framework import mixins, permissions, serializers, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from krm3.core.models import Contract, Resource
+from krm3.core.models import Resource
 from krm3.core.models.timesheets import SpecialLeaveReason, TimeEntry, TimeEntryQuerySet
 from krm3.events import Event
 from krm3.events.dispatcher import EventDispatcher
 from krm3.timesheet.api.serializers import (
     BaseTimeEntrySerializer,
+    ClearedTimeEntriesSerializer,
     SpecialLeaveReasonSerializer,
     TimeEntryCreateSerializer,
     TimeEntryReadSerializer,
@@ -32,9 +33,8 @@ if TYPE_CHECKING:
 
 class _TimeEntryCreationFailure(Exception):
     @override
-    def __init__(self, time_entry_date: str, messages: Iterable) -> None:
-        self.time_entry_date = time_entry_date
-        self.messages = messages
+    def __init__(self, messages_by_date: Mapping[str, Iterable]) -> None:
+        self.messages_by_date = messages_by_date
 
 
 class TimesheetAPIViewSet(viewsets.GenericViewSet):
@@ -181,7 +181,7 @@ class TimeEntryAPIViewSet(viewsets.ModelViewSet):
         if resource.user != request.user and not cast('User', request.user).has_any_perm('core.manage_any_timesheet'):
             return Response(status=status.HTTP_403_FORBIDDEN)
 
-        if not isinstance(dates, list):
+        if not isinstance(dates, list) or not dates:
             return Response(data={'error': 'List of dates required.'}, status=status.HTTP_400_BAD_REQUEST)
 
         # normalize keys for the serializer
@@ -193,7 +193,13 @@ class TimeEntryAPIViewSet(viewsets.ModelViewSet):
                 headers = self._create_time_entries(request, resource, dates)
             except _TimeEntryCreationFailure as e:
                 return Response(
-                    data={'error': f'Invalid time entry for {e.time_entry_date}: {"; ".join(e.messages)}.'},
+                    data={
+                        'error': ' '.join(
+                            f'Invalid time entry for {date}: {"; ".join(messages)}.'
+                            for date, messages in e.messages_by_date.items()
+                        ),
+                        'errors': e.messages_by_date,
+                    },
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
@@ -202,6 +208,9 @@ class TimeEntryAPIViewSet(viewsets.ModelViewSet):
     def _create_time_entries(self, request: Request, resource: Resource, dates: Sequence[str]) -> dict[str, str]:
         """Generate new time entries for the `resource`.
 
+        All the dates are validated together and the entries are written
+        in bulk, see `TimeEntryQuerySet.bulk_log()`.
+
         :param request: the API request
         :param resource: the resource requesting to log hours in the timesheet
         :param dates: the dates for which the resource is logging hours
@@ -214,27 +223,24 @@ class TimeEntryAPIViewSet(viewsets.ModelViewSet):
         if is_day_entry and len(dates) == 1:
             TimeEntry.objects.filter(resource_id=resource.pk, task__isnull=is_day_entry, date__in=dates).delete()
 
-        for formatted_date in dates:
-            time_entry_data = request.data.copy()
-            time_entry_data.setdefault('date', formatted_date)
-            date = datetime.date.fromisoformat(formatted_date)
+        time_entry_data = request.data.copy()
+        time_entry_data.setdefault('date', dates[0])
+        autofill = bool(request.data.get('autofill', False))
+        if autofill:
+            # replaced by the hours still due on each day
+            time_entry_data['day_shift_hours'] = 0
 
-            if request.data.get('autofill', False):
-                contract = Contract.objects.get(
-                    resource=resource,
-                    period__overlap=(date, date + datetime.timedelta(days=1) if date else None),
-                )
-                if contract:
-                    time_entry_data['day_shift_hours'] = contract.get_remaining_due_hours(
-                        date, time_entry_data.get('task')
-                    )
-
-            serializer = self.get_serializer(data=time_entry_data, context={'request': request})
-            if serializer.is_valid(raise_exception=True):
-                try:
-                    self.perform_create(serializer)
-                except django_exceptions.ValidationError as e:
-                    raise _TimeEntryCreationFailure(time_entry_date=formatted_date, messages=e.messages) from e
+        serializer = cast('TimeEntryCreateSerializer', self.get_serializer(data=time_entry_data))
+        serializer.is_valid(raise_exception=True)
+        try:
+            parsed_dates = [serializer.fields['date'].run_validation(formatted_date) for formatted_date in dates]
+        except serializers.ValidationError as e:
+            raise serializers.ValidationError({'date': e.detail}) from e
+
+        try:
+            serializer.create_many(parsed_dates, autofill=autofill)
+        except django_exceptions.ValidationError as e:
+            raise _TimeEntryCreationFailure(e.message_dict) from e
 
         if request.data.get('holiday_hours'):
             self.notify_holiday(resource, dates)
@@ -249,12 +255,7 @@ class TimeEntryAPIViewSet(viewsets.ModelViewSet):
         if not isinstance(requested_entry_ids, list):
             return Response(data={'error': 'Time entry ids must be in a list.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        entries: TimeEntryQuerySet = (
-            self.get_queryset()
-            .filter(pk__in=requested_entry_ids)
-            .annotate(task_is_not_null=ExpressionWrapper(Q(task__isnull=False), output_field=BooleanField()))
-            .order_by('task_is_not_null')
-        )  # pyright: ignore[reportAssignmentType]
+        entries = cast('TimeEntryQuerySet', self.get_queryset().filter(pk__in=requested_entry_ids))
 
         if not cast('User', request.user).has_any_perm('core.manage_any_timesheet'):
             # since we already ACL-filtered the queryset, we need to
@@ -278,11 +279,9 @@ class TimeEntryAPIViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        with transaction.atomic():
-            for entry in entries:
-                entry.delete()
+        summary = entries.bulk_clear()
 
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(ClearedTimeEntriesSerializer(summary).data, status=status.HTTP_200_OK)
 
     def check_modify_allowed(self, request: Request) -> Response | None:
         """Check if TimeEntry can be modified by user and it is not belonging to a submitted Timesheet."""
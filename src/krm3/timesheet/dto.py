@@ -31,9 +31,17 @@ class TimesheetDTO:
     def fetch(self, resource: Resource, start_date: datetime.date, end_date: datetime.date) -> Self:
         """Fetch the resource timesheet for a specific date interval."""
         task_qs = Task.objects.filter_acl(self.requested_by) if self.requested_by else Task.objects.all()
-        self.tasks = task_qs.active_between(start_date, end_date).assigned_to(resource=resource)
+        self.tasks = (
+            task_qs.active_between(start_date, end_date)
+            .assigned_to(resource=resource)
+            .select_related('project__client')
+        )
         te_qs = TimeEntry.objects.filter_acl(self.requested_by) if self.requested_by else TimeEntry.objects.all()
-        self.time_entries = te_qs.filter(resource=resource, date__range=(start_date, end_date))
+        self.time_entries = (
+            te_qs.filter(resource=resource, date__range=(start_date, end_date))
+            .select_related('task', 'special_leave_reason')
+            .with_special_leave_flag()
+        )
 
         self.contracts = Contract.objects.filter(
             resource=resource, period__overlap=ranges.DateRange(start_date, end_date)
@@ -44,7 +52,7 @@ class TimesheetDTO:
         self.days = calendar.iter_dates(start_date, end_date)
         self.resource = resource
 
-        self.schedule = resource.get_schedule(start_date, end_date)
+        self.schedule = Resource.objects.schedules([resource], start_date, end_date)[resource.pk]
 
         conf: ConstanceTyping = config
         self.timesheet_colors.update(
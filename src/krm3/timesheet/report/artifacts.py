@@ -0,0 +1,171 @@
+"""Persistent artifacts of the reports of fully closed months.
+
+Once every resource has closed its timesheet for a month, the reports
+for that month can no longer change: their output is stored as a
+`ReportArtifact` and served as it is, until a submission for the month
+is reopened or deleted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import pickle
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from django.utils.translation import get_language
+
+from krm3.core.models import Contract, ReportArtifact, TimesheetSubmission
+from krm3.core.report_cache import FORMAT_VERSION, OutputCollector
+
+if TYPE_CHECKING:
+    import datetime
+    from collections.abc import Callable, Iterable, Iterator
+
+    from krm3.core.models import User
+    from krm3.timesheet.report.base import TimesheetReport
+
+
+def get_or_build[T](  # noqa: PLR0913
+    kind: ReportArtifact.Kind,
+    from_date: datetime.date,
+    to_date: datetime.date,
+    user: User,
+    build: Callable[[], T],
+    *,
+    dumps: Callable[[T], bytes] = pickle.dumps,
+    loads: Callable[[bytes], T] = pickle.loads,
+    **filters: Any,
+) -> T:
+    """Return the output of a monthly report, from its artifact if possible.
+
+    The output is built and stored as an artifact when all the resources
+    visible to the user have closed their timesheets for the month.
+
+    :param kind: the kind of report
+    :param from_date: the first day of the month
+    :param to_date: the last day of the month
+    :param user: the user requesting the report
+    :param build: computes the report output
+    :param dumps: serializes the report output
+    :param loads: deserializes the report output
+    :param filters: any other parameter affecting the report output
+    :return: the report output.
+    """
+    scope = get_scope(user, **filters)
+    if (content := ReportArtifact.objects.fetch(kind, from_date, scope)) is not None:
+        return loads(content)
+
+    # NOTE: checking before building, so that a submission reopened in
+    #       the meantime does not leave a stale artifact behind
+    closed = TimesheetSubmission.objects.are_closed(from_date, to_date, _get_resource_ids(from_date, to_date, user))
+    output = build()
+    if closed:
+        ReportArtifact.objects.store(kind, from_date, scope, dumps(output))
+    return output
+
+
+def iter_or_build[T](  # noqa: PLR0913
+    kind: ReportArtifact.Kind,
+    from_date: datetime.date,
+    to_date: datetime.date,
+    user: User,
+    build: Callable[[], Iterable[T]],
+    **filters: Any,
+) -> Iterator[T]:
+    """Yield the items of a monthly report output, like `get_or_build()` without waiting for the whole output.
+
+    On a miss, the items are yielded as soon as `build` produces them,
+    and their list is stored as an artifact once they are all built, if
+    the month is closed and the output is within
+    `settings.REPORT_CACHE_MAX_ITEMS` items, see `OutputCollector`.
+
+    :param kind: the kind of report
+    :param from_date: the first day of the month
+    :param to_date: the last day of the month
+    :param user: the user requesting the report
+    :param build: produces the items of the report output
+    :param filters: any other parameter affecting the report output
+    :return: the items of the report output.
+    """
+    scope = get_scope(user, **filters)
+    if (content := ReportArtifact.objects.fetch(kind, from_date, scope)) is not None:
+        yield from pickle.loads(content)  # noqa: S301
+        return
+
+    closed = TimesheetSubmission.objects.are_closed(from_date, to_date, _get_resource_ids(from_date, to_date, user))
+    collected = OutputCollector()
+    yield from collected(build())
+    if closed and collected.items is not None:
+        ReportArtifact.objects.store(kind, from_date, scope, pickle.dumps(collected.items))
+
+
+def get_report_blocks[T](  # noqa: PLR0913
+    report: type[TimesheetReport],
+    kind: ReportArtifact.Kind,
+    from_date: datetime.date,
+    to_date: datetime.date,
+    user: User,
+    *,
+    build: Callable[[bool], Iterable[T]],
+    progressive: bool,
+    **filters: Any,
+) -> Iterable[T]:
+    """Return the blocks of an online monthly report, from the report cache, its artifact or `build` in this order.
+
+    :param report: the report class, whose name keys the report cache
+    :param kind: the kind of report
+    :param from_date: the first day of the month
+    :param to_date: the last day of the month
+    :param user: the user requesting the report
+    :param build: produces the blocks, as they are built if passed `True`
+    :param progressive: whether the blocks are yielded as they are built
+    :param filters: any other parameter affecting the report output
+    :return: the blocks of the report.
+    """
+    if progressive:
+        return report.iter_cached(
+            from_date,
+            to_date,
+            user,
+            lambda: iter_or_build(kind, from_date, to_date, user, partial(build, True), **filters),
+            **filters,
+        )
+    return report.get_cached(
+        from_date,
+        to_date,
+        user,
+        lambda: get_or_build(kind, from_date, to_date, user, partial(build, False), **filters),
+        **filters,
+    )
+
+
+def get_scope(user: User, **filters: Any) -> str:
+    """Return the key telling apart the outputs of the same report for different users.
+
+    The filters may come from the query string, so the key is a digest
+    of a fixed length.
+
+    :param user: the user requesting the report
+    :param filters: any other parameter affecting the report output
+    :return: the format version and the digest of the resources visible
+      to the user, the language and the filters.
+    """
+    if _can_view_any_timesheet(user):
+        resources = 'all'
+    else:
+        resource = user.get_resource()
+        resources = f'resource-{resource.pk if resource else None}'
+    params = repr((resources, get_language(), sorted(filters.items())))
+    return f'v{FORMAT_VERSION}:{hashlib.sha256(params.encode()).hexdigest()}'
+
+
+def _get_resource_ids(from_date: datetime.date, to_date: datetime.date, user: User) -> set[int]:
+    if _can_view_any_timesheet(user):
+        return set(Contract.objects.active_between(from_date, to_date).values_list('resource', flat=True))
+    resource = user.get_resource()
+    return {resource.pk} if resource else set()
+
+
+def _can_view_any_timesheet(user: User) -> bool:
+    return user.has_any_perm('core.manage_any_timesheet', 'core.view_any_timesheet')
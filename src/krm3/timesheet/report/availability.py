@@ -1,4 +1,4 @@
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 import datetime
 from decimal import Decimal
 from enum import Enum
@@ -8,7 +8,7 @@ from dateutil.relativedelta import relativedelta
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 
-from krm3.core.models import Project, Resource
+from krm3.core.models import Project, Resource, TimeEntryTotals
 from krm3.timesheet.report.base import TimesheetReport
 from krm3.timesheet.report.online import ReportBlock, ReportRow
 from krm3.timesheet.rules import Krm3Day
@@ -32,11 +32,22 @@ ABSENCE_SHOW_HOURS = {
 
 class AvailabilityReport(TimesheetReport):
     def __init__(
-        self, from_date: datetime.date, to_date: datetime.date, user: User, project: str | None = None
+        self,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        user: User,
+        project: str | None = None,
+        *,
+        streaming: bool | None = None,
     ) -> None:
         self.project = Project.objects.get(id=project) if project else None
-        super().__init__(from_date, to_date, user)
-        self._enrich_calendars_with_availability_data()
+        super().__init__(from_date, to_date, user, streaming=streaming)
+
+    @override
+    @classmethod
+    def get_resource_scope(cls, user: User, **kwargs) -> set[int] | None:
+        # all the resources are shown to any user
+        return None
 
     @override
     def _get_resources(self, user: User, **kwargs) -> Iterable[Resource]:
@@ -54,16 +65,10 @@ class AvailabilityReport(TimesheetReport):
 
         return qs.distinct()
 
-    def _enrich_calendars_with_availability_data(self) -> None:
-        """Add availability/absence data to existing calendar days."""
-        for resource_id, calendar_days in self.calendars.items():
-            for kd in calendar_days:
-                self._calculate_availability_for_day(kd, resource_id)
-
-    def _calculate_availability_for_day(self, kd: Krm3Day, resource_id: int) -> None:
+    @override
+    @staticmethod
+    def _enrich_day(kd: Krm3Day, day_entries: list[TimeEntryTotals]) -> None:
         """Calculate availability status for a specific day."""
-        day_entries = [te for te in self.time_entries if te.resource.pk == resource_id and te.date == kd.date]
-
         absences = {}
 
         for te in day_entries:
@@ -94,20 +99,31 @@ class AvailabilityReportOnline(AvailabilityReport):
 
     def report_html(self) -> list[ReportBlock]:
         """Return a single ReportBlock containing all resources in one table."""
+        blocks = self.get_header_blocks()
+        for block in blocks:
+            block.rows.extend(self.iter_rows())
+        return blocks
+
+    def get_header_blocks(self) -> list[ReportBlock]:
+        """Return the block of the table with only its header row, none if there are no resources."""
         if not self.resources:
             return []
 
         block = ReportBlock(None)
+        block.rows.append(self.get_days_row())
+        return [block]
 
-        calendar_days = self.calendars[self.resources[0].id]
-
+    def get_days_row(self) -> ReportRow:
+        """Return the header row of the table, with the days of the report."""
         days_row = ReportRow()
         days_row.add_cell(_('Days'))
-        for kd in calendar_days:
+        for kd in Krm3Day(self.from_date).range_to(self.to_date):
             days_row.add_cell(f'{kd.day_of_week_short_i18n}\n{kd.date.day}')
-        block.rows.append(days_row)
+        return days_row
 
-        for resource in self.resources:
+    def iter_rows(self) -> Iterator[ReportRow]:
+        """Yield the row of each resource, as soon as it is built."""
+        for resource in self.iter_resources():
             resource_row = ReportRow()
             resource_name = f'{resource.first_name} {resource.last_name}'
             resource_row.add_cell(resource_name)
@@ -128,9 +144,6 @@ class AvailabilityReportOnline(AvailabilityReport):
 
                     cell_value = ', '.join(map(str,parts))
 
-                cell = resource_row.add_cell(cell_value)
-                cell.nwd = kd.nwd
+                resource_row.add_cell(cell_value, nwd=kd.nwd)
 
-            block.rows.append(resource_row)
-
-        return [block]
+            yield resource_row
@@ -1,24 +1,35 @@
 from __future__ import annotations
 
+import bisect
 import datetime
+import itertools
 import json
 from collections import defaultdict
-from decimal import Decimal
+from operator import attrgetter
 from typing import TYPE_CHECKING
 
 from constance import config
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
-from krm3.config import settings
-from krm3.core.models import Contract, Resource, TimeEntry, TimesheetSubmission, ExtraHoliday
+from krm3.core.extra_holidays import extra_holiday_index
+from krm3.core.report_cache import report_cache
+from krm3.core.models import Contract, Resource, TimeEntry, TimeEntryTotals, TimesheetSubmission
+from krm3.timesheet.report.calendars import CalendarRules, ContractTerms, ResourceDays, compute_calendars
 from krm3.timesheet.rules import Krm3Day
-from krm3.utils.dates import KrmDay, get_country_holidays
+from krm3.utils.dates import KrmDay
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Sequence
+
     from krm3.core.models import User as UserType
 
 
 type _SubmissionPeriodData = dict[int, list[tuple[datetime.date, datetime.date]]]
+type _TimeEntryIndex = dict[tuple[int, datetime.date], list[TimeEntryTotals]]
+
+# the order of the resources of a report in streaming mode
+_STREAMING_ORDER = ('last_name', 'first_name', 'pk')
 
 
 def get_i18n_mapping() -> dict:
@@ -38,27 +49,81 @@ def get_i18n_mapping() -> dict:
     }
 
 
+class _ContractLookup:
+    """Sorted interval index over the (non overlapping) contracts of a single resource."""
+
+    def __init__(self, contracts: list[Contract]) -> None:
+        self.contracts = sorted(contracts, key=lambda c: c.period_as_tuple()[0])
+        self.lowers = [c.period_as_tuple()[0] for c in self.contracts]
+
+    def get(self, date: datetime.date) -> Contract | None:
+        """Return the contract active on `date`, if any."""
+        idx = bisect.bisect_right(self.lowers, date) - 1
+        if idx >= 0 and self.contracts[idx].falls_in(date):
+            return self.contracts[idx]
+        return None
+
+
 class TimesheetReport:
     # TODO: consider changing this into an `enum.Flag`, or use marker mixins/traits
     need: set = set()  # allowed values: 'submissions', 'extra_holidays'
-
-    def __init__(self, from_date: datetime.date, to_date: datetime.date, user: UserType, **kwargs) -> None:
+    # whether the hours of each task are summed up separately,
+    # see `TimeEntryQuerySet.day_totals()`
+    totals_by_task: bool = False
+
+    def __init__(
+        self,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        user: UserType,
+        *,
+        streaming: bool | None = None,
+        **kwargs,
+    ) -> None:
+        """Load the data of the report.
+
+        In streaming mode, the data of each resource is only loaded when
+        `iter_resources()` gets to it, so that the memory needed does not
+        grow with the number of resources. The calendars of the resources
+        are then computed one at a time, never in a pool of processes.
+
+        :param from_date: the first day of the report
+        :param to_date: the last day of the report
+        :param user: the user requesting the report
+        :param streaming: whether to load the data one resource at a time;
+          by default, only for reports longer than
+          `settings.REPORT_STREAMING_DAYS`
+        :param kwargs: the report filters
+        """
         self.from_date = from_date
         self.to_date = to_date
+        if streaming is None:
+            streaming_days = getattr(settings, 'REPORT_STREAMING_DAYS', 0)
+            streaming = 0 < streaming_days < (to_date - from_date).days + 1
+        self.streaming = streaming
 
         self.valid_contracts = Contract.objects.active_between(from_date, to_date)  # pyright: ignore
         self.resources = self._get_resources(user, **kwargs)
+        if streaming:
+            # NOTE: the time entries are read in the same order, see `iter_resources()`
+            self.resources = [
+                *Resource.objects.filter(pk__in=[r.pk for r in self.resources if r]).order_by(*_STREAMING_ORDER)
+            ]
 
         self.default_schedule: dict[str, float] = json.loads(config.DEFAULT_RESOURCE_SCHEDULE)
 
-        self.time_entries = self._get_time_entries()
+        self.time_entries = [] if streaming else self._get_time_entries()
+        self.time_entries_by_day = self._index_time_entries()
 
         # loading submissions up front, no matter the flags passed in
         # `need`, allows us to access all the pre-computed data in their
-        # `timesheet` json field
+        # `timesheet` json field - except in streaming mode, where the
+        # field is loaded for one resource at a time
         self.submissions = TimesheetSubmission.objects.get_closed_in_period(
             self.from_date, self.to_date, resources=self.resources
         )
+        if streaming:
+            self.submissions = self.submissions.defer('timesheet')
         # TODO: get rid of this, only collect submissions
         self.submission_periods = self._get_submission_period_data()
 
@@ -66,14 +131,63 @@ class TimesheetReport:
 
         self.resource_contracts: dict[int, list[Contract]] = {}
         for contract in self.valid_contracts:
-            self.resource_contracts.setdefault(contract.resource.pk, []).append(contract)
+            self.resource_contracts.setdefault(contract.resource_id, []).append(contract)
             if contract.country_calendar_code and contract.country_calendar_code not in self.country_codes:
                 self.country_codes.add(contract.country_calendar_code)
 
         self.extra_holidays = self._get_extra_holidays() if 'extra_holidays' in self.need else {}
-        self._holiday_cache = {}
+        self.rules = CalendarRules(self.default_schedule, self.extra_holidays)
+
+        self.calendars = {} if streaming else self._get_calendars()
+
+    @classmethod
+    def get_cached[T](
+        cls, from_date: datetime.date, to_date: datetime.date, user: UserType, build: Callable[[], T], **kwargs
+    ) -> T:
+        """Return an output of this report, cached until the data it shows changes.
 
-        self.calendars = self._get_calendars()
+        See `krm3.core.report_cache` for the invalidation rules.
+
+        :param from_date: the first day of the report
+        :param to_date: the last day of the report
+        :param user: the user requesting the report
+        :param build: computes the report output
+        :param kwargs: the report filters, and any other parameter affecting the output
+        :return: the report output.
+        """
+        return report_cache.get_or_build(
+            cls.__name__, from_date, to_date, cls.get_resource_scope(user, **kwargs), build, **kwargs
+        )
+
+    @classmethod
+    def iter_cached[T](
+        cls,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        user: UserType,
+        build: Callable[[], Iterable[T]],
+        **kwargs,
+    ) -> Iterator[T]:
+        """Yield the items of a list output of this report, like `get_cached()` without waiting for all of them.
+
+        :param from_date: the first day of the report
+        :param to_date: the last day of the report
+        :param user: the user requesting the report
+        :param build: produces the items of the report output
+        :param kwargs: the report filters, and any other parameter affecting the output
+        :return: the items of the report output.
+        """
+        return report_cache.iter_or_build(
+            cls.__name__, from_date, to_date, cls.get_resource_scope(user, **kwargs), build, **kwargs
+        )
+
+    @classmethod
+    def get_resource_scope(cls, user: UserType, **kwargs) -> set[int] | None:
+        """Return the ids of the only resources the report may show to the user, `None` if it may show any."""
+        if user.has_any_perm('core.manage_any_timesheet', 'core.view_any_timesheet'):
+            return None
+        resource = user.get_resource()
+        return {resource.pk} if resource else set()
 
     def _get_resources(self, user: UserType) -> list[Resource]:
         if user.has_any_perm('core.manage_any_timesheet', 'core.view_any_timesheet'):
@@ -81,113 +195,164 @@ class TimesheetReport:
             return [*Resource.objects.filter(pk__in=active_resource_ids)]
         return [user.get_resource()]
 
-    def _get_holiday(self, day: KrmDay, country_calendar_code: str) -> bool:
-        """Return whether the day is holiday."""
-        if res := self._holiday_cache.get((day.date, country_calendar_code)):
-            return res
-        if (eh := self.extra_holidays.get(day)) and (
-            country_calendar_code in eh or country_calendar_code.split('-')[0] in eh
-        ):
-            hol = True
-        else:
-            cal = get_country_holidays(country_calendar_code=country_calendar_code)
-            hol = not cal.is_working_day(day.date)
-        return self._holiday_cache.setdefault((day.date, country_calendar_code), hol)
-
-    def _get_calendars(self) -> dict[int, list[Krm3Day]]:
+    def iter_resources(self) -> Iterator[Resource]:
+        """Yield the resources of the report, with their data loaded.
+
+        In streaming mode, the hours logged by the resources are read in
+        chunks through a server-side cursor, in the order of the
+        resources; the time entries and the calendar of each resource
+        replace the ones of the previous resource before it is yielded.
+        """
+        if not self.streaming:
+            yield from self.resources
+            return
+
+        totals = TimeEntry.objects.filter(
+            date__gte=self.from_date, date__lte=self.to_date, resource__in=[r.pk for r in self.resources]
+        ).iter_day_totals(by_task=self.totals_by_task, order_by=[f'resource__{f}' for f in _STREAMING_ORDER])
+        by_resource = itertools.groupby(totals, key=attrgetter('resource_id'))
+        current = next(by_resource, None)
+        for resource in self.resources:
+            entries = []
+            if current is not None and current[0] == resource.pk:
+                entries = [*current[1]]
+                current = next(by_resource, None)
+            self._load_resource(resource, entries)
+            yield resource
+
+    def _load_resource(self, resource: Resource, time_entries: list[TimeEntryTotals]) -> None:
+        """Load the data of a single resource, in streaming mode.
+
+        :param resource: the resource
+        :param time_entries: the hours logged by the resource in the report period
+        """
+        self.time_entries = time_entries
+        self.time_entries_by_day = self._index_time_entries()
+        self.calendars = self._get_calendars([resource])
+
+    def _get_calendars(self, resources: Sequence[Resource] | None = None) -> dict[int, list[Krm3Day]]:
         """Return the dict of KrmDay in the interval for the resource id.
 
         The KrmDay is enriched with:
         - min_working_hours: the float min number of working hours expected by the resource in the day
         - is_holiday: is overridden with a bool
+
+        Days already computed from a closed submission are kept as they are,
+        all the other days are computed from plain data by
+        `compute_calendars()`. Each day is then completed by
+        `_enrich_day()`.
+
+        :param resources: the resources to compute the calendars of, all
+          the resources of the report by default
         """
-        calendar_data: dict[int, list[Krm3Day]] = self._get_calendar_data_from_submissions()
-        for resource in self.resources:
+        resources = self.resources if resources is None else resources
+        submitted_data: dict[int, list[Krm3Day]] = self._get_calendar_data_from_submissions(resources)
+        dates = [kd.date for kd in KrmDay(self.from_date).range_to(self.to_date)]
+
+        entries: dict[int, dict[datetime.date, list[TimeEntryTotals]]] = defaultdict(dict)
+        for (resource_id, date), day_entries in self.time_entries_by_day.items():
+            entries[resource_id][date] = day_entries
+
+        terms: dict[int, ContractTerms] = {}
+        contracts: dict[int, dict[datetime.date, Contract | None]] = {}
+        submitted: dict[int, dict[datetime.date, Krm3Day]] = {}
+        to_compute: list[ResourceDays] = []
+        for resource in resources:
             resource_id = resource.pk
-            contracts: list[Contract] = self.resource_contracts.get(resource_id) or []
-
-            if resource_id not in calendar_data:
-                calendar_data[resource_id] = list(Krm3Day(self.from_date, resource=resource).range_to(self.to_date))
-
-            for calendar_day in KrmDay(self.from_date).range_to(self.to_date):
-                # XXX: highly inefficient!
-                if found := [day for day in calendar_data[resource_id] if day.date == calendar_day.date]:
-                    # NOTE: submission periods for the same resource are
-                    #       not allowed to overlap
-                    day = found[0]
-                    if day.submitted:
-                        continue
-
-                day.resource = resource
-                for c in contracts:
-                    if c.falls_in(day):
-                        day.contract = c
-                        break
-
-                country_calendar_code = (
-                    day.contract.country_calendar_code
-                    if day.contract and day.contract.country_calendar_code
-                    else str(settings.HOLIDAYS_CALENDAR)
-                )
-                day.holiday = self._get_holiday(day, country_calendar_code)
-                min_working_hours = self._get_min_working_hours(day)
-                day.nwd = day.contract is None or day.holiday or min_working_hours == 0
-                if not day.nwd:
-                    day.data_due_hours = Decimal(min_working_hours)
-                day.apply([te for te in self.time_entries if te.resource.pk == resource_id and te.date == day.date])
-
+            lookup = _ContractLookup(self.resource_contracts.get(resource_id) or [])
+            contracts[resource_id] = resource_contracts = {date: lookup.get(date) for date in dates}
+            # NOTE: submission periods for the same resource are
+            #       not allowed to overlap
+            submitted[resource_id] = submitted_days = {day.date: day for day in submitted_data.get(resource_id, [])}
+            days = []
+            for date in dates:
+                if date in submitted_days:
+                    continue
+                if (contract := resource_contracts[date]) is not None and contract.pk not in terms:
+                    terms[contract.pk] = ContractTerms.of(contract)
+                days.append((date, terms[contract.pk] if contract is not None else None))
+            to_compute.append(ResourceDays(resource_id, days, entries.get(resource_id, {})))
+
+        computed = compute_calendars(self.rules, type(self)._enrich_day, to_compute)
+
+        calendar_data: dict[int, list[Krm3Day]] = {}
+        for resource, resource_computed in zip(resources, computed, strict=True):
+            resource_id = resource.pk
+            submitted_days = submitted[resource_id]
+            computed_days = iter(resource_computed)
+            calendar_data[resource_id] = resource_days = []
+            for date in dates:
+                if (day := submitted_days.get(date)) is not None:
+                    self._enrich_day(day, self.get_day_entries(resource_id, date))
+                else:
+                    day = next(computed_days)
+                    day.resource = resource
+                    day.contract = contracts[resource_id][date]
+                    day.time_entries = self.get_day_entries(resource_id, date)
+                resource_days.append(day)
         return calendar_data
 
-    def _get_min_working_hours(self, kd: Krm3Day) -> float:
-        """Return the minimum working hours for a given day.
+    @staticmethod
+    def _enrich_day(day: Krm3Day, entries: list[TimeEntryTotals]) -> None:
+        """Add the data specific to a report to a calendar day.
+
+        Runs on the days computed by `compute_calendars()` and on the
+        submitted ones alike, so it must only read the day and its time
+        entries.
 
-        This function only takes working hours into account, disregarding
-        whether or not the day is a holiday or not. If you need to check
-        for holiday, you should do it at the call site.
+        :param day: the calendar day, with the time sheet rules applied
+        :param entries: the hours logged on the day, see `get_day_entries()`
         """
-        if kd.contract and kd.contract.working_schedule:
-            schedule = kd.contract.working_schedule
-        else:
-            schedule = self.default_schedule
-        return schedule[kd.day_of_week_short.lower()]
-
-    def _get_time_entries(self) -> list[TimeEntry]:
-        """Return a list of time entries, preloading their special leave reason if any."""
-        return list(
-            TimeEntry.objects.select_related('special_leave_reason').filter(
-                date__gte=self.from_date, date__lte=self.to_date, resource__in=self.resources
-            )
-        )
+
+    def get_day_entries(self, resource_id: int, date: datetime.date) -> list[TimeEntryTotals]:
+        """Return the hours logged by a resource on a given date.
+
+        The time entries of the day are summed up, separately for each
+        task if `totals_by_task` is set.
+        """
+        return self.time_entries_by_day.get((resource_id, date), [])
+
+    def _get_min_working_hours(self, kd: Krm3Day) -> float:
+        """Return the minimum working hours for a given day, see `CalendarRules.min_working_hours()`."""
+        return self.rules.min_working_hours(kd, kd.contract)
+
+    def _get_time_entries(self) -> list[TimeEntryTotals]:
+        """Return the hours logged in the report period, summed up by the database."""
+        return TimeEntry.objects.filter(
+            date__gte=self.from_date, date__lte=self.to_date, resource__in=self.resources
+        ).day_totals(by_task=self.totals_by_task)
+
+    def _index_time_entries(self) -> _TimeEntryIndex:
+        """Group the loaded totals by `(resource_id, date)`, preserving their order."""
+        index: _TimeEntryIndex = defaultdict(list)
+        for te in self.time_entries:
+            index[te.resource_id, te.date].append(te)
+        return dict(index)
 
     def _get_submission_period_data(self) -> _SubmissionPeriodData:
         submission_data = defaultdict(list)
         for ts in self.submissions:
-            submission_data[ts.resource.pk].append((ts.period.lower, ts.period.upper))
+            submission_data[ts.resource_id].append((ts.period.lower, ts.period.upper))
         return submission_data
 
     def _get_extra_holidays(self) -> dict[KrmDay, list[str]]:
         """Retrieve the extra holidays for the given country codes."""
-        short_codes = {x.split('-')[0] for x in self.country_codes}
         result = {}
-        extra_holidays = list(
-            ExtraHoliday.objects.filter(
-                country_codes__overlap=list(self.country_codes.union(short_codes)),
-                period__overlap=(self.from_date, self.to_date),
-            )
-        )
-        for eh in extra_holidays:
-            for kd in KrmDay(eh.period.lower).range_to(eh.period.upper - datetime.timedelta(days=1)):
-                result.setdefault(kd, []).extend(eh.country_codes)
+        for eh in extra_holiday_index.between(self.from_date, self.to_date, self.country_codes, include_country=True):
+            for date in eh.days():
+                result.setdefault(KrmDay(date), []).extend(eh.country_codes)
         return result
 
-    def _get_calendar_data_from_submissions(self) -> dict[int, list[Krm3Day]]:
-        calendar_data = defaultdict(list)
+    def _get_calendar_data_from_submissions(self, resources: Sequence[Resource]) -> dict[int, list[Krm3Day]]:
+        submissions = self.submissions
+        if self.streaming:
+            if not any(resource.pk in self.submission_periods for resource in resources):
+                return {}
+            submissions = submissions.filter(resource__in=resources).defer(None)
 
-        for submission in self.submissions:
-            calendar_data[submission.resource.pk].extend(
-                day_data
-                for day_data in Krm3Day.from_submission(submission)
-                if self.from_date <= day_data.date <= self.to_date
-            )
+        calendar_data = defaultdict(list)
+        for day_data in Krm3Day.from_submissions(submissions.select_related('resource')):
+            if self.from_date <= day_data.date <= self.to_date:
+                calendar_data[day_data.resource.pk].append(day_data)
 
         return calendar_data
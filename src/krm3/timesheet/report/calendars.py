@@ -0,0 +1,119 @@
+"""Computation of the report calendars.
+
+The calendar days are computed from plain data - dates, contract terms
+and time entry totals - without accessing the database; the report
+attaches the resources and contracts back to the computed days.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import TYPE_CHECKING, NamedTuple
+
+from django.conf import settings
+
+from krm3.timesheet.rules import Krm3Day
+from krm3.utils.dates import KrmDay, get_country_holidays
+
+if TYPE_CHECKING:
+    import datetime
+    from collections.abc import Callable, Sequence
+
+    from krm3.core.models import Contract, TimeEntryTotals
+
+    type DayEnricher = Callable[[Krm3Day, list[TimeEntryTotals]], None]
+
+
+class ContractTerms(NamedTuple):
+    """The fields of a `Contract` the calendar days are computed from."""
+
+    country_calendar_code: str
+    working_schedule: dict[str, float]
+    meal_voucher: dict[str, float]
+
+    @classmethod
+    def of(cls, contract: Contract) -> ContractTerms:
+        return cls(contract.country_calendar_code, contract.working_schedule, contract.meal_voucher)
+
+
+class ResourceDays(NamedTuple):
+    """The days of a resource to compute, with the contract terms and time entries of each."""
+
+    resource_id: int
+    days: list[tuple[datetime.date, ContractTerms | None]]
+    entries: dict[datetime.date, list[TimeEntryTotals]]
+
+
+class CalendarRules:
+    """The holidays and the default working schedule the calendar days are computed with."""
+
+    def __init__(self, default_schedule: dict[str, float], extra_holidays: dict[KrmDay, list[str]]) -> None:
+        self.default_schedule = default_schedule
+        self.extra_holidays = extra_holidays
+        self._holiday_cache: dict[tuple[datetime.date, str], bool] = {}
+
+    def is_holiday(self, day: KrmDay, country_calendar_code: str) -> bool:
+        """Return whether the day is holiday."""
+        if (res := self._holiday_cache.get((day.date, country_calendar_code))) is not None:
+            return res
+        if (eh := self.extra_holidays.get(day)) and (
+            country_calendar_code in eh or country_calendar_code.split('-')[0] in eh
+        ):
+            hol = True
+        else:
+            cal = get_country_holidays(country_calendar_code=country_calendar_code)
+            hol = not cal.is_working_day(day.date)
+        return self._holiday_cache.setdefault((day.date, country_calendar_code), hol)
+
+    def min_working_hours(self, day: KrmDay, contract: Contract | ContractTerms | None) -> float:
+        """Return the minimum working hours for a given day.
+
+        This function only takes working hours into account, disregarding
+        whether or not the day is a holiday or not. If you need to check
+        for holiday, you should do it at the call site.
+        """
+        schedule = contract.working_schedule if contract and contract.working_schedule else self.default_schedule
+        return schedule[day.day_of_week_short.lower()]
+
+    def compute_day(self, day: Krm3Day, contract: ContractTerms | None) -> None:
+        """Compute whether a day is holiday or non-working, and its due hours."""
+        country_calendar_code = (
+            contract.country_calendar_code
+            if contract and contract.country_calendar_code
+            else str(settings.HOLIDAYS_CALENDAR)
+        )
+        day.holiday = self.is_holiday(day, country_calendar_code)
+        min_working_hours = self.min_working_hours(day, contract)
+        day.nwd = contract is None or day.holiday or min_working_hours == 0
+        if not day.nwd:
+            day.data_due_hours = Decimal(min_working_hours)
+
+
+def compute_calendars(
+    rules: CalendarRules, enrich_day: DayEnricher, resources: Sequence[ResourceDays]
+) -> list[list[Krm3Day]]:
+    """Compute the days of the resources and apply the time sheet rules to them.
+
+    The `contract` of each day is set to its `ContractTerms`, to be
+    replaced by the `Contract` itself by the caller.
+
+    :param rules: the holidays and default schedule
+    :param enrich_day: adds the report specific data to a computed day
+    :param resources: the days to compute
+    :return: the computed days of each resource, in the same order as `resources`.
+    """
+    calendars = []
+    computed_days = []
+    for resource in resources:
+        calendars.append(resource_days := [])
+        for date, contract in resource.days:
+            day = Krm3Day(date)
+            day.contract = contract
+            rules.compute_day(day, contract)
+            resource_days.append(day)
+            computed_days.append((day, resource.entries.get(date, [])))
+
+    Krm3Day.apply_many(computed_days)
+    for day, entries in computed_days:
+        enrich_day(day, entries)
+    return calendars
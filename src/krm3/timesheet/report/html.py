@@ -0,0 +1,127 @@
+"""HTML rendering of the report blocks.
+
+A month of the resource report has about 30 cells per row and a dozen
+rows per resource, so rendering a block through template loops pushes
+a template context for every cell. The blocks are instead rendered by
+joining fragments formatted once per block, row and cell, producing the
+same markup as the former `partials/report_block.html` template.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from django.utils.html import conditional_escape
+from django.utils.safestring import SafeString, mark_safe
+from django.utils.translation import gettext
+
+from krm3.core.report_cache import report_cache
+
+from .online import NEGATIVE, NWD, ReportCell
+
+if TYPE_CHECKING:
+    from krm3.timesheet.rules import Krm3Day
+
+    from .online import ReportBlock, ReportRow
+
+_BLOCK_START = '<div class="report-container">\n<table class="report-table">\n<thead>\n'
+_BLOCK_END = '</tbody>\n</table>\n</div>\n'
+_NAME_ROW = '<tr class="table-header-row">\n<td class="row-header " colspan="2"><strong>{} - {}</strong> {}</td>\n'
+_HOLIDAY_CELL = '<td>X</td>\n'
+_DAY_CELL = '<td></td>\n'
+_DAYS_ROW = '<tr class="table-header-row">\n<td class="row-header">{} {}</td>\n<td>{}</td>\n'
+_DATE_CELL = '<td class="{}">\n<p>{}</p>\n<p>{}</p>\n</td>\n'
+_HEAD_END = '</tr>\n</thead>\n<tbody>\n'
+_ROW_START = '<tr class="row-data">\n<td class="row-header">{}</td>\n'
+_ROW_END = '</tr>\n'
+_CELLS = {
+    # the flags of a cell -> its markup
+    0: '<td class="cell-data ">{}</td>\n',
+    NWD: '<td class="cell-data non-workday">{}</td>\n',
+    NEGATIVE: '<td class="cell-data "><span class="text-red-500">{}</span></td>\n',
+    NWD | NEGATIVE: '<td class="cell-data non-workday"><span class="text-red-500">{}</span></td>\n',
+}
+_EMPTY_ROW = '<tr class="row-data">\n<td class="text-left" colspan="{}">{}</td>\n</tr>\n'
+
+
+def render_block(block: ReportBlock, counter: int) -> SafeString:
+    """Render the block of a resource in the resource report.
+
+    :param block: the block to render, its first row holding the number
+      of working days followed by the `Krm3Day`s of the report
+    :param counter: the position of the block in the report, starting at 1
+    :return: the HTML of the block.
+    """
+    header, *rows = block.rows
+    days: list[Krm3Day] = header.values[1:]
+    resource = block.resource
+    parts = [
+        _BLOCK_START,
+        _NAME_ROW.format(counter, conditional_escape(resource.last_name), conditional_escape(resource.first_name)),
+    ]
+    parts.extend(_HOLIDAY_CELL if day.holiday else _DAY_CELL for day in days)
+    parts.append(_ROW_END)
+    parts.append(_DAYS_ROW.format(gettext('Days'), _render(header.values[0]), gettext('Total HH')))
+    parts.extend(
+        _DATE_CELL.format(
+            f'{"" if day.nwd else "workday"} {"" if day.submitted else "pending"}',
+            conditional_escape(day.day_of_week_short_i18n),
+            day.date.day,
+        )
+        for day in days
+    )
+    parts.append(_HEAD_END)
+
+    for row in rows:
+        parts.append(_ROW_START.format(_render(row.values[0])))
+        parts.extend(_render_cells(row))
+        parts.append(_ROW_END)
+    if not rows:
+        parts.append(_EMPTY_ROW.format(block.width, gettext('No time entries available')))
+    parts.append(_BLOCK_END)
+    return mark_safe(''.join(parts))  # noqa: S308
+
+
+def render_block_cached(block: ReportBlock, counter: int) -> SafeString:
+    """Render the block of a resource like `render_block()`, reusing the HTML as long as its data is unchanged.
+
+    The HTML is cached in the report fragment cache, and discarded as
+    soon as the data of the resource in the days of the block changes.
+
+    :param block: the block to render
+    :param counter: the position of the block in the report, starting at 1
+    :return: the HTML of the block.
+    """
+    days: list[Krm3Day] = block.rows[0].values[1:]
+    resource = block.resource
+    if resource is None or resource.pk is None or not days:
+        return render_block(block, counter)
+    html = report_cache.get_or_build_fragment(
+        'report_block',
+        days[0].date,
+        days[-1].date,
+        resource.pk,
+        lambda: str(render_block(block, counter)),
+        counter=counter,
+        name=(resource.last_name, resource.first_name),
+    )
+    return mark_safe(html)  # noqa: S308
+
+
+def _render_cells(row: ReportRow) -> list[str]:
+    cells = []
+    for index in range(1, len(row.values)):
+        value = row.values[index]
+        if isinstance(value, ReportCell):
+            flags = (NWD if getattr(value, 'nwd', False) else 0) | (NEGATIVE if value.negative else 0)
+        else:
+            flags = row.flags[index]
+        cells.append(_CELLS[flags].format(_render(value)))
+    return cells
+
+
+def _render(value: Any) -> str:
+    # same as `cell.render()`, escaped
+    if isinstance(value, ReportCell):
+        return conditional_escape(value.render())
+    return conditional_escape(str(value)) if value else ''
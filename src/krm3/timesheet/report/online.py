@@ -1,8 +1,15 @@
+import operator
+from collections.abc import Iterator, Sequence
+from decimal import Decimal
 from typing import override, Any
 
 from krm3.core.models import Resource
 from krm3.utils.numbers import normal as normalized
 
+# the flags of a cell, stored in a `ReportRow` column
+NWD = 0x01
+NEGATIVE = 0x02
+
 
 class UiElement:
     def __init__(self, **kwargs: dict) -> None:
@@ -38,16 +45,121 @@ class ResourceCell(ReportCell):
         )
 
 
+class CellView:
+    """A cell of a `ReportRow`, reading and writing the columns of the row.
+
+    Views are created on access and hold no data of their own, so a
+    report keeps one value and one byte of flags per cell instead of an
+    object per cell.
+    """
+
+    __slots__ = ('_index', '_row')
+
+    def __init__(self, row: 'ReportRow', index: int) -> None:
+        self._row = row
+        self._index = index
+
+    @property
+    def value(self) -> Any:
+        return self._row.values[self._index]
+
+    @value.setter
+    def value(self, value: Any) -> None:
+        self._row.set_value(self._index, value)
+
+    @property
+    def nwd(self) -> bool:
+        return bool(self._row.flags[self._index] & NWD)
+
+    @nwd.setter
+    def nwd(self, nwd: bool) -> None:
+        self._row.set_flag(self._index, NWD, nwd)
+
+    @property
+    def negative(self) -> bool:
+        """Return True if the cell value is negative."""
+        return bool(self._row.flags[self._index] & NEGATIVE)
+
+    def render(self) -> str:
+        if value := self.value:
+            return str(value)
+        return ''
+
+
+class ReportCells(Sequence[ReportCell | CellView]):
+    """The cells of a `ReportRow`, as a sequence of views over its columns."""
+
+    __slots__ = ('_row',)
+
+    def __init__(self, row: 'ReportRow') -> None:
+        self._row = row
+
+    def __len__(self) -> int:
+        return len(self._row.values)
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self._row.cell(i) for i in range(len(self))[index]]
+        return self._row.cell(operator.index(index))
+
+    def __iter__(self) -> Iterator[ReportCell | CellView]:
+        return (self._row.cell(i) for i in range(len(self)))
+
+
 class ReportRow(UiElement):
+    """A row of a report table, stored as columns of cell values and flags.
+
+    Cells added as `ReportCell` objects are kept as they are in `values`,
+    e.g. to render them differently; for any other value, `cells` gives
+    a `CellView` over the `values` and `flags` (see `NWD` and `NEGATIVE`)
+    columns.
+    """
+
     def __init__(self, **kwargs: dict) -> None:
         super().__init__(**kwargs)
-        self.cells: list[ReportCell] = []
+        self.values: list[Any] = []
+        self.flags = bytearray()
 
-    def add_cell(self, cell: ReportCell | Any, **kwargs: dict) -> ReportCell:
-        if not isinstance(cell, ReportCell):
-            cell = ReportCell(cell, **kwargs)
-        self.cells.append(cell)
-        return cell
+    @property
+    def cells(self) -> ReportCells:
+        return ReportCells(self)
+
+    def cell(self, index: int) -> ReportCell | CellView:
+        """Return the cell at `index`, as it was added or as a view over the columns."""
+        if isinstance(value := self.values[index], ReportCell):
+            return value
+        return CellView(self, index % len(self.values))
+
+    def add_cell(self, cell: ReportCell | Any, **kwargs: dict) -> ReportCell | CellView:
+        self.values.append(cell)
+        if isinstance(cell, ReportCell):
+            self.flags.append(0)
+            return cell
+
+        self.flags.append((NWD if kwargs.pop('nwd', False) else 0) | (NEGATIVE if _is_negative(cell) else 0))
+        view = CellView(self, len(self.values) - 1)
+        for k, v in kwargs.items():
+            setattr(view, k, v)
+        return view
+
+    def set_value(self, index: int, value: Any) -> None:
+        self.values[index] = value
+        self.set_flag(index, NEGATIVE, _is_negative(value))
+
+    def set_flag(self, index: int, flag: int, on: bool) -> None:
+        if on:
+            self.flags[index] |= flag
+        else:
+            self.flags[index] &= ~flag
+
+
+def _is_negative(value: Any) -> bool:
+    # same as `ReportCell.negative`, without normalizing numbers to strings
+    if isinstance(value, str):
+        return value.startswith('-')
+    if isinstance(value, int | float | Decimal):
+        return Decimal(value).is_signed()
+    return False
 
 
 class ReportBlock(UiElement):
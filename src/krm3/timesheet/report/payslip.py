@@ -1,12 +1,13 @@
 import decimal
 import typing
+from collections.abc import Iterator
 
 from django.utils.translation import gettext_lazy as _
 
 from krm3.utils.numbers import normal
 
 from .base import TimesheetReport, get_i18n_mapping
-from .online import ReportBlock, ReportCell, ReportRow
+from .online import ReportBlock, ReportRow
 
 if typing.TYPE_CHECKING:
     from krm3.timesheet.rules import Krm3Day
@@ -16,9 +17,12 @@ class TimesheetReportOnline(TimesheetReport):
     need = {'submissions', 'extra_holidays'}
 
     def report_html(self) -> list[ReportBlock]:
-        blocks = []
-        for resource in self.resources:
-            blocks.append(block := ReportBlock(resource))
+        return [*self.iter_blocks()]
+
+    def iter_blocks(self) -> Iterator[ReportBlock]:
+        """Yield the block of each resource, as soon as it is built."""
+        for resource in self.iter_resources():
+            block = ReportBlock(resource)
             row = block.add_row(ReportRow())
             resources_report_days = self.calendars[resource.id]
             row.add_cell(sum([0 if kd.nwd else 1 for kd in resources_report_days]))
@@ -29,17 +33,17 @@ class TimesheetReportOnline(TimesheetReport):
                 for key, label in get_i18n_mapping().items():
                     row = block.add_row(ReportRow())
                     row.add_cell(label)
-                    row.add_cell(cell_tot_hh := ReportCell(decimal.Decimal(0)))
+                    cell_tot_hh = row.add_cell(None)
+                    total = decimal.Decimal(0)
                     for rkd in resources_report_days:
                         value = getattr(rkd, f'data_{key}')
-                        cell = row.add_cell(normal(value) if value != 0 else None)
-                        cell.nwd = rkd.nwd
-                        cell_tot_hh.value += decimal.Decimal(value) if value else decimal.Decimal(0)
-                    cell_tot_hh.value = normal(cell_tot_hh.value)
+                        row.add_cell(normal(value) if value != 0 else None, nwd=rkd.nwd)
+                        total += decimal.Decimal(value) if value else decimal.Decimal(0)
+                    cell_tot_hh.value = normal(total)
 
                 self._add_special_leaves(block)
                 self._add_sick_days(block)
-        return blocks
+            yield block
 
     def _add_special_leaves(self, block: ReportBlock) -> None:
         resources_report_days: list['Krm3Day'] = self.calendars[block.resource.id]
@@ -52,12 +56,13 @@ class TimesheetReportOnline(TimesheetReport):
         for title, sl_days in special_leave_days.items():
             row = ReportRow()
             row.add_cell(_('Special leave ({title})').format(title=title))
-            row.add_cell(cell_tot_hh := ReportCell(decimal.Decimal(0)))
+            cell_tot_hh = row.add_cell(None)
+            total = decimal.Decimal(0)
             for rkd in resources_report_days:
                 value = rkd.data_special_leave_hours if rkd in sl_days else ''
-                row.add_cell(normal(value)).nwd = rkd.nwd
-                cell_tot_hh.value += value or decimal.Decimal(0)
-            cell_tot_hh.value = normal(cell_tot_hh.value)
+                row.add_cell(normal(value), nwd=rkd.nwd)
+                total += value or decimal.Decimal(0)
+            cell_tot_hh.value = normal(total)
             block.rows.insert(len(block.rows) - 3, row)
 
     def _add_sick_days(self, block: ReportBlock) -> None:
@@ -72,12 +77,13 @@ class TimesheetReportOnline(TimesheetReport):
             sl_days = sick_days[title]
             row = ReportRow()
             row.add_cell(_('Sick {title}').format(title=title) if title != '' else _('Sick'))
-            row.add_cell(cell_tot_hh := ReportCell(decimal.Decimal(0)))
+            cell_tot_hh = row.add_cell(None)
+            total = decimal.Decimal(0)
             for rkd in resources_report_days:
                 value = rkd.data_sick if rkd in sl_days else ''
-                row.add_cell(normal(value)).nwd = rkd.nwd
-                cell_tot_hh.value += value or decimal.Decimal(0)
-            cell_tot_hh.value = normal(cell_tot_hh.value)
+                row.add_cell(normal(value), nwd=rkd.nwd)
+                total += value or decimal.Decimal(0)
+            cell_tot_hh.value = normal(total)
             block.rows.insert(len(block.rows) - 3, row)
 
         if not sick_days:
@@ -85,5 +91,5 @@ class TimesheetReportOnline(TimesheetReport):
             row.add_cell(_('Sick'))
             row.add_cell('0')
             for rkd in resources_report_days:
-                row.add_cell('').nwd = rkd.nwd
+                row.add_cell('', nwd=rkd.nwd)
             block.rows.insert(len(block.rows) - 3, row)
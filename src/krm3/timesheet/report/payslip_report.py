@@ -1,21 +1,21 @@
-from decimal import Decimal
-from typing import Protocol, override
+import datetime
+import io
+from collections.abc import Callable, Iterator
+from typing import Any, Protocol, override
 
 import openpyxl
 from django.utils.translation import gettext as _
+from openpyxl.cell import WriteOnlyCell
 
-from krm3.core.models import Resource, User
+from krm3.core.models import ExportJob, ReportArtifact, Resource, User
+from krm3.timesheet.report import artifacts
 from krm3.timesheet.report.base import TimesheetReport
+from krm3.timesheet.rules import Krm3Day
 from krm3.utils.numbers import safe_dec
-from krm3.web.report_styles import (
-    centered,
-    header_alignment,
-    header_fill,
-    header_font,
-    light_grey_fill,
-    nwd_fill,
-    thin_border,
-)
+from krm3.web.report_styles import get_named_styles
+
+# a sheet row, as the value and the named style of each cell
+type _Row = list[tuple[Any, str | None]]
 
 
 def get_report_timeentry_key_mapping() -> dict[str, str]:
@@ -42,136 +42,173 @@ class StreamWriter(Protocol):
 class TimesheetReportExport(TimesheetReport):
     need = {'extra_holidays'}
 
-    def write_excel(self, stream: StreamWriter, title: str) -> None:  # noqa: C901,PLR0912,PLR0915
-        mapping = get_report_timeentry_key_mapping()
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = title
-
+    @classmethod
+    def get_workbook(
+        cls,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        user: User,
+        title: str,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> bytes:
+        """Return the report as an Excel workbook, from the cache or the stored artifacts if possible.
+
+        :param from_date: the first day of the month
+        :param to_date: the last day of the month
+        :param user: the user requesting the report
+        :param title: the title of the sheet
+        :param on_progress: called with the resources written so far and
+          their total, while the workbook is being built
+        :return: the content of the workbook.
+        """
+
+        def build() -> bytes:
+            stream = io.BytesIO()
+            cls(from_date, to_date, user).write_excel(stream, title, on_progress)
+            return stream.getvalue()
+
+        return cls.get_cached(
+            from_date,
+            to_date,
+            user,
+            lambda: artifacts.get_or_build(
+                ReportArtifact.Kind.REPORT_EXPORT, from_date, to_date, user, build, dumps=bytes, loads=bytes
+            ),
+        )
+
+    def write_excel(
+        self, stream: StreamWriter, title: str, on_progress: Callable[[int, int], None] | None = None
+    ) -> None:
+        """Write the report as an Excel workbook.
+
+        The workbook is write-only: rows are laid out in full before being
+        written, and never touched again.
+
+        :param stream: the destination of the workbook
+        :param title: the title of the sheet
+        :param on_progress: called with the resources written so far and their total
+        """
+        wb = openpyxl.Workbook(write_only=True)
+        for style in get_named_styles():
+            wb.add_named_style(style)
+        ws = wb.create_sheet(title)
         ws.column_dimensions['A'].width = 30
 
-        current_row = 1
+        for row in self._iter_rows(on_progress):
+            cells = []
+            for value, style in row:
+                cells.append(cell := WriteOnlyCell(ws, value=value))
+                if style:
+                    cell.style = style
+            ws.append(cells)
+
+        wb.save(stream)
 
-        for idx, resource in enumerate(self.resources, 1):
+    def _iter_rows(self, on_progress: Callable[[int, int], None] | None) -> Iterator[_Row]:
+        mapping = get_report_timeentry_key_mapping()
+        spacing = 0
+        for idx, resource in enumerate(self.iter_resources(), 1):
             # spacing between employees
-            if idx > 1:
-                current_row += 2
+            yield from ([] for _row in range(spacing))
 
             resources_report_days = self.calendars[resource.id]
 
             # Header section
-            headers = [
-                f'{idx} - {resource.last_name.upper()} {resource.first_name}',
-                '',
-                *['X' if kd.holiday else '' for kd in resources_report_days],
+            yield [
+                (f'{idx} - {resource.last_name.upper()} {resource.first_name}', 'report_header'),
+                ('', 'report_header'),
+                *(('X' if kd.holiday else '', 'report_header') for kd in resources_report_days),
             ]
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=current_row, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.border = thin_border
-                cell.alignment = header_alignment
-
-            current_row += 1
 
             # Days row
             working_days = sum([0 if kd.nwd else 1 for kd in resources_report_days])
-            giorni = [
-                _('Days {working_days}').format(working_days=working_days),
-                _('Total HH'),
-                *[f'{day.day_of_week_short_i18n}\n{day.day}' for day in resources_report_days],
+            yield [
+                (_('Days {working_days}').format(working_days=working_days), 'report_day'),
+                (_('Total HH'), 'report_day'),
+                *(
+                    (f'{day.day_of_week_short_i18n}\n{day.day}', 'report_day_nwd' if day.nwd else 'report_day')
+                    for day in resources_report_days
+                ),
             ]
-            for col, giorno in enumerate(giorni):
-                cell = ws.cell(row=current_row, column=col + 1, value=giorno)
-                cell.alignment = header_alignment
-                cell.border = thin_border
-                if col > 1 and resources_report_days[col - 2].nwd:
-                    cell.fill = nwd_fill
-
-            current_row += 1
-            sick_days_with_protocol = {}
 
             if any(rkd.has_data for rkd in resources_report_days):
-                dynamic_mapping = {}
-                special_leave_days = {}
-                for rkd in resources_report_days:
-                    if rkd.data_special_leave_reason:
-                        special_leave_days.setdefault(rkd.data_special_leave_reason.title, []).append(rkd)
-                    if rkd.data_sick and rkd.data_protocol_number:
-                        sick_days_with_protocol.setdefault(rkd.data_protocol_number, []).append(rkd)
-
-                for key, label in mapping.items():
-                    dynamic_mapping[key] = get_report_timeentry_key_mapping().get(label, label)
-                    if key == 'leave' and special_leave_days:
-                        for sl_title in special_leave_days:
-                            dynamic_mapping[f'special_leave_{sl_title}'] = _('Special leave ({sl_title})').format(
-                                sl_title=sl_title
-                            )
-                    if key == 'sick':
-                        for protocol in sick_days_with_protocol:
-                            dynamic_mapping[f'sick_days_{protocol}'] = _('Sick {protocol}').format(protocol=protocol)
-
-                plain_sick_row: int = 0
-                plain_sick_dec: float = Decimal(0)
-
-                for lnum, (key, label) in enumerate(dynamic_mapping.items()):
-                    rownum = current_row + lnum
-                    if key == 'sick':
-                        plain_sick_row = rownum
-
-                    cell = ws.cell(row=rownum, column=1, value=get_report_timeentry_key_mapping().get(label, label))
-                    cell.border = thin_border
-                    if lnum % 2:
-                        cell.fill = light_grey_fill
-
-                    tot = None
-
-                    for dd_num, rkd in enumerate(resources_report_days, 3):
-                        if key == 'sick':
-                            value = rkd.data_sick if (rkd.data_sick and not rkd.data_protocol_number) else None
-                            plain_sick_dec += safe_dec(value)
-                        elif key.startswith('sick_days_'):
-                            protocol = key.replace('sick_days_', '')
-                            value = rkd.data_sick if (rkd.data_sick and rkd.data_protocol_number == protocol) else None
-                        elif key.startswith('special_leave_') and key != 'special_leave_hours':
-                            reason_title = key.replace('special_leave_', '')
-                            value = (
-                                rkd.data_special_leave_hours
-                                if rkd in special_leave_days.get(reason_title, [])
-                                else None
-                            )
-                        else:
-                            value = getattr(rkd, f'data_{key}')
-                        cell = ws.cell(row=rownum, column=dd_num, value=value if value != 0 else None)
-                        cell.alignment = centered
-                        cell.border = thin_border
-                        if rkd.nwd:
-                            cell.fill = nwd_fill
-                        elif lnum % 2:
-                            cell.fill = light_grey_fill
-                        if value is not None:
-                            tot = safe_dec(tot) + safe_dec(value)
-                    # TOT cell
-                    cell = ws.cell(row=rownum, column=2, value='' if tot is None else tot)
-                    cell.alignment = centered
-                    cell.border = thin_border
-                    if lnum % 2:
-                        cell.fill = light_grey_fill
-                current_row = rownum
-
+                yield from self._iter_data_rows(resources_report_days, mapping)
+                spacing = 1
             else:
-                ws.cell(row=current_row, column=1, value=_('No data available'))
-                current_row += 1
-
-            # Deleting empty sick row if all sick days have protocol
-            if sick_days_with_protocol and not plain_sick_dec:
-                ws.delete_rows(plain_sick_row)
-                current_row -= 1
-
-        wb.save(stream)
+                yield [(_('No data available'), None)]
+                spacing = 2
+
+            if on_progress:
+                on_progress(idx, len(self.resources))
+
+    def _iter_data_rows(  # noqa: C901,PLR0912
+        self, resources_report_days: list[Krm3Day], mapping: dict[str, str]
+    ) -> Iterator[_Row]:
+        dynamic_mapping = {}
+        special_leave_days = {}
+        sick_days_with_protocol = {}
+        for rkd in resources_report_days:
+            if rkd.data_special_leave_reason:
+                special_leave_days.setdefault(rkd.data_special_leave_reason.title, []).append(rkd)
+            if rkd.data_sick and rkd.data_protocol_number:
+                sick_days_with_protocol.setdefault(rkd.data_protocol_number, []).append(rkd)
+
+        for key, label in mapping.items():
+            dynamic_mapping[key] = label
+            if key == 'leave' and special_leave_days:
+                for sl_title in special_leave_days:
+                    dynamic_mapping[f'special_leave_{sl_title}'] = _('Special leave ({sl_title})').format(
+                        sl_title=sl_title
+                    )
+            if key == 'sick':
+                for protocol in sick_days_with_protocol:
+                    dynamic_mapping[f'sick_days_{protocol}'] = _('Sick {protocol}').format(protocol=protocol)
+
+        # the plain sick row is left out if all sick days have a protocol
+        skip_plain_sick = bool(sick_days_with_protocol) and not any(
+            rkd.data_sick and not rkd.data_protocol_number for rkd in resources_report_days
+        )
+
+        for lnum, (key, label) in enumerate(dynamic_mapping.items()):
+            if key == 'sick' and skip_plain_sick:
+                continue
+            alt = '_alt' if lnum % 2 else ''
+
+            tot = None
+            day_cells = []
+            for rkd in resources_report_days:
+                if key == 'sick':
+                    value = rkd.data_sick if (rkd.data_sick and not rkd.data_protocol_number) else None
+                elif key.startswith('sick_days_'):
+                    protocol = key.replace('sick_days_', '')
+                    value = rkd.data_sick if (rkd.data_sick and rkd.data_protocol_number == protocol) else None
+                elif key.startswith('special_leave_') and key != 'special_leave_hours':
+                    reason_title = key.replace('special_leave_', '')
+                    value = rkd.data_special_leave_hours if rkd in special_leave_days.get(reason_title, []) else None
+                else:
+                    value = getattr(rkd, f'data_{key}')
+                day_cells.append(
+                    (value if value != 0 else None, 'report_value_nwd' if rkd.nwd else f'report_value{alt}')
+                )
+                if value is not None:
+                    tot = safe_dec(tot) + safe_dec(value)
+
+            yield [
+                (label, f'report_label{alt}'),
+                ('' if tot is None else tot, f'report_value{alt}'),
+                *day_cells,
+            ]
 
     @override
     def _get_resources(self, user: User) -> list[Resource]:
         if user.has_any_perm('core.manage_any_timesheet', 'core.view_any_timesheet'):
             return [*Resource.objects.filter(preferred_in_report=True)]
         return [user.get_resource()]
+
+
+def export_report(job: ExportJob, on_progress: Callable[[int, int], None]) -> tuple[str, bytes]:
+    """Export the resource report in the background, see `krm3.core.export_jobs`."""
+    from_date = datetime.date.fromisoformat(job.params['from_date'])
+    to_date = datetime.date.fromisoformat(job.params['to_date'])
+    content = TimesheetReportExport.get_workbook(from_date, to_date, job.user, job.params['title'], on_progress)
+    return job.params['filename'], content
@@ -1,17 +1,18 @@
 import datetime
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator, Sequence
 from decimal import Decimal
 from typing import override
 
+import numpy as np
 from django.contrib.auth import get_user_model
 from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
-from krm3.core.models import Resource, Task
+from krm3.core.models import Resource, Task, TimeEntryTotals
 from krm3.timesheet.report.base import TimesheetReport
 from krm3.timesheet.report.online import ReportBlock, ReportRow
 from krm3.timesheet.rules import Krm3Day
-from krm3.utils.numbers import normal
+from krm3.utils.numbers import from_centi_hours, normal, to_centi_hours
 
 User = get_user_model()
 
@@ -22,9 +23,59 @@ task_timeentry_key_mapping = {
 }
 
 
+class TaskHours:
+    """The hours logged by a resource on its tasks, as NumPy matrices of hundredths of an hour indexed [task, day].
+
+    The matrices are filled at once from the time entries of the resource,
+    and the task report rows are reductions over them.
+    """
+
+    def __init__(self, tasks: list[Task], days: list[Krm3Day]) -> None:
+        self.tasks = tasks
+        self.days = days
+        self._task_rows = {task.id: row for row, task in enumerate(tasks)}
+        self._day_columns = {day.date: column for column, day in enumerate(days)}
+        self.worked = self._zeros()
+        """The day shift, night shift and travel hours."""
+        self.night_shift = self._zeros()
+        self.travel = self._zeros()
+
+    def add(self, entries: Iterable[TimeEntryTotals]) -> None:
+        """Add the hours of the entries logged on one of the tasks on one of the days."""
+        cells, hours = [], []
+        for entry in entries:
+            row = self._task_rows.get(entry.task_id)
+            column = self._day_columns.get(entry.date)
+            if row is not None and column is not None:
+                cells.append((row, column))
+                hours.append((entry.total_task_hours, entry.night_shift_hours, entry.travel_hours))
+        if not cells:
+            return
+        rows, columns = np.array(cells).T
+        worked, night_shift, travel = to_centi_hours(hours).T
+        np.add.at(self.worked, (rows, columns), worked)
+        np.add.at(self.night_shift, (rows, columns), night_shift)
+        np.add.at(self.travel, (rows, columns), travel)
+
+    @staticmethod
+    def per_task(matrix: np.ndarray) -> list[list[Decimal]]:
+        """Return the rows of a matrix as hours, i.e. the hours on each task per day."""
+        return [[from_centi_hours(value) for value in row] for row in matrix.tolist()]
+
+    @staticmethod
+    def per_day(matrix: np.ndarray) -> list[Decimal]:
+        """Return the column sums of a matrix as hours, i.e. the hours on all the tasks per day."""
+        return [from_centi_hours(value) for value in matrix.sum(axis=0).tolist()]
+
+    def _zeros(self) -> np.ndarray:
+        return np.zeros((len(self.tasks), len(self.days)), dtype=np.int64)
+
+
 class TimesheetTaskReport(TimesheetReport):
     """Task-focused timesheet report that extends the base TimesheetReport."""
 
+    totals_by_task = True
+
     def __init__(self, from_date: datetime.date, to_date: datetime.date, user: User, **kwargs) -> None:
         can_filter_all = user.has_any_perm('core.manage_any_timesheet', 'core.view_any_timesheet')
         self.project_id = kwargs.get('project') if can_filter_all else None
@@ -36,7 +87,15 @@ class TimesheetTaskReport(TimesheetReport):
         self._load_tasks()
         if self.project_id or self.task_title:
             self.resources = [r for r in self.resources if r.id in self.tasks]
-        self._enrich_calendars_with_task_data()
+        self.task_hours = self._get_task_hours()
+
+    @override
+    @classmethod
+    def get_resource_scope(cls, user: User, **kwargs) -> set[int] | None:
+        scope = super().get_resource_scope(user, **kwargs)
+        if scope is None and (resource_id := kwargs.get('resource')):
+            return {resource_id}
+        return scope
 
     @override
     def _get_resources(self, user: User, **kwargs) -> Iterable[Resource]:
@@ -51,12 +110,20 @@ class TimesheetTaskReport(TimesheetReport):
 
         return resources
 
+    @override
+    def _load_resource(self, resource: Resource, time_entries: list[TimeEntryTotals]) -> None:
+        super()._load_resource(resource, time_entries)
+        self.task_hours = self._get_task_hours()
+
     def _load_tasks(self) -> None:
         """Load tasks for all resources in the report."""
         resource_ids = [r.id for r in self.resources]
 
-        tasks = Task.objects.filter(resource_id__in=resource_ids, start_date__lte=self.to_date).filter(
-            Q(end_date__gte=self.from_date) | Q(end_date__isnull=True)
+        # NOTE: the project is part of the task name in the rows
+        tasks = (
+            Task.objects.filter(resource_id__in=resource_ids, start_date__lte=self.to_date)
+            .filter(Q(end_date__gte=self.from_date) | Q(end_date__isnull=True))
+            .select_related('project')
         )
         if self.project_id:
             tasks = tasks.filter(project_id=self.project_id)
@@ -66,26 +133,31 @@ class TimesheetTaskReport(TimesheetReport):
         for task in tasks:
             self.tasks.setdefault(task.resource_id, []).append(task)
 
-    def _enrich_calendars_with_task_data(self) -> None:
-        """Add task hour data to existing calendar days."""
-        for resource_id, calendar_days in self.calendars.items():
-            resource_tasks = self.tasks.get(resource_id, [])
-
-            for kd in calendar_days:
-                self._calculate_task_hours_for_day(kd, resource_tasks, resource_id)
-
-    def _calculate_task_hours_for_day(self, kd: Krm3Day, tasks: list[Task], resource_id: int) -> None:
-        """Calculate task hours for a specific day."""
-        day_entries = [te for te in self.time_entries if te.resource_id == resource_id and te.date == kd.date]
-
-        for task in tasks:
-            task_hours = sum(
-                (te.day_shift_hours or 0) + (te.night_shift_hours or 0) + (te.travel_hours or 0)
-                for te in day_entries
-                if te.task_id == task.id
-            )
-            if task_hours > 0:
-                setattr(kd, f'task_{task.id}_hours', Decimal(task_hours))
+    def _get_task_hours(self) -> dict[int, TaskHours]:
+        """Collect the task hours of each resource in one pass over the time entries."""
+        task_hours = {
+            resource_id: TaskHours(self.tasks.get(resource_id, []), calendar_days)
+            for resource_id, calendar_days in self.calendars.items()
+        }
+        entries: dict[int, list[TimeEntryTotals]] = {}
+        for te in self.time_entries:
+            entries.setdefault(te.resource_id, []).append(te)
+        for resource_id, resource_entries in entries.items():
+            if (matrix := task_hours.get(resource_id)) is not None:
+                matrix.add(resource_entries)
+        return task_hours
+
+    def _get_scheduled_hours(self, days: list[Krm3Day]) -> list[Decimal]:
+        """Return the scheduled hours of each day, 0 on non-working days."""
+        return [Decimal(0) if kd.nwd else Decimal(self._get_min_working_hours(kd)) for kd in days]
+
+    @staticmethod
+    def _get_days_equivalent(hours: Sequence[Decimal], scheduled_hours: Sequence[Decimal]) -> Decimal:
+        """Return the working days the hours amount to, given the scheduled hours of each day."""
+        return sum(
+            (h / scheduled for h, scheduled in zip(hours, scheduled_hours, strict=True) if h > 0 and scheduled > 0),
+            Decimal(0),
+        )
 
 
 class TimesheetTaskReportOnline(TimesheetTaskReport):
@@ -94,9 +166,12 @@ class TimesheetTaskReportOnline(TimesheetTaskReport):
     need = {'extra_holidays'}
 
     def report_html(self, tasks_only: bool = False) -> list[ReportBlock]:
-        blocks = []
-        for resource in self.resources:
-            blocks.append(block := ReportBlock(resource))
+        return [*self.iter_blocks(tasks_only=tasks_only)]
+
+    def iter_blocks(self, tasks_only: bool = False) -> Iterator[ReportBlock]:
+        """Yield the block of each resource, as soon as it is built."""
+        for resource in self.iter_resources():
+            block = ReportBlock(resource)
             row = block.add_row(ReportRow())
             resources_report_days = self.calendars[resource.id]
 
@@ -113,8 +188,7 @@ class TimesheetTaskReportOnline(TimesheetTaskReport):
             self._add_timeentry_type_rows(block, resources_report_days, resource)
             if not tasks_only:
                 self._add_absence_row(block, resources_report_days)
-
-        return blocks
+            yield block
 
     def _calculate_summary_data(self, resources_report_days: list[Krm3Day]) -> tuple[int, Decimal]:
         """Calculate number of working days and total scheduled hours."""
@@ -133,126 +207,61 @@ class TimesheetTaskReportOnline(TimesheetTaskReport):
         self, block: ReportBlock, resources_report_days: list[Krm3Day], resource: Resource
     ) -> None:
         """Add rows for different time entry types (night shift, on call, travel)."""
-        resource_task_ids = {t.id for t in self.tasks.get(resource.id, [])}
+        task_hours = self.task_hours[resource.id]
+        scheduled_hours = self._get_scheduled_hours(resources_report_days)
 
         for key, label in task_timeentry_key_mapping.items():
             row = block.add_row(ReportRow())
             row.add_cell(label)
 
-            entry_days = Decimal(0)
-            entry_total_hours = Decimal(0)
+            if key in ('night_shift', 'travel'):
+                values = task_hours.per_day(getattr(task_hours, key))
+            else:
+                values = [getattr(kd, f'data_{key}', None) or Decimal(0) for kd in resources_report_days]
 
-            for kd in resources_report_days:
-                if key in ('night_shift', 'travel'):
-                    day_entries = [
-                        te
-                        for te in self.time_entries
-                        if te.resource_id == resource.id and te.date == kd.date and te.task_id in resource_task_ids
-                    ]
-                    value = Decimal(sum(getattr(te, f'{key}_hours', 0) or 0 for te in day_entries))
-                else:
-                    value = getattr(kd, f'data_{key}', None) or Decimal(0)
-
-                if not kd.nwd and value and value > 0:
-                    entry_total_hours += value
-                    scheduled_hours = self._get_min_working_hours(kd)
-                    if scheduled_hours > 0:
-                        hours_ratio = value / Decimal(scheduled_hours)
-                        entry_days += hours_ratio
-
-            row.add_cell(normal(entry_days))
-            row.add_cell(normal(entry_total_hours))
-
-            for rkd in resources_report_days:
-                if key in ('night_shift', 'travel'):
-                    day_entries = [
-                        te
-                        for te in self.time_entries
-                        if te.resource_id == resource.id and te.date == rkd.date and te.task_id in resource_task_ids
-                    ]
-                    value = Decimal(sum(getattr(te, f'{key}_hours', 0) or 0 for te in day_entries))
-                else:
-                    value = getattr(rkd, f'data_{key}', None) or Decimal(0)
-                row.add_cell(normal(value) if value else '').nwd = rkd.nwd
+            working_day_values = [
+                value if not kd.nwd else Decimal(0) for kd, value in zip(resources_report_days, values, strict=True)
+            ]
+            row.add_cell(normal(self._get_days_equivalent(working_day_values, scheduled_hours)))
+            row.add_cell(normal(sum((value for value in working_day_values if value > 0), Decimal(0))))
+
+            for rkd, value in zip(resources_report_days, values, strict=True):
+                row.add_cell(normal(value) if value else '', nwd=rkd.nwd)
 
     def _add_days_per_task_row(
         self, block: ReportBlock, resource: Resource, resources_report_days: list[Krm3Day]
     ) -> None:
         """Add a row showing total hours per day from all tasks."""
-        resource_tasks = self.tasks.get(resource.id, [])
-        daily_totals = self._calculate_daily_totals(resources_report_days, resource_tasks)
+        task_hours = self.task_hours[resource.id]
+        daily_totals = task_hours.per_day(task_hours.worked)
 
         row = ReportRow()
         row.add_cell(_('Total per day'))
+        row.add_cell(normal(self._get_days_equivalent(daily_totals, self._get_scheduled_hours(resources_report_days))))
+        row.add_cell(normal(sum(daily_totals, Decimal(0))))
 
-        total_days = Decimal(0)
-        total_hours = sum(daily_totals.values())
-
-        for day in resources_report_days:
-            if not day.nwd:
-                daily_total = daily_totals.get(day.date, Decimal(0))
-                if daily_total > 0:
-                    scheduled_hours = self._get_min_working_hours(day)
-                    if scheduled_hours > 0:
-                        hours_ratio = daily_total / Decimal(scheduled_hours)
-                        total_days += hours_ratio
-
-        row.add_cell(normal(total_days))
-        row.add_cell(normal(total_hours))
-
-        for day in resources_report_days:
-            daily_total = daily_totals.get(day.date, Decimal(0))
-            row.add_cell(normal(daily_total) if daily_total > 0 else '').nwd = day.nwd
+        for day, daily_total in zip(resources_report_days, daily_totals, strict=True):
+            row.add_cell(normal(daily_total) if daily_total > 0 else '', nwd=day.nwd)
 
         block.rows.append(row)
 
-    def _calculate_daily_totals(self, resources_report_days: list[Krm3Day], resource_tasks: list[Task]) -> dict:
-        """Calculate daily totals for all tasks."""
-        daily_totals = {}
-
-        for day in resources_report_days:
-            daily_total = Decimal(0)
-            for task in resource_tasks:
-                task_hours = getattr(day, f'task_{task.id}_hours', None)
-                if task_hours and task_hours > 0:
-                    daily_total += task_hours
-            daily_totals[day.date] = daily_total
-
-        return daily_totals
-
     def _add_task_rows(self, block: ReportBlock, resource: Resource) -> None:
         """Add rows for each task associated with the resource."""
         resources_report_days: list[Krm3Day] = self.calendars[resource.id]
-        resource_tasks = self.tasks.get(resource.id, [])
+        task_hours = self.task_hours[resource.id]
+        scheduled_hours = self._get_scheduled_hours(resources_report_days)
 
         # FIXME: this is a pure function of the current state, use a property
-        block.has_tasks = bool(resource_tasks)
+        block.has_tasks = bool(task_hours.tasks)
 
-        for task in resource_tasks:
+        for task, hours in zip(task_hours.tasks, task_hours.per_task(task_hours.worked), strict=True):
             row = ReportRow()
             row.add_cell(task)
+            row.add_cell(normal(self._get_days_equivalent(hours, scheduled_hours)))
+            row.add_cell(normal(sum(hours, Decimal(0))))
 
-            total_days = Decimal(0)
-            total_hours = Decimal(0)
-
-            for day in resources_report_days:
-                task_hours = getattr(day, f'task_{task.id}_hours', None)
-
-                if task_hours and task_hours > 0:
-                    total_hours += task_hours
-
-                if not day.nwd and task_hours and task_hours > 0:
-                    scheduled_hours = self._get_min_working_hours(day)
-                    if scheduled_hours > 0:
-                        hours_ratio = task_hours / Decimal(scheduled_hours)
-                        total_days += hours_ratio
-
-            row.add_cell(normal(total_days))
-            row.add_cell(normal(total_hours))
-
-            for day in resources_report_days:
-                task_hours = getattr(day, f'task_{task.id}_hours', None)
-                row.add_cell(normal(task_hours) if task_hours else '').nwd = day.nwd
+            for day, day_hours in zip(resources_report_days, hours, strict=True):
+                row.add_cell(normal(day_hours) if day_hours else '', nwd=day.nwd)
 
             block.rows.append(row)
 
@@ -279,7 +288,7 @@ class TimesheetTaskReportOnline(TimesheetTaskReport):
 
         for day in resources_report_days:
             marker = self._get_absence_marker(day)
-            row.add_cell(marker).nwd = day.nwd
+            row.add_cell(marker, nwd=day.nwd)
 
         block.rows.append(row)
 
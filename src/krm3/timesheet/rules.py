@@ -1,15 +1,18 @@
 from __future__ import annotations
 
+import datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING, Any
 
+import numpy as np
+
 from krm3.timesheet import utils
 from krm3.utils import i18n
 from krm3.utils.dates import KrmDay, _MaybeDate
-from krm3.utils.numbers import safe_dec
+from krm3.utils.numbers import from_centi_hours, safe_dec, to_centi_hours
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Iterator
+    from collections.abc import Iterable, Iterator, Mapping, Sequence
     from krm3.core.models import Contract, Resource, TimeEntry
     from krm3.core.models import TimesheetSubmission
 
@@ -43,16 +46,62 @@ te_calc_map = {
     'sick_hours': 'sick',
 }
 
+# the hours summed up by `TimesheetRule.calculate_many()`
+_hours_columns = {
+    fname: key for fname, key in te_calc_map.items() if fname not in ('special_leave_reason', 'protocol_number')
+}
+
+type RuleInput = tuple[bool, float, float | None, Iterable['TimeEntry']]
+
+
+_ZERO = Decimal(0)
+
 
 class Krm3Day(KrmDay):
+    # NOTE: a report holds one of these for every resource and day; with
+    #       slots they take half the memory of an instance dict, which
+    #       is still there for the data some reports add to the days
+    __slots__ = (
+        'date',
+        'lang',
+        'resource',
+        'data_due_hours',
+        'contract',
+        'holiday',
+        'time_entries',
+        'data_bank',
+        'data_bank_from',
+        'data_bank_to',
+        'data_day_shift',
+        'data_night_shift',
+        'data_on_call',
+        'data_travel',
+        'data_holiday',
+        'data_leave',
+        'data_rest',
+        'data_sick',
+        'data_overtime',
+        'data_meal_voucher',
+        'data_meal_voucher_threshold',
+        'data_special_leave_hours',
+        'data_special_leave_reason',
+        'data_special_leave_title',
+        'data_regular_hours',
+        'data_fulfilled',
+        'data_protocol_number',
+        'has_data',
+        'nwd',
+        'submitted',
+    )
+
     def __init__(self, day: _MaybeDate = None, **kwargs) -> None:
         self.lang: str = 'IT'
         super().__init__(day, **kwargs)
         self.resource: 'Resource | None' = None
-        self.data_due_hours = Decimal.from_float(0)
+        self.data_due_hours = _ZERO
         self.contract: 'Contract | None' = None
         self.holiday: bool = False
-        self.time_entries: Iterable['TimeEntry'] = []
+        self.time_entries: Iterable['TimeEntry'] = ()
         self.data_bank = None
         self.data_bank_from = None
         self.data_bank_to = None
@@ -87,25 +136,53 @@ class Krm3Day(KrmDay):
 
     def apply(self, time_entries: list['TimeEntry']) -> None:
         """Compute the krm3day data from the time_entries list."""
-        self.time_entries = time_entries
-        self.has_data = bool(time_entries)
-        meal_voucher_threshold = None
-        if self.contract and (thresholds := self.contract.meal_voucher):
-            meal_voucher_threshold = thresholds.get('sun' if self.nwd else self.day_of_week_short.lower())
-        for k, v in TimesheetRule.calculate(
-            not self.nwd, float(self.data_due_hours), meal_voucher_threshold, time_entries
-        ).items():
-            setattr(self, f'data_{k}', v)
+        self.apply_many([(self, time_entries)])
+
+    @staticmethod
+    def apply_many(days: Iterable[tuple[Krm3Day, list['TimeEntry']]]) -> None:
+        """Compute the data of many krm3days at once, see `TimesheetRule.calculate_many()`.
+
+        :param days: each day, with its time entries
+        """
+        days = list(days)
+        rule_inputs = []
+        for day, time_entries in days:
+            day.time_entries = time_entries
+            day.has_data = bool(time_entries)
+            meal_voucher_threshold = None
+            if day.contract and (thresholds := day.contract.meal_voucher):
+                meal_voucher_threshold = thresholds.get('sun' if day.nwd else day.day_of_week_short.lower())
+            rule_inputs.append((not day.nwd, float(day.data_due_hours), meal_voucher_threshold, time_entries))
+
+        for (day, _time_entries), result in zip(days, TimesheetRule.calculate_many(rule_inputs), strict=True):
+            for k, v in result.items():
+                setattr(day, f'data_{k}', v)
 
     @classmethod
-    def from_submission(cls, submission: TimesheetSubmission) -> Iterator:
+    def from_submission(cls, submission: TimesheetSubmission) -> Iterator[Krm3Day]:
         """Convert the timesheet data from a `TimesheetSubmission`.
 
         :param submission: the `TimesheetSubmission` to convert
         :return: a lazy sequence of `Krm3Day`s covering the submission's time period
         """
-        from krm3.core.models import Contract, TimeEntry
-        timesheet_data = submission.timesheet or {}
+        return cls.from_submissions([submission])
+
+    @classmethod
+    def from_submissions(cls, submissions: Iterable[TimesheetSubmission]) -> Iterator[Krm3Day]:
+        """Convert the timesheet data from many `TimesheetSubmission`s.
+
+        The time entries, with their special leave reasons, and the
+        contracts of all the submissions are fetched with one query each,
+        the days are then decoded from the snapshots alone.
+
+        :param submissions: the `TimesheetSubmission`s to convert
+        :return: a lazy sequence of `Krm3Day`s covering the submissions' time periods
+        """
+        from krm3.core.models import Contract, TimeEntry  # noqa: PLC0415
+
+        snapshots = [(submission, submission.timesheet or {}) for submission in submissions]
+        if not snapshots:
+            return
 
         # NOTE: there is no point in computing totals from serialized
         #       data if we have to populate the objects with model
@@ -113,61 +190,80 @@ class Krm3Day(KrmDay):
         #       DRF serializers are also out of the question due to
         #       only allowing to deserialize model instances via
         #       `create()` or `update()`.
-        time_entries = TimeEntry.objects.filter(
-            id__in=(entry_data['id'] for entry_data in timesheet_data.get('time_entries', []))
-        )
-        contracts = Contract.objects.filter(
-            id__in=(contract_data['id'] for contract_data in timesheet_data.get('contracts', []))
+        time_entries = TimeEntry.objects.select_related('special_leave_reason').in_bulk(
+            {entry_data['id'] for _submission, data in snapshots for entry_data in data.get('time_entries', [])}
         )
+        # NOTE: the snapshots do not reference the contracts, get the
+        #       ones covering any of the submitted days instead
+        dates = sorted({KrmDay(date).date for _submission, data in snapshots for date in data.get('days', {})})
+        contracts: dict[int, list[Contract]] = {}
+        if dates:
+            for contract in Contract.objects.filter(
+                resource_id__in={submission.resource_id for submission, _data in snapshots},
+                period__overlap=(dates[0], dates[-1] + datetime.timedelta(days=1)),
+            ):
+                contracts.setdefault(contract.resource_id, []).append(contract)
+
+        for submission, timesheet_data in snapshots:
+            yield from cls._decode_submission(
+                submission, timesheet_data, time_entries, contracts.get(submission.resource_id, [])
+            )
+
+    @classmethod
+    def _decode_submission(
+        cls,
+        submission: TimesheetSubmission,
+        timesheet_data: dict,
+        time_entries: Mapping[int, TimeEntry],
+        contracts: list[Contract],
+    ) -> Iterator[Krm3Day]:
+        """Build the `Krm3Day`s of a submission snapshot from prefetched model instances."""
+        time_entry_data_by_date: dict[str, list[dict]] = {}
+        for entry_data in timesheet_data.get('time_entries', []):
+            time_entry_data_by_date.setdefault(entry_data['date'], []).append(entry_data)
+        schedule = timesheet_data.get('schedule', {})
 
-        def _extract(key: str, from_: Iterable[dict]) -> Iterator:
-            return (entry[key] for entry in from_)
+        def _sum(key: str, from_: Iterable[dict]) -> Decimal:
+            return sum((Decimal(entry[key]) for entry in from_), Decimal(0))
 
         for date, day_data in timesheet_data.get('days', {}).items():
             day = Krm3Day(day=date)
 
-            this_day_time_entries = time_entries.filter(date=date)
-            this_day_time_entry_data = [
-                entry_data for entry_data in timesheet_data.get('time_entries', []) if entry_data['date'] == date
+            this_day_time_entry_data = time_entry_data_by_date.get(date, [])
+            this_day_time_entries = [
+                time_entry
+                for entry_data in this_day_time_entry_data
+                if (time_entry := time_entries.get(entry_data['id'])) is not None
             ]
 
-            try:
-                contract = contracts.filter(period__contains=date).get()
-            except Contract.DoesNotExist:
-                contract = None
-
             day.submitted = True
             day.resource = submission.resource
-            day.contract = contract
+            day.contract = next((contract for contract in contracts if day.date in contract.period), None)
             day.holiday = day_data.get('hol')
             day.nwd = day_data.get('nwd')
             day.time_entries = this_day_time_entries
-            bank_deposits = sum(map(Decimal, _extract('bank_to', this_day_time_entry_data)))
-            bank_withdrawals = sum(map(Decimal, _extract('bank_from', this_day_time_entry_data)))
-            day.data_bank = bank_deposits - bank_withdrawals
-            day.data_day_shift = sum(map(Decimal, _extract('day_shift_hours', this_day_time_entry_data)))
-            day.data_night_shift = sum(map(Decimal, _extract('night_shift_hours', this_day_time_entry_data)))
-            day.data_on_call = sum(map(Decimal, _extract('on_call_hours', this_day_time_entry_data)))
-            day.data_travel = sum(map(Decimal, _extract('travel_hours', this_day_time_entry_data)))
-            day.data_holiday = sum(map(Decimal, _extract('holiday_hours', this_day_time_entry_data)))
-            day.data_leave = sum(map(Decimal, _extract('leave_hours', this_day_time_entry_data)))
-            day.data_special_leave_hours = sum(map(Decimal, _extract('special_leave_hours', this_day_time_entry_data)))
-            try:
-                day.data_special_leave_reason = (
-                    this_day_time_entries.filter(special_leave_reason__isnull=False).get().special_leave_reason
-                )
-            except TimeEntry.DoesNotExist:
-                day.data_special_leave_reason = None
-            day.data_rest = sum(map(Decimal, _extract('rest_hours', this_day_time_entry_data)))
-            day.data_sick = sum(map(Decimal, _extract('sick_hours', this_day_time_entry_data)))
+            day.data_bank_from = _sum('bank_from', this_day_time_entry_data)
+            day.data_bank_to = _sum('bank_to', this_day_time_entry_data)
+            day.data_bank = day.data_bank_to - day.data_bank_from
+            day.data_day_shift = _sum('day_shift_hours', this_day_time_entry_data)
+            day.data_night_shift = _sum('night_shift_hours', this_day_time_entry_data)
+            day.data_on_call = _sum('on_call_hours', this_day_time_entry_data)
+            day.data_travel = _sum('travel_hours', this_day_time_entry_data)
+            day.data_holiday = _sum('holiday_hours', this_day_time_entry_data)
+            day.data_leave = _sum('leave_hours', this_day_time_entry_data)
+            day.data_special_leave_hours = _sum('special_leave_hours', this_day_time_entry_data)
+            day.data_special_leave_reason = next(
+                (entry.special_leave_reason for entry in this_day_time_entries if entry.special_leave_reason_id),
+                None,
+            )
+            day.data_rest = _sum('rest_hours', this_day_time_entry_data)
+            day.data_sick = _sum('sick_hours', this_day_time_entry_data)
             day.data_protocol_number = (
                 this_day_time_entry_data[0].get('protocol_number') if this_day_time_entry_data else None
             )
-            day.data_bank_from = sum(map(Decimal, _extract('bank_from', this_day_time_entry_data)))
-            day.data_bank_to = sum(map(Decimal, _extract('bank_to', this_day_time_entry_data)))
 
             # NOTE: due to how the source Timesheet DTO is created, we will always have a schedule
-            day.data_due_hours = timesheet_data.get('schedule', {}).get(date)
+            day.data_due_hours = schedule.get(date)
 
             # XXX: there are no default settings, so this will be 0 or None if thresholds are not set explicitly
             day.data_meal_voucher_threshold = day_data.get('meal_voucher')
@@ -177,7 +273,7 @@ class Krm3Day(KrmDay):
             day.data_regular_hours = utils.regular_hours(day.time_entries, day.data_due_hours)
             day.data_overtime = utils.overtime(day.time_entries, day.data_due_hours)
             # FIXME: this is a pure function of internal state - use a property instead
-            day.has_data = this_day_time_entries.exists()
+            day.has_data = bool(this_day_time_entries)
 
             yield day
 
@@ -242,3 +338,70 @@ class TimesheetRule:
 
         base['regular_hours'] = regular_hours if regular_hours != Decimal(0) else None
         return base
+
+    @staticmethod
+    def calculate_many(days: Sequence[RuleInput]) -> list[dict]:
+        """Calculate the time sheet rules for many days at once.
+
+        Gives the same results as calling `calculate()` on each day, but
+        the hours of all the time entries are gathered in a single pass
+        into a matrix of integer hundredths of an hour, summed up by day,
+        and each rule is then applied to the whole block of days at once.
+
+        :param days: the `calculate()` arguments of each day
+        :return: the results, in the same order as `days`.
+        """
+        size = len(days)
+        keys = (*_hours_columns.values(), 'task', 'special')
+        entry_days, entry_hours = [], []
+        special_leave_reasons = [None] * size
+        protocol_numbers = [None] * size
+        for i, (_work_day, _due_hours, _threshold, time_entries) in enumerate(days):
+            utils.verify_time_entries_from_same_day(time_entries)
+            for te in time_entries:
+                entry_days.append(i)
+                entry_hours.append(
+                    [*(getattr(te, fname) or 0 for fname in _hours_columns), te.total_task_hours, te.special_hours]
+                )
+                if te.special_leave_reason:
+                    special_leave_reasons[i] = te.special_leave_reason
+                if te.protocol_number:
+                    protocol_numbers[i] = te.protocol_number
+
+        totals = np.zeros((size, len(keys)), dtype=np.int64)
+        if entry_hours:
+            np.add.at(totals, np.array(entry_days), to_centi_hours(entry_hours))
+        columns = dict(zip(keys, totals.T, strict=True))
+        due = to_centi_hours([due_hours or 0 for _work_day, due_hours, _threshold, _time_entries in days])
+        thresholds = to_centi_hours([threshold or 0 for _work_day, _due_hours, threshold, _time_entries in days])
+
+        bank = columns['bank_to'] - columns['bank_from']
+        worked = columns['task'] + np.maximum(0, -bank)
+        overtime = np.maximum(0, worked - due - np.maximum(0, bank))
+        # no overtime is computed on the days with special hours
+        has_overtime = columns['special'] <= 0
+        regular = np.where(worked != 0, np.minimum(worked, due), 0)
+        fulfilled = worked + columns['special'] + columns['rest'] >= due
+        meal_vouchers = (thresholds != 0) & (thresholds <= worked)
+
+        # back to Python values, converting each number on its own is much slower
+        hours = {key: columns[key].tolist() for key in _hours_columns.values()}
+        bank, overtime, has_overtime = bank.tolist(), overtime.tolist(), has_overtime.tolist()
+        regular, fulfilled, meal_vouchers = regular.tolist(), fulfilled.tolist(), meal_vouchers.tolist()
+        results = []
+        for i in range(size):
+            result: dict[str, Any] = {
+                key: from_centi_hours(hours[key][i]) or None
+                for key in _hours_columns.values()
+                if key not in ('bank_to', 'bank_from')
+            }
+            result['bank'] = from_centi_hours(bank[i]) if hours['bank_to'][i] or hours['bank_from'][i] else None
+            result['overtime'] = from_centi_hours(overtime[i]) or None if has_overtime[i] else None
+            result['meal_voucher'] = 1 if meal_vouchers[i] else None
+            result['special_leave_reason'] = special_leave_reasons[i]
+            result['special_leave_title'] = special_leave_reasons[i].title if special_leave_reasons[i] else None
+            result['protocol_number'] = protocol_numbers[i]
+            result['fulfilled'] = fulfilled[i]
+            result['regular_hours'] = from_centi_hours(regular[i]) or None
+            results.append(result)
+        return results
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import datetime
+import threading
 from calendar import Calendar
-from typing import Iterator, Self, override
+from collections import OrderedDict
+from typing import Iterable, Iterator, NamedTuple, Self, override
 
 import holidays
 from dateutil.relativedelta import MO, SU, relativedelta
 
 from krm3.config.environ import env
+from krm3.core.extra_holidays import extra_holiday_index
 
 
 type _Date = KrmDay | datetime.date | str
@@ -29,7 +32,8 @@ class KrmDay:
             self.date = day
         else:
             self.date = dt(day)
-        self.__dict__.update(kwargs)
+        if kwargs:
+            self.__dict__.update(kwargs)
 
     @property
     def day(self) -> int:
@@ -52,12 +56,7 @@ class KrmDay:
         return self.date.isocalendar()[1]
 
     def is_extra_holiday(self, country_calendar_code: str) -> bool:
-        from krm3.core.models import ExtraHoliday
-
-        extra_holidays = ExtraHoliday.objects.filter(
-            period__contains=self.date, country_codes__contains=[country_calendar_code]
-        ).first()
-        return bool(extra_holidays)
+        return extra_holiday_index.is_extra_holiday(self.date, country_calendar_code)
 
     def is_holiday(self, country_calendar_code: str = None, include_sundays_as_holiday: bool = True) -> bool:
         if country_calendar_code and self.is_extra_holiday(country_calendar_code):
@@ -172,8 +171,7 @@ class KrmCalendar(Calendar):
     @override
     def __init__(self, firstweekday: int = 0) -> None:
         super().__init__(firstweekday)
-        country, subdiv = str(env('HOLIDAYS_CALENDAR')).split('-')
-        self.country_holidays = holidays.country_holidays(country, subdiv)
+        self.country_holidays = holiday_calendars.get(str(env('HOLIDAYS_CALENDAR')), weekend=None)
 
     @override
     def itermonthdates(self, year: int, month: int) -> Iterator[KrmDay]:
@@ -216,17 +214,138 @@ class KrmCalendar(Calendar):
         return self.iter_dates(*self.week_for(date))
 
 
-def get_country_holidays(country_calendar_code: str = None) -> holidays.HolidayBase:
-    """Generate the appropriate country holidays."""
-    hol_calendar = country_calendar_code or str(env('HOLIDAYS_CALENDAR'))
-    subdiv = None
-    if '-' in hol_calendar:
-        country, subdiv = hol_calendar.split('-')
-    else:
-        country = hol_calendar
-    cal = holidays.country_holidays(country, subdiv)
-    cal.weekend = {6}  # SUN
-    return cal
+SUNDAY_ONLY_WEEKEND = frozenset({6})
+
+
+class HolidayCalendar:
+    """A country holiday calendar answering lookups from pre-expanded years.
+
+    Wraps a `holidays.HolidayBase`, populating it one year at a time and
+    copying its dates into plain sets, so that `is_working_day()` and `in`
+    are O(1) once a year has been expanded.
+    """
+
+    def __init__(self, country: str, subdiv: str | None = None, weekend: Iterable[int] | None = None) -> None:
+        self.country_holidays = holidays.country_holidays(country, subdiv)
+        if weekend is not None:
+            self.country_holidays.weekend = set(weekend)
+        self.weekend = frozenset(self.country_holidays.weekend)
+        self._years: set[int] = set()
+        self._dates: set[datetime.date] = set()
+        self._weekend_workdays: set[datetime.date] = set()
+        self._lock = threading.Lock()
+
+    def expand(self, *years: int) -> None:
+        """Populate the given years, if not already done."""
+        with self._lock:
+            for year in years:
+                if year in self._years:
+                    continue
+                # NOTE: checking for any date of a year makes the library populate it
+                _ = datetime.date(year, 1, 1) in self.country_holidays
+                self._dates.update(d for d in self.country_holidays if d.year == year)
+                self._weekend_workdays.update(
+                    d for d in getattr(self.country_holidays, 'weekend_workdays', ()) if d.year == year
+                )
+                self._years.add(year)
+
+    def _as_date(self, day: _Date) -> datetime.date:
+        date = KrmDay(day).date
+        if date.year not in self._years:
+            self.expand(date.year)
+        return date
+
+    def __contains__(self, day: _Date) -> bool:
+        return self._as_date(day) in self._dates
+
+    def is_working_day(self, day: _Date) -> bool:
+        """Return whether the day is neither a holiday nor a weekend day (unless declared a working one)."""
+        date = self._as_date(day)
+        if date.weekday() in self.weekend:
+            return date in self._weekend_workdays
+        return date not in self._dates
+
+    def get(self, day: _Date) -> str | None:
+        """Return the name of the holiday on the given day, if any."""
+        date = self._as_date(day)
+        return self.country_holidays.get(date) if date in self._dates else None
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class HolidayCalendarRegistry:
+    """Process-wide LRU registry of `HolidayCalendar`s.
+
+    Calendars are keyed by country, subdivision and weekend policy, and are
+    built only once. The least recently used calendar is evicted when more
+    than `maxsize` calendars are held.
+    """
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._calendars: OrderedDict[tuple, HolidayCalendar] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def parse_code(country_calendar_code: str | None = None) -> tuple[str, str | None]:
+        """Split a country calendar code (e.g. `IT-RM`) into its country and subdivision."""
+        hol_calendar = country_calendar_code or str(env('HOLIDAYS_CALENDAR'))
+        if '-' in hol_calendar:
+            country, subdiv = hol_calendar.split('-', 1)
+            return country, subdiv
+        return hol_calendar, None
+
+    def get(
+        self,
+        country_calendar_code: str | None = None,
+        weekend: Iterable[int] | None = SUNDAY_ONLY_WEEKEND,
+        years: Iterable[int] = (),
+    ) -> HolidayCalendar:
+        """Return the shared calendar for the given code and weekend policy.
+
+        :param country_calendar_code: the country calendar code, defaults to `HOLIDAYS_CALENDAR`
+        :param weekend: the weekdays to consider as weekend, `None` for the country's default
+        :param years: years to pre-expand
+        :raises NotImplementedError: when the country or subdivision is not supported
+        :return: the calendar.
+        """
+        key = (*self.parse_code(country_calendar_code), None if weekend is None else frozenset(weekend))
+        with self._lock:
+            if (calendar := self._calendars.get(key)) is not None:
+                self._calendars.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+                calendar = self._calendars[key] = HolidayCalendar(*key)
+                while len(self._calendars) > self.maxsize:
+                    self._calendars.popitem(last=False)
+        if years:
+            calendar.expand(*years)
+        return calendar
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._calendars))
+
+    def clear(self) -> None:
+        """Drop all the calendars and reset the counters."""
+        with self._lock:
+            self._calendars.clear()
+            self.hits = self.misses = 0
+
+
+holiday_calendars = HolidayCalendarRegistry()
+
+
+def get_country_holidays(country_calendar_code: str = None) -> HolidayCalendar:
+    """Return the shared holiday calendar for the country, with only Sunday as weekend day."""
+    return holiday_calendars.get(country_calendar_code)
 
 
 DATE_INFINITE = datetime.date(9999, 9, 9)
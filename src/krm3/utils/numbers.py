@@ -1,6 +1,9 @@
 import typing
+from collections.abc import Sequence
 from decimal import Decimal as D  # noqa: N817
 
+import numpy as np
+
 
 def normal(val: typing.Any) -> str:  # noqa: N802
     """Normalize a value to string by trying to remove trailing zeroes."""
@@ -20,3 +23,13 @@ def safe_dec(val: int | float | str | D | None) -> D:
     if isinstance(val, D):
         return val
     return D(val)
+
+
+def to_centi_hours(hours: Sequence) -> np.ndarray:
+    """Convert (nested sequences of) hours into integer numbers of hundredths of an hour."""
+    return np.rint(np.array(hours, dtype=np.float64) * 100).astype(np.int64)
+
+
+def from_centi_hours(centi_hours: int) -> D:
+    """Convert an integer number of hundredths of an hour back into hours."""
+    return D(centi_hours).scaleb(-2)
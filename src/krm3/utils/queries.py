@@ -0,0 +1,34 @@
+"""Fingerprints of SQL queries, to spot the ones repeated within a request."""
+
+import re
+from collections import Counter
+from collections.abc import Iterable
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|%s|\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql: str) -> str:
+    """Return the SQL with its literal values and placeholders replaced by `?`.
+
+    Queries differing only by their parameters, e.g. the same lookup for
+    each day of a month, share the fingerprint; lists of values collapse
+    to a single `(?)` so that the length of an `IN` does not matter.
+
+    :param sql: the SQL, with its parameters as placeholders or interpolated
+    :return: the fingerprint of the query
+    """
+    sql = _LITERALS.sub('?', sql)
+    sql = _LISTS.sub('(?)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def duplicates(queries: Iterable[str]) -> dict[str, int]:
+    """Count the fingerprints of the queries run more than once.
+
+    :param queries: the SQL of the queries
+    :return: the repeated fingerprints and how many times each was run, the most repeated first
+    """
+    counts = Counter(fingerprint(sql) for sql in queries)
+    return {sql: count for sql, count in counts.most_common() if count > 1}
@@ -30,6 +30,12 @@ def get_commit_info(*args: typing.ParamSpecArgs, **kwargs: typing.ParamSpecKwarg
         return ''
 
 
+def get_report_cache_stats(*args: typing.ParamSpecArgs, **kwargs: typing.ParamSpecKwargs) -> dict[str, int]:
+    from krm3.core.report_cache import report_cache  # noqa: PLC0415
+
+    return report_cache.stats()._asdict()
+
+
 def masker(key: str, value: object, config: dict, request: HttpRequest) -> str:
     maskers = []
 
@@ -1,4 +1,5 @@
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.fonts import DEFAULT_FONT
 
 header_font = Font(name='Calibri', bold=True, color='000000')
 header_fill = PatternFill(start_color='FAB803', end_color='FAB803', fill_type='solid')
@@ -9,3 +10,22 @@ thin_border = Border(
 )
 nwd_fill = PatternFill(start_color='979797', end_color='979797', fill_type='solid')
 light_grey_fill = PatternFill(start_color='dddddd', end_color='dddddd', fill_type='solid')
+
+
+def get_named_styles() -> list[NamedStyle]:
+    """Return the styles of the report export cells, to be shared by name within a workbook.
+
+    Write-only workbooks cannot style cells one attribute at a time, and
+    sharing a named style is also much cheaper than copying the same
+    attributes over every cell.
+    """
+    return [
+        NamedStyle('report_header', font=header_font, fill=header_fill, border=thin_border, alignment=header_alignment),
+        NamedStyle('report_day', font=DEFAULT_FONT, border=thin_border, alignment=header_alignment),
+        NamedStyle('report_day_nwd', font=DEFAULT_FONT, fill=nwd_fill, border=thin_border, alignment=header_alignment),
+        NamedStyle('report_label', font=DEFAULT_FONT, border=thin_border),
+        NamedStyle('report_label_alt', font=DEFAULT_FONT, fill=light_grey_fill, border=thin_border),
+        NamedStyle('report_value', font=DEFAULT_FONT, border=thin_border, alignment=centered),
+        NamedStyle('report_value_alt', font=DEFAULT_FONT, fill=light_grey_fill, border=thin_border, alignment=centered),
+        NamedStyle('report_value_nwd', font=DEFAULT_FONT, fill=nwd_fill, border=thin_border, alignment=centered),
+    ]
@@ -4,6 +4,8 @@ from .views import (
     HomeView,
     AvailabilityReportView,
     ReportView,
+    ReportExportJobView,
+    ExportJobView,
     TaskReportView,
     ReleasesView,
     UserResourceView,
@@ -19,6 +21,8 @@ urlpatterns = [
     path('report/', ReportView.as_view(), name='report'),
     path('report/<str:month>/', ReportView.as_view(), name='report-month'),
     path('report/export/<str:month>/', ReportView.as_view(), {'export': True}, name='export_report'),
+    path('report/export/<str:month>/job/', ReportExportJobView.as_view(), name='export-report-job'),
+    path('exports/<int:pk>/', ExportJobView.as_view(), name='export-job'),
     path('task_report/', TaskReportView.as_view(), name='task_report'),
     path('task/<str:month>/', TaskReportView.as_view(), name='task-report-month'),
     path('releases/', ReleasesView.as_view(), name='releases'),
@@ -1,9 +1,13 @@
 import base64
 import binascii
 import datetime
+import io
 import json
 import logging
 import typing
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from functools import cache, partial
 from pathlib import Path
 from typing import Any, cast, override
 
@@ -18,18 +22,31 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.db.models import Min
-from django.http import Http404, HttpRequest, HttpResponse, HttpResponseBase
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBase,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404
+from django.template.loader import get_template, render_to_string
 from django.urls import reverse
 from django.utils.text import slugify
+from django.utils import translation
+from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
-from django.views.generic import TemplateView
+from django.views.generic import TemplateView, View
 from django_simple_dms.models import DocumentTag
 
 from krm3.core.forms import ResourceForm
-from krm3.core.models import Project, Resource, Task
+from krm3.core.models import ExportJob, Project, ReportArtifact, Resource, Task
 from krm3.core.models.documents import ProtectedDocument as Document
+from krm3.timesheet.report import artifacts
 from krm3.timesheet.report.availability import AvailabilityReportOnline
+from krm3.timesheet.report.online import ReportBlock, ReportRow
 from krm3.timesheet.report.payslip import TimesheetReportOnline
 from krm3.timesheet.report.payslip_report import TimesheetReportExport
 from krm3.timesheet.report.task import TimesheetTaskReportOnline
@@ -63,6 +80,62 @@ class ReportMixin:
         return context
 
 
+class BlockStream:
+    """Report blocks rendered one at a time, in place of a marker in the page.
+
+    See `ProgressiveReportMixin`.
+    """
+
+    def __init__(self, blocks: Callable[[], Iterable[Any]], template_name: str, name: str = 'report_block') -> None:
+        """Prepare the rendering of the blocks.
+
+        :param blocks: produces the blocks, called once the page is sent
+        :param template_name: the template rendering a block, with the
+          block as `name` and its position as `counter`
+        :param name: the name of the block in the template
+        """
+        self.blocks = blocks
+        self.template_name = template_name
+        self.name = name
+        self.marker = mark_safe(f'<!-- report blocks {uuid.uuid4().hex} -->')  # noqa: S308
+        self.language = translation.get_language()
+
+    def __str__(self) -> str:
+        return self.marker
+
+    def render(self, head: str, tail: str) -> Iterator[str]:
+        """Yield the page up to the marker, each block as soon as it is built, and the rest of the page."""
+        yield head
+        template = get_template(self.template_name)
+        # NOTE: the blocks are built and rendered after the view returned
+        with translation.override(self.language):
+            for counter, block in enumerate(self.blocks(), 1):
+                yield template.render({self.name: block, 'counter': counter})
+        yield tail
+
+
+class ProgressiveReportMixin:
+    """Send the blocks of a report to the browser as soon as each of them is built.
+
+    Enabled by `settings.REPORT_PROGRESSIVE_RENDERING`. The views put
+    no `report_blocks` in the context, but a `BlockStream` as
+    `report_blocks_stream`; the page is then rendered up to it and sent
+    through a `StreamingHttpResponse`, followed by each block in turn,
+    so that the HTML of the whole report is never held in memory.
+    """
+
+    @property
+    def progressive(self) -> bool:
+        return getattr(settings, 'REPORT_PROGRESSIVE_RENDERING', False)
+
+    def render_to_response(self, context: dict[str, Any], **response_kwargs) -> HttpResponseBase:
+        if not isinstance(stream := context.get('report_blocks_stream'), BlockStream):
+            return super().render_to_response(context, **response_kwargs)
+        page = render_to_string(self.get_template_names(), context, request=self.request)
+        head, tail = page.split(stream.marker)
+        return StreamingHttpResponse(stream.render(head, tail), **response_kwargs)
+
+
 class HomeView(LoginRequiredMixin, TemplateView):
     login_url = '/admin/login/'
     template_name = 'home.html'
@@ -152,7 +225,7 @@ class ScanQRView(TemplateView):
     template_name = 'scan_qr.html'
 
 
-class AvailabilityReportView(LoginRequiredMixin, ReportMixin, TemplateView):
+class AvailabilityReportView(LoginRequiredMixin, ProgressiveReportMixin, ReportMixin, TemplateView):
     login_url = '/admin/login/'
     template_name = 'availability_report.html'
 
@@ -203,10 +276,48 @@ class AvailabilityReportView(LoginRequiredMixin, ReportMixin, TemplateView):
         projects = {'': _('All projects')} | dict(Project.objects.values_list('id', 'name'))
         context['projects'] = projects
         context['selected_project'] = selected_project
-        report_blocks = AvailabilityReportOnline(
-            ctx['start'], ctx['end'], cast('UserType', self.request.user), project_param
+        user = cast('UserType', self.request.user)
+        if self.progressive:
+            # NOTE: only the table header is in the page, the rows of the
+            #       resources are streamed into it; the report is built
+            #       once for both, and only if either is not cached
+            @cache
+            def get_report() -> AvailabilityReportOnline:
+                return AvailabilityReportOnline(ctx['start'], ctx['end'], user, project_param, streaming=True)
+
+            def iter_rows() -> Iterator[ReportRow]:
+                return get_report().iter_rows()
+
+            context['report_blocks'] = AvailabilityReportOnline.get_cached(
+                ctx['start'],
+                ctx['end'],
+                user,
+                lambda: get_report().get_header_blocks(),
+                project=project_param,
+                header=True,
+            )
+            context['report_blocks_stream'] = BlockStream(
+                partial(
+                    AvailabilityReportOnline.iter_cached,
+                    ctx['start'],
+                    ctx['end'],
+                    user,
+                    iter_rows,
+                    project=project_param,
+                    rows=True,
+                ),
+                'partials/availability_row.html',
+                name='row',
+            )
+            return context
+
+        context['report_blocks'] = AvailabilityReportOnline.get_cached(
+            ctx['start'],
+            ctx['end'],
+            user,
+            lambda: AvailabilityReportOnline(ctx['start'], ctx['end'], user, project_param).report_html(),
+            project=project_param,
         )
-        context['report_blocks'] = report_blocks.report_html()
 
         return context
 
@@ -298,25 +409,31 @@ def export_report(request: HttpRequest, report_data: dict, date: str) -> HttpRes
     return response
 
 
-class ReportView(LoginRequiredMixin, ReportMixin, TemplateView):
+class ReportView(LoginRequiredMixin, ProgressiveReportMixin, ReportMixin, TemplateView):
     login_url = '/admin/login/'
     template_name = 'report.html'
 
     def get(
         self, request: HttpRequest, *args, month: str | None = None, export: bool = False, **kwargs
-    ) -> HttpResponse:
+    ) -> HttpResponseBase:
         self.month = month
         if export:
             ctx = self._get_base_context()
             title = ctx['title']
-            response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-            filename = f'report_{slugify(title)}.xlsx'
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            report = TimesheetReportExport(ctx['start'], ctx['end'], cast('UserType', self.request.user))
-
-            # FIXME: `response` is incompatible with `payslip_report.StreamWriter`
-            report.write_excel(response, _('Resource report {title}').format(title=title))
-            return response
+            user = cast('UserType', self.request.user)
+
+            content = TimesheetReportExport.get_workbook(
+                ctx['start'], ctx['end'], user, _('Resource report {title}').format(title=title)
+            )
+            # NOTE: the workbook is compressed and small, what is expensive is
+            #       building it - streaming it out in blocks keeps the
+            #       worker from holding a second copy in the response
+            return FileResponse(
+                io.BytesIO(content),
+                as_attachment=True,
+                filename=f'report_{slugify(title)}.xlsx',
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            )
         return super().get(request, *args, **kwargs)
 
     def _get_base_context(self) -> dict:
@@ -354,12 +471,71 @@ class ReportView(LoginRequiredMixin, ReportMixin, TemplateView):
     def get_context_data(self, **kwargs) -> dict[str, Any]:
         ctx = super().get_context_data(**kwargs) | self._get_base_context()
 
-        report_blocks = TimesheetReportOnline(ctx['start'], ctx['end'], cast('UserType', self.request.user))
-        ctx['report_blocks'] = report_blocks.report_html()
+        user = cast('UserType', self.request.user)
+
+        def build(streaming: bool) -> Iterable[ReportBlock]:
+            report = TimesheetReportOnline(ctx['start'], ctx['end'], user, streaming=streaming)
+            return report.iter_blocks() if streaming else report.report_html()
+
+        blocks = partial(
+            artifacts.get_report_blocks,
+            TimesheetReportOnline,
+            ReportArtifact.Kind.REPORT,
+            ctx['start'],
+            ctx['end'],
+            user,
+            build=build,
+            progressive=self.progressive,
+        )
+        if self.progressive:
+            ctx['report_blocks_stream'] = BlockStream(blocks, 'partials/report_block.html')
+        else:
+            ctx['report_blocks'] = blocks()
         return ctx
 
 
-class TaskReportView(LoginRequiredMixin, ReportMixin, TemplateView):
+class ReportExportJobView(ReportView):
+    """Queue the export of the resource report, to be run in the background."""
+
+    http_method_names = ['post']
+
+    def post(self, request: HttpRequest, *args, month: str, **kwargs) -> JsonResponse:
+        self.month = month
+        ctx = self._get_base_context()
+        job = ExportJob.objects.enqueue(
+            cast('UserType', request.user),
+            ExportJob.Kind.REPORT,
+            from_date=ctx['start'].isoformat(),
+            to_date=ctx['end'].isoformat(),
+            title=_('Resource report {title}').format(title=ctx['title']),
+            filename=f'report_{slugify(ctx["title"])}.xlsx',
+        )
+        return JsonResponse(get_export_job_status(job), status=202)
+
+
+class ExportJobView(LoginRequiredMixin, View):
+    """Report the status of an export job queued by the user."""
+
+    login_url = '/admin/login/'
+
+    def get(self, request: HttpRequest, *args, pk: int, **kwargs) -> JsonResponse:
+        job = get_object_or_404(ExportJob.objects.accessible_by(request.user), pk=pk)
+        return JsonResponse(get_export_job_status(job))
+
+
+def get_export_job_status(job: ExportJob) -> dict[str, Any]:
+    return {
+        'id': job.pk,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'error': job.error,
+        'status_url': reverse('export-job', args=[job.pk]),
+        'download_url': job.file_url,
+    }
+
+
+class TaskReportView(LoginRequiredMixin, ProgressiveReportMixin, ReportMixin, TemplateView):
     login_url = '/admin/login/'
     template_name = 'task_report.html'
 
@@ -432,17 +608,34 @@ class TaskReportView(LoginRequiredMixin, ReportMixin, TemplateView):
         context['selected_resource'] = selected_resource
         context['selected_task'] = selected_task
 
-        report_blocks = TimesheetTaskReportOnline(
+        user = cast('UserType', self.request.user)
+        filters = {
+            'project': int(selected_project) if selected_project else None,
+            'resource': int(selected_resource) if selected_resource else None,
+            'task_title': selected_task if selected_task else None,
+        }
+        context['tasks_only'] = tasks_only
+
+        def build(streaming: bool) -> Iterable[ReportBlock]:
+            report = TimesheetTaskReportOnline(ctx['start'], ctx['end'], user, streaming=streaming, **filters)
+            return report.iter_blocks(tasks_only=tasks_only) if streaming else report.report_html(tasks_only=tasks_only)
+
+        blocks = partial(
+            artifacts.get_report_blocks,
+            TimesheetTaskReportOnline,
+            ReportArtifact.Kind.TASK_REPORT,
             ctx['start'],
             ctx['end'],
-            cast('UserType', self.request.user),
-            project=int(selected_project) if selected_project else None,
-            resource=int(selected_resource) if selected_resource else None,
-            task_title=selected_task if selected_task else None,
+            user,
+            build=build,
+            progressive=self.progressive,
+            tasks_only=tasks_only,
+            **filters,
         )
-        context['report_blocks'] = report_blocks.report_html(tasks_only=tasks_only)
-        context['tasks_only'] = tasks_only
-
+        if self.progressive:
+            context['report_blocks_stream'] = BlockStream(blocks, 'partials/task_report_block.html')
+        else:
+            context['report_blocks'] = blocks()
         return context
 
 
@@ -0,0 +1,84 @@
+"""Measurement of the hot paths, stored as JSON and compared against a baseline."""
+
+import dataclasses
+import datetime
+import gc
+import json
+import platform
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@dataclasses.dataclass
+class Measurement:
+    wall_time: float
+    """Seconds, the best of the timed rounds."""
+    queries: int
+    peak_memory: int
+    """Bytes allocated by Python at the peak."""
+
+
+def measure(func: Callable[[], object], rounds: int = 3) -> Measurement:
+    """Measure a function.
+
+    The function is timed `rounds` times, then run once more counting its
+    queries and tracing its memory, which would slow down the timed runs.
+    """
+    wall_times = []
+    for _ in range(rounds):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        wall_times.append(time.perf_counter() - start)
+
+    gc.collect()
+    with CaptureQueriesContext(connection) as queries:
+        tracemalloc.start()
+        try:
+            func()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return Measurement(min(wall_times), len(queries), peak_memory)
+
+
+def compare(results: dict[str, Measurement], baseline: dict[str, Measurement], tolerance: float) -> list[str]:
+    """Return the regressions of the results against the baseline.
+
+    Any extra query is a regression, wall time and peak memory are
+    regressions when they grow by more than `tolerance` (e.g. 0.2 for 20%).
+    Results missing from the baseline are not compared.
+    """
+    regressions = []
+    for name, result in results.items():
+        if (base := baseline.get(name)) is None:
+            continue
+        if result.queries > base.queries:
+            regressions.append(f'{name}: {result.queries} queries, {base.queries} in the baseline')
+        for field, unit in (('wall_time', 's'), ('peak_memory', ' bytes')):
+            value, base_value = getattr(result, field), getattr(base, field)
+            if value > base_value * (1 + tolerance):
+                regressions.append(
+                    f'{name}: {field} {value:.6g}{unit}, {base_value:.6g}{unit} in the baseline'
+                    f' (+{value / base_value - 1:.0%})'
+                )
+    return regressions
+
+
+def dump(results: dict[str, Measurement], path: Path) -> None:
+    data = {
+        'created': datetime.datetime.now(tz=datetime.UTC).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': {name: dataclasses.asdict(result) for name, result in sorted(results.items())},
+    }
+    path.write_text(json.dumps(data, indent=2) + '\n')
+
+
+def load(path: Path) -> dict[str, Measurement]:
+    return {name: Measurement(**result) for name, result in json.loads(path.read_text())['results'].items()}
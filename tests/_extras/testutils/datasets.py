@@ -0,0 +1,152 @@
+"""Synthetic datasets shaped like a real company, built with the factories."""
+
+import dataclasses
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+
+from krm3.core.models import Reimbursement, Resource, Task, TimeEntry, User
+from krm3.currencies.models import Currency
+from testutils.factories import (
+    CityFactory,
+    ClientFactory,
+    ContractFactory,
+    DocumentTypeFactory,
+    ExpenseCategoryFactory,
+    ExpenseFactory,
+    ExtraHolidayFactory,
+    MissionFactory,
+    PaymentCategoryFactory,
+    ProjectFactory,
+    ReimbursementFactory,
+    ResourceFactory,
+    SpecialLeaveReasonFactory,
+    SuperUserFactory,
+    TaskFactory,
+    TimeEntryFactory,
+    TimesheetSubmissionFactory,
+)
+
+PART_TIME = {'mon': 4, 'tue': 4, 'wed': 4, 'thu': 4, 'fri': 4, 'sat': 0, 'sun': 0}
+
+
+@dataclasses.dataclass
+class Dataset:
+    """A dataset of `size` resources working through the previous month, submitted, and `month`, still open."""
+
+    size: int
+    month: date
+    admin: User
+    resources: list[Resource]
+    tasks: list[Task]
+    """The task of each resource."""
+    reimbursements: list[Reimbursement]
+
+    @property
+    def from_date(self) -> date:
+        return self.month
+
+    @property
+    def to_date(self) -> date:
+        return self.month + relativedelta(months=1, days=-1)
+
+
+def build_dataset(size: int, month: date = date(2025, 5, 1)) -> Dataset:
+    """Build a dataset of `size` resources.
+
+    Every resource has a contract, one part time in five, a task, and
+    time entries on each working day of `month` and the month before:
+    mostly work, with the odd holiday, leave, sick day or night shift.
+    The month before is submitted, and each resource has a mission with
+    a few expenses reimbursed in `month`. `month` also has an extra
+    holiday.
+    """
+    previous_month = month - relativedelta(months=1)
+    admin = SuperUserFactory()
+    client = ClientFactory(name='Benchmark client')
+    projects = [ProjectFactory(name=f'Benchmark project {n}', client=client) for n in range(max(1, size // 10))]
+    ExtraHolidayFactory(period=(month + timedelta(days=15), month + timedelta(days=16)), reason='Patron saint')
+    SpecialLeaveReasonFactory(title='Wedding')
+
+    resources, tasks = [], []
+    for n in range(size):
+        resource = ResourceFactory(first_name='Resource', last_name=f'Benchmark {n:04}')
+        ContractFactory(
+            resource=resource, period=(date(2024, 1, 1), None), working_schedule=PART_TIME if n % 5 == 4 else {}
+        )
+        resources.append(resource)
+        tasks.append(TaskFactory(resource=resource, project=projects[n % len(projects)], start_date=date(2024, 1, 1)))
+
+    TimeEntry.objects.bulk_create(
+        entry
+        for resource, task in zip(resources, tasks, strict=True)
+        for entry in _time_entries(resource, task, previous_month, month + relativedelta(months=1))
+    )
+    for resource in resources:
+        TimesheetSubmissionFactory(resource=resource, period=(previous_month, month))
+
+    return Dataset(size, month, admin, resources, tasks, _reimbursements(resources, projects, previous_month, month))
+
+
+def _time_entries(resource, task, from_date, to_date):
+    day = from_date
+    while day < to_date:
+        if day.weekday() < 5:
+            match (resource.pk + day.toordinal()) % 23:
+                case 0:
+                    yield TimeEntryFactory.build(resource=resource, date=day, day_shift_hours=0, holiday_hours=8)
+                case 1:
+                    yield TimeEntryFactory.build(
+                        resource=resource,
+                        date=day,
+                        day_shift_hours=0,
+                        sick_hours=8,
+                        protocol_number='12345',
+                        comment='Flu',
+                    )
+                case 2:
+                    yield TimeEntryFactory.build(
+                        resource=resource, date=day, day_shift_hours=0, leave_hours=8, comment='Family'
+                    )
+                case 3:
+                    yield TimeEntryFactory.build(
+                        resource=resource, task=task, date=day, day_shift_hours=8, night_shift_hours=2
+                    )
+                case _:
+                    yield TimeEntryFactory.build(resource=resource, task=task, date=day, day_shift_hours=8)
+        day += timedelta(days=1)
+
+
+def _reimbursements(resources, projects, mission_month, month):
+    currency, _ = Currency.objects.get_or_create(
+        iso3='EUR', defaults={'title': 'EUR', 'symbol': '€', 'fractional_unit': 'cents', 'base': 100, 'active': True}
+    )
+    city = CityFactory()
+    categories = [ExpenseCategoryFactory(title=title) for title in ('Alloggio', 'Vitto', 'Viaggio')]
+    payment_types = [PaymentCategoryFactory(title=title) for title in ('Azienda', 'Personale')]
+    document_type = DocumentTypeFactory(title='Scontrino')
+    reimbursements = []
+    for n, resource in enumerate(resources):
+        from_date = mission_month + timedelta(days=n % 20)
+        mission = MissionFactory(
+            resource=resource,
+            project=projects[n % len(projects)],
+            city=city,
+            default_currency=currency,
+            number=n + 1,
+            from_date=from_date,
+            to_date=from_date + timedelta(days=3),
+        )
+        reimbursement = ReimbursementFactory(resource=resource, year=month.year, month=f'{month:%B}')
+        for day, category in enumerate(categories):
+            ExpenseFactory(
+                mission=mission,
+                reimbursement=reimbursement,
+                day=from_date + timedelta(days=day),
+                currency=currency,
+                category=category,
+                payment_type=payment_types[day % 2],
+                document_type=document_type,
+            )
+        reimbursements.append(reimbursement)
+    return reimbursements
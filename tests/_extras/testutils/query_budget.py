@@ -0,0 +1,82 @@
+"""Budgets of SQL queries, to catch the queries creeping into the hot paths.
+
+Wrap the code under test, usually one request, with the maximum number of
+queries it may run on a given dataset shape:
+
+    with query_budget('GET /timesheet', 12):
+        client.get(url, data=params)
+
+or decorate a function with it. When the budget is exceeded, the failure
+lists the queries run more than once, i.e. the likely N+1s, with where
+they come from.
+"""
+
+import contextlib
+import traceback
+from collections import defaultdict
+from collections.abc import Iterator
+from pathlib import Path
+
+import krm3
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from krm3.utils.queries import duplicates, fingerprint
+
+# frames outside of these are Django, DRF or pytest internals
+_OWN_CODE = (str(Path(krm3.__file__).parent), str(Path(__file__).parents[2]))
+_STACK_DEPTH = 8
+
+
+class QueryBudgetExceededError(AssertionError):
+    pass
+
+
+@contextlib.contextmanager
+def query_budget(name: str, max_queries: int, using: str = DEFAULT_DB_ALIAS) -> Iterator[list[str]]:
+    """Fail when the wrapped code runs more than `max_queries` queries.
+
+    :param name: the endpoint or function under budget, for the failure message
+    :param max_queries: the number of queries allowed
+    :param using: the alias of the database whose queries are counted
+    :return: the SQL of the queries run so far
+    """
+    queries: list[str] = []
+    stacks: dict[str, list[traceback.FrameSummary]] = {}
+
+    def record(execute, sql, params, many, context):  # noqa: ANN001, ANN202
+        queries.append(sql)
+        stacks.setdefault(fingerprint(sql), _own_frames())
+        return execute(sql, params, many, context)
+
+    with connections[using].execute_wrapper(record):
+        yield queries
+
+    if len(queries) > max_queries:
+        raise QueryBudgetExceededError(_report(name, max_queries, queries, stacks))
+
+
+def _own_frames() -> list[traceback.FrameSummary]:
+    frames = [
+        frame
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(_OWN_CODE) and frame.filename != __file__
+    ]
+    return frames[-_STACK_DEPTH:]
+
+
+def _report(name: str, max_queries: int, queries: list[str], stacks: dict[str, list]) -> str:
+    lines = [f'{name}: {len(queries)} queries, over the budget of {max_queries}']
+    repeated = duplicates(queries)
+    if repeated:
+        lines.append('queries run more than once:')
+    else:
+        # nothing repeated: list them all, the budget may just be stale
+        repeated = defaultdict(int)
+        for sql in queries:
+            repeated[fingerprint(sql)] += 1
+    for sql, count in repeated.items():
+        lines.append(f'\n{count} x {sql}')
+        lines.extend(
+            f'    {frame.filename}:{frame.lineno} in {frame.name}\n      {frame.line}' for frame in stacks[sql]
+        )
+    return '\n'.join(lines)
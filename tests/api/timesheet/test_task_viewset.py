@@ -10,6 +10,8 @@ from constance.test import override_config
 from django import test as django_test
 from django.contrib.auth.models import Permission
 from django.core import exceptions
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.reverse import reverse
 from testutils.factories import (
@@ -402,17 +404,24 @@ class TestTaskAPIListView:
             },
         }
 
-        assert response.json() == expected_response
+        def _by_id(data):
+            # the time entries are not ordered
+            data['timeEntries'].sort(key=lambda entry: entry['id'])
+            return data
+
+        assert _by_id(response.json()) == _by_id(expected_response)
 
         expected_response['tasks'][0]['adminUrl'] = reverse('admin:core_task_change', args=[task.pk])
 
         assert (
-            api_client(user=timesheet_api_staff_user)
-            .get(
-                self.url(),
-                data=api_data,
+            _by_id(
+                api_client(user=timesheet_api_staff_user)
+                .get(
+                    self.url(),
+                    data=api_data,
+                )
+                .json()
             )
-            .json()
             == expected_response
         ), 'check that for the task, a staff user receives a URL'
 
@@ -587,6 +596,37 @@ class TestTaskAPIListView:
         )
         assert response.json()['schedule'] == expected_schedule
 
+    def test_query_count_does_not_depend_on_days(self, admin_user, api_client):
+        resource = ResourceFactory()
+        ContractFactory(resource=resource, period=(datetime.date(2024, 1, 1), datetime.date(2024, 2, 15)))
+        ContractFactory(resource=resource, period=(datetime.date(2024, 2, 15), None), meal_voucher={'mon': 6})
+        TimesheetSubmissionFactory(resource=resource, period=(datetime.date(2024, 1, 1), datetime.date(2024, 2, 1)))
+        task = TaskFactory(resource=resource, start_date=datetime.date(2024, 1, 1))
+        reason = SpecialLeaveReasonFactory()
+        for day in range(1, 29):
+            TimeEntryFactory(resource=resource, task=task, date=datetime.date(2024, 2, day), day_shift_hours=4)
+            if datetime.date(2024, 3, day).weekday() >= 5:
+                continue
+            TimeEntryFactory(
+                resource=resource,
+                date=datetime.date(2024, 3, day),
+                day_shift_hours=0,
+                special_leave_hours=2,
+                special_leave_reason=reason,
+            )
+        client = api_client(user=admin_user)
+
+        def count_queries(end_date: str) -> int:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(
+                    self.url(), data={'resource_id': resource.pk, 'start_date': '2024-01-29', 'end_date': end_date}
+                )
+            assert response.status_code == status.HTTP_200_OK
+            return len(queries)
+
+        count_queries('2024-01-29')  # warm up the process-wide caches
+        assert count_queries('2024-02-04') == count_queries('2024-03-31')
+
     def test_picks_only_ongoing_tasks(self, admin_user, api_client):
         project = ProjectFactory(start_date=datetime.date(2022, 1, 1))
 
@@ -1212,6 +1252,76 @@ class TestTimeEntryAPICreateView:
         assert instances.count() == 5
         assert set(instances.values_list('date', flat=True)) == {datetime.date(2024, 1, day) for day in range(8, 13)}
 
+    def test_query_count_does_not_depend_on_dates(self, admin_user, api_client):
+        task = TaskFactory(start_date=datetime.date(2024, 1, 1))
+        ContractFactory(resource=task.resource, period=(datetime.date(2024, 1, 1), None))
+        client = api_client(user=admin_user)
+
+        def count_queries(dates: list[str]) -> int:
+            time_entry_data = {'dates': dates, 'taskId': task.pk, 'resourceId': task.resource.pk, 'dayShiftHours': 8}
+            with CaptureQueriesContext(connection) as queries:
+                response = client.post(self.url(), data=time_entry_data, format='json')
+            assert response.status_code == status.HTTP_201_CREATED
+            return len(queries)
+
+        count_queries(['2024-01-08'])  # warm up the process-wide caches
+        assert count_queries(['2024-01-15', '2024-01-16']) == count_queries(
+            [f'2024-02-{day:02}' for day in range(5, 10)] + [f'2024-02-{day:02}' for day in range(12, 17)]
+        )
+
+    def test_overwrites_entries_on_multiple_days(self, admin_user, api_client):
+        task = TaskFactory(start_date=datetime.date(2024, 1, 1))
+        resource = task.resource
+        holiday = TimeEntryFactory(
+            resource=resource, date=datetime.date(2024, 1, 8), day_shift_hours=0, holiday_hours=8
+        )
+        task_entry = TimeEntryFactory(
+            resource=resource, task=task, date=datetime.date(2024, 1, 9), day_shift_hours=2, comment='kept'
+        )
+
+        time_entry_data = {
+            'dates': ['2024-01-08', '2024-01-09', '2024-01-10'],
+            'taskId': task.pk,
+            'resourceId': resource.pk,
+            'dayShiftHours': 6,
+        }
+        response = api_client(user=admin_user).post(self.url(), data=time_entry_data, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+
+        assert not TimeEntry.objects.filter(pk=holiday.pk).exists()
+        task_entry.refresh_from_db()
+        assert (task_entry.day_shift_hours, task_entry.comment) == (6, 'kept')
+        assert list(
+            TimeEntry.objects.filter(resource=resource).order_by('date').values_list('date', 'day_shift_hours')
+        ) == [(datetime.date(2024, 1, day), 6) for day in (8, 9, 10)]
+
+    @override_config(BANK_HOURS_UPPER_BOUND=14.0)
+    def test_reports_errors_for_each_invalid_date(self, admin_user, api_client):
+        task = TaskFactory(start_date=datetime.date(2024, 1, 1))
+        resource = task.resource
+        for day in range(8, 13):
+            TimeEntryFactory(resource=resource, task=task, date=datetime.date(2024, 1, day), day_shift_hours=12)
+        TimesheetSubmissionFactory(
+            resource=resource, period=(datetime.date(2024, 1, 12), datetime.date(2024, 1, 13)), closed=True
+        )
+
+        time_entry_data = {
+            'dates': [f'2024-01-{day:02}' for day in range(8, 13)],
+            'resourceId': resource.pk,
+            'dayShiftHours': 0,
+            'bankTo': 4,
+        }
+        response = api_client(user=admin_user).post(self.url(), data=time_entry_data, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        # the balance grows day by day, up to the limit
+        errors = response.json()['errors']
+        assert list(errors) == ['2024-01-11', '2024-01-12']
+        assert 'This transaction would exceed the maximum bank balance of 14.0 hours' in errors['2024-01-11'][0]
+        assert 'Cannot modify time entries for submitted timesheets' in errors['2024-01-12']
+        assert response.json()['error'].startswith('Invalid time entry for 2024-01-11: ')
+        assert not TimeEntry.objects.filter(resource=resource, bank_to__gt=0).exists()
+
     def test_rejects_new_time_entries_summing_up_to_more_than_24_hours(self, admin_user, api_client):
         today = datetime.date(2024, 1, 1)
         resource = ResourceFactory()
@@ -1591,7 +1701,15 @@ class TestTimeEntryClearAPIAction:
         response = api_client(user=admin_user).post(
             self.url(), data={'ids': [day_entry.pk, task_entry.pk]}, format='json'
         )
-        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            'entries': 2,
+            'bankDeposits': 0,
+            'days': [
+                {'resource': day_entry.resource_id, 'date': '2024-01-01'},
+                {'resource': task_entry.resource_id, 'date': '2024-01-02'},
+            ],
+        }
         assert not TimeEntry.objects.filter(pk__in=[day_entry.pk, task_entry.pk]).exists()
 
     @pytest.mark.parametrize(
@@ -1609,7 +1727,7 @@ class TestTimeEntryClearAPIAction:
             ),
             pytest.param(
                 ['view_any_project', 'manage_any_timesheet'],
-                status.HTTP_204_NO_CONTENT,
+                status.HTTP_200_OK,
                 id='project_viewer_and_timesheet_manager',
             ),
             pytest.param(
@@ -1619,7 +1737,7 @@ class TestTimeEntryClearAPIAction:
             ),
             pytest.param(
                 ['manage_any_project', 'manage_any_timesheet'],
-                status.HTTP_204_NO_CONTENT,
+                status.HTTP_200_OK,
                 id='project_manager_and_timesheet_manager',
             ),
         ],
@@ -1649,7 +1767,8 @@ class TestTimeEntryClearAPIAction:
         # nothing to delete
         if expected_status_code < 400:
             response = api_client(user=regular_user).post(self.url(), data={'ids': [entry.pk]}, format='json')
-            assert response.status_code == status.HTTP_204_NO_CONTENT
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json()['entries'] == 0
 
 
 class TestSpecialLeaveReasonViewSet:
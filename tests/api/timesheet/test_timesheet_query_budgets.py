@@ -0,0 +1,67 @@
+import datetime
+
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+from testutils.datasets import build_dataset
+from testutils.query_budget import query_budget
+
+from krm3.core.models import TimeEntry
+
+pytestmark = pytest.mark.django_db
+
+# NOTE: the same budget holds for every dataset shape, the queries must not
+#       grow with the days in the timesheet or the entries sent
+
+
+@pytest.fixture
+def dataset():
+    return build_dataset(3)
+
+
+@pytest.mark.parametrize('days', [pytest.param(7, id='week'), pytest.param(31, id='month')])
+def test_timesheet_query_budget(api_client, dataset, days):
+    client = api_client(user=dataset.admin)
+    params = {
+        'resource_id': dataset.resources[0].pk,
+        'start_date': dataset.from_date,
+        'end_date': dataset.from_date + datetime.timedelta(days=days - 1),
+    }
+
+    with query_budget('GET /timesheet', 17):
+        response = client.get(reverse('timesheet-api:api-timesheet-list'), data=params)
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.parametrize('days', [pytest.param(1, id='1-day'), pytest.param(5, id='5-days')])
+def test_time_entry_create_query_budget(api_client, dataset, days):
+    # the week after the dataset month has no time entries yet
+    monday = dataset.to_date + datetime.timedelta(days=7 - dataset.to_date.weekday())
+    data = {
+        'dates': [monday + datetime.timedelta(days=n) for n in range(days)],
+        'dayShiftHours': 4,
+        'taskId': dataset.tasks[0].pk,
+        'resourceId': dataset.resources[0].pk,
+    }
+
+    with query_budget('POST /timeentries', 25):
+        response = api_client(user=dataset.admin).post(
+            reverse('timesheet-api:api-time-entry-list'), data=data, format='json'
+        )
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+@pytest.mark.parametrize('entries', [pytest.param(1, id='1-entry'), pytest.param(10, id='10-entries')])
+def test_time_entry_clear_query_budget(api_client, dataset, entries):
+    ids = list(
+        TimeEntry.objects.filter(resource=dataset.resources[0], date__gte=dataset.from_date)
+        .order_by('date')
+        .values_list('pk', flat=True)[:entries]
+    )
+
+    # the post_delete receivers look for a bank deposit on the day of each entry
+    with query_budget('POST /timeentries/clear', 8 + entries):
+        response = api_client(user=dataset.admin).post(
+            reverse('timesheet-api:api-time-entry-clear'), data={'ids': ids}, format='json'
+        )
+    assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,102 @@
+"""Benchmarks of the hot paths, only run with `--benchmark`.
+
+The dataset of each size is built once, in a transaction rolled back
+after the benchmarks using it. Run the benchmarks without `-n`, and
+compare them only against a baseline recorded on the same machine:
+
+    pytest tests/benchmarks --benchmark --benchmark-json=baseline.json
+    pytest tests/benchmarks --benchmark --benchmark-baseline=baseline.json
+"""
+
+from pathlib import Path
+
+import pytest
+from django.db import transaction
+
+BENCHMARKS_DIR = Path(__file__).parent
+RESULTS = pytest.StashKey[dict]()
+
+
+def pytest_generate_tests(metafunc):
+    if 'dataset_size' in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption('benchmark_sizes').split(',')]
+        metafunc.parametrize('dataset_size', sizes, ids=[f'{size}-resources' for size in sizes], scope='session')
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    if not config.getoption('benchmark'):
+        skip = pytest.mark.skip(reason='benchmarks only run with --benchmark')
+        for item in items:
+            if BENCHMARKS_DIR in item.path.parents:
+                item.add_marker(skip)
+        return
+
+    # NOTE: grouped by dataset, even if shuffled, so that each is built once
+    def dataset_size(item):
+        callspec = getattr(item, 'callspec', None)
+        return callspec.params.get('dataset_size', 0) if callspec else 0
+
+    items.sort(key=dataset_size)
+
+
+def pytest_configure(config):
+    config.stash[RESULTS] = {}
+
+
+def pytest_sessionfinish(session):
+    results = session.config.stash.get(RESULTS, None)
+    if results and (path := session.config.getoption('benchmark_json')):
+        from testutils import benchmarks
+
+        benchmarks.dump(results, Path(path))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not (results := config.stash.get(RESULTS, None)):
+        return
+    terminalreporter.section('benchmarks')
+    terminalreporter.write_line(f'{"":<50} {"wall time":>12} {"queries":>8} {"peak memory":>12}')
+    for name, result in sorted(results.items()):
+        terminalreporter.write_line(
+            f'{name:<50} {result.wall_time:>11.3f}s {result.queries:>8} {result.peak_memory / 2**20:>8.1f} MiB'
+        )
+
+
+@pytest.fixture(scope='session')
+def dataset(dataset_size, django_db_setup, django_db_blocker):
+    from testutils.datasets import build_dataset
+
+    with django_db_blocker.unblock(), transaction.atomic():
+        yield build_dataset(dataset_size)
+        transaction.set_rollback(True)
+
+
+@pytest.fixture(autouse=True)
+def no_report_cache(settings):
+    settings.CACHES = settings.CACHES | {'benchmark': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    settings.REPORT_CACHE = 'benchmark'
+    settings.REPORT_FRAGMENT_CACHE = 'benchmark'
+
+
+@pytest.fixture
+def benchmark(request, dataset):
+    """Measure a hot path on the dataset, failing on regressions against the baseline.
+
+    Usage: `benchmark('name', func)`, where `func` takes no arguments.
+    """
+    from testutils import benchmarks
+
+    config = request.config
+    baseline_path = config.getoption('benchmark_baseline')
+    baseline = benchmarks.load(Path(baseline_path)) if baseline_path else {}
+
+    def run(name, func):
+        key = f'{name}[{dataset.size}]'
+        result = benchmarks.measure(func, rounds=config.getoption('benchmark_rounds'))
+        config.stash[RESULTS][key] = result
+        if regressions := benchmarks.compare({key: result}, baseline, config.getoption('benchmark_tolerance')):
+            pytest.fail('\n'.join(regressions), pytrace=False)
+        return result
+
+    return run
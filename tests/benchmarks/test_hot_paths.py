@@ -0,0 +1,66 @@
+import io
+import itertools
+from datetime import timedelta
+
+import pytest
+
+from krm3.core.models import Reimbursement, TimeEntry
+from krm3.missions.admin.reimbursement import prepare_reimbursement_report_data
+from krm3.timesheet.api.serializers import TimesheetSerializer
+from krm3.timesheet.dto import TimesheetDTO
+from krm3.timesheet.report.availability import AvailabilityReportOnline
+from krm3.timesheet.report.payslip import TimesheetReportOnline
+from krm3.timesheet.report.payslip_report import TimesheetReportExport
+from krm3.timesheet.report.task import TimesheetTaskReportOnline
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize(
+    'report_class',
+    [TimesheetReportOnline, TimesheetTaskReportOnline, AvailabilityReportOnline],
+    ids=lambda c: c.__name__,
+)
+def test_online_report(benchmark, dataset, report_class):
+    benchmark(
+        f'report.{report_class.__name__}',
+        lambda: report_class(dataset.from_date, dataset.to_date, dataset.admin).report_html(),
+    )
+
+
+def test_report_export(benchmark, dataset):
+    benchmark(
+        'report.TimesheetReportExport',
+        lambda: TimesheetReportExport(dataset.from_date, dataset.to_date, dataset.admin).write_excel(
+            io.BytesIO(), 'Report'
+        ),
+    )
+
+
+def test_timesheet_fetch(benchmark, dataset):
+    resource = dataset.resources[0]
+
+    def fetch():
+        timesheet = TimesheetDTO(requested_by=dataset.admin).fetch(resource, dataset.from_date, dataset.to_date)
+        return TimesheetSerializer(timesheet).data
+
+    benchmark('timesheet.fetch', fetch)
+
+
+def test_time_entry_save(benchmark, dataset):
+    # a few overtime hours on the weekend, which has no entries yet
+    saturday = dataset.from_date + timedelta(days=(5 - dataset.from_date.weekday()) % 7)
+    weekend = [saturday, saturday + timedelta(days=1)]
+    slots = itertools.product(weekend, zip(dataset.resources, dataset.tasks, strict=True))
+
+    def save():
+        day, (resource, task) = next(slots)
+        TimeEntry(resource=resource, task=task, date=day, day_shift_hours=2).save()
+
+    benchmark('time_entry.save', save)
+
+
+def test_reimbursement_report_data(benchmark, dataset):
+    reimbursements = Reimbursement.objects.filter(year=dataset.month.year, month=f'{dataset.month:%B}')
+
+    benchmark('reimbursement.report_data', lambda: prepare_reimbursement_report_data(reimbursements))
@@ -12,6 +12,23 @@ if typing.TYPE_CHECKING:
     from krm3.core.models import Resource
 
 
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmark', 'benchmarks of the hot paths, see tests/benchmarks')
+    group.addoption('--benchmark', action='store_true', help='run the benchmarks')
+    group.addoption(
+        '--benchmark-sizes', default='10,100,1000', help='comma separated resource counts of the benchmark datasets'
+    )
+    group.addoption('--benchmark-rounds', type=int, default=3, help='timed runs of each benchmark, the best is kept')
+    group.addoption('--benchmark-json', metavar='PATH', help='store the benchmark results as JSON')
+    group.addoption('--benchmark-baseline', metavar='PATH', help='fail the benchmarks regressing against these results')
+    group.addoption(
+        '--benchmark-tolerance',
+        type=float,
+        default=0.2,
+        help='wall time and peak memory growth allowed against the baseline',
+    )
+
+
 def pytest_configure(config):
     here = Path(__file__).parent
     sys.path.insert(0, str(here / '_extras'))
@@ -61,6 +78,26 @@ def events_settings(settings):
     }
 
 
+@pytest.fixture(autouse=True)
+def query_stats_settings(settings):
+    """Keep the sampled query stats, and the lookup of their flag, out of the query counts of the tests."""
+    settings.QUERY_STATS_SAMPLE_RATE = 0
+
+
+@pytest.fixture
+def extra_holiday_index():
+    from krm3.core.extra_holidays import extra_holiday_index
+
+    return extra_holiday_index
+
+
+@pytest.fixture
+def report_cache():
+    from krm3.core.report_cache import report_cache
+
+    return report_cache
+
+
 @pytest.fixture(autouse=True)
 def currencies(db):
     from krm3.currencies.models import Currency
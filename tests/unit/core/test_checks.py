@@ -0,0 +1,26 @@
+import pytest
+
+from krm3.core.checks import check_report_cache
+
+
+@pytest.mark.parametrize(
+    ('backend', 'debug', 'errors'),
+    [
+        pytest.param('django.core.cache.backends.db.DatabaseCache', False, [], id='shared'),
+        pytest.param('django.core.cache.backends.locmem.LocMemCache', False, ['krm3.E002'], id='process-local'),
+        pytest.param('django.core.cache.backends.locmem.LocMemCache', True, [], id='process-local-debug'),
+    ],
+)
+def test_report_cache_must_be_shared(settings, backend, debug, errors):
+    settings.CACHES = settings.CACHES | {'reports': {'BACKEND': backend, 'LOCATION': 'krm3_report_cache'}}
+    settings.REPORT_CACHE = 'reports'
+    settings.DEBUG = debug
+
+    assert [error.id for error in check_report_cache(None)] == errors
+
+
+@pytest.mark.parametrize('setting', ['REPORT_CACHE', 'REPORT_FRAGMENT_CACHE'])
+def test_report_cache_must_be_configured(settings, setting):
+    setattr(settings, setting, 'missing')
+
+    assert [error.id for error in check_report_cache(None)] == ['krm3.E001']
@@ -0,0 +1,285 @@
+import datetime
+import io
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import openpyxl
+import pytest
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from testutils.factories import ContractFactory, ReimbursementFactory, SuperUserFactory, UserFactory
+
+from krm3.core import export_jobs
+from krm3.core.models import ExportJob
+
+
+@pytest.fixture(autouse=True)
+def export_storage(tmp_path, settings):
+    settings.PRIVATE_MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+class InlineExecutor(Executor):
+    """Run the submitted jobs right away, in this process."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:  # noqa: BLE001
+            future.set_exception(e)
+        return future
+
+
+class BrokenExecutor(Executor):
+    """A pool whose worker died, while running the first job or before it."""
+
+    def __init__(self, *, on_submit=False):
+        self.on_submit = on_submit
+
+    def submit(self, fn, /, *args, **kwargs):
+        if self.on_submit:
+            raise BrokenProcessPool('A child process terminated abruptly')
+        future = Future()
+        future.set_exception(BrokenProcessPool('A child process terminated abruptly'))
+        self.on_submit = True
+        return future
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    """Replace the process pools of `serve()` with the given executors, then with inline ones."""
+    created = []
+
+    def fx(*executors):
+        queue = list(executors)
+
+        def new_pool(workers):
+            created.append(queue.pop(0) if queue else InlineExecutor())
+            return created[-1]
+
+        monkeypatch.setattr(export_jobs, '_new_pool', new_pool)
+        return created
+
+    return fx
+
+
+def _enqueue_report(user):
+    return ExportJob.objects.enqueue(
+        user,
+        ExportJob.Kind.REPORT,
+        from_date='2025-06-01',
+        to_date='2025-06-30',
+        title='Resource report June 2025',
+        filename='report_june-2025.xlsx',
+    )
+
+
+class TestExportJob:
+    def test_claim_takes_the_oldest_queued_job(self, db):
+        user = UserFactory()
+        first, second = _enqueue_report(user), _enqueue_report(user)
+
+        assert ExportJob.objects.claim() == first
+        assert ExportJob.objects.claim() == second
+        assert ExportJob.objects.claim() is None
+
+        first.refresh_from_db()
+        assert first.status == ExportJob.Status.RUNNING
+        assert first.started is not None
+
+    def test_claim_takes_stale_running_jobs_again(self, db, settings):
+        settings.EXPORT_JOB_TIMEOUT = 60
+        job = _enqueue_report(UserFactory())
+        ExportJob.objects.claim()
+        assert ExportJob.objects.claim() is None
+
+        ExportJob.objects.update(started=timezone.now() - datetime.timedelta(seconds=61))
+        assert ExportJob.objects.claim() == job
+
+        ExportJob.objects.update(started=timezone.now() - datetime.timedelta(seconds=61))
+        assert ExportJob.objects.claim() is None
+        job.refresh_from_db()
+        assert (job.status, job.attempts, job.error) == (
+            ExportJob.Status.FAILED,
+            2,
+            'The export did not finish in time',
+        )
+
+    def test_purge_deletes_the_old_jobs_and_their_files(self, db, export_storage, django_capture_on_commit_callbacks):
+        user = UserFactory()
+        old, recent, queued = _enqueue_report(user), _enqueue_report(user), _enqueue_report(user)
+        for job in (old, recent):
+            job.complete('report.xlsx', b'report')
+        ExportJob.objects.filter(pk=old.pk).update(finished=timezone.now() - datetime.timedelta(days=8))
+        old_file = export_storage / old.file.name
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert export_jobs.purge() == 1
+
+        assert set(ExportJob.objects.all()) == {recent, queued}
+        assert not old_file.exists()
+        assert (export_storage / recent.file.name).exists()
+
+    def test_set_progress(self, db):
+        job = _enqueue_report(UserFactory())
+
+        job.set_progress(1, 3)
+
+        job.refresh_from_db()
+        assert job.progress == 33
+
+
+class TestRun:
+    def test_stores_the_report_export(self, db):
+        ContractFactory(period=(datetime.date(2025, 1, 1), None), resource__preferred_in_report=True)
+        job = _enqueue_report(SuperUserFactory())
+
+        assert export_jobs.run(ExportJob.objects.claim().pk) == ExportJob.Status.DONE
+
+        job.refresh_from_db()
+        assert (job.progress, job.error) == (100, '')
+        assert job.file.name.endswith('/report_june-2025.xlsx')
+        with job.file.open('rb') as f:
+            assert openpyxl.load_workbook(io.BytesIO(f.read())).sheetnames == ['Resource report June 2025']
+
+    def test_records_the_failure(self, db):
+        job = ExportJob.objects.enqueue(
+            UserFactory(), ExportJob.Kind.REIMBURSEMENT_EXPENSES, reimbursement=0, format='csv'
+        )
+
+        assert export_jobs.run(ExportJob.objects.claim().pk) == ExportJob.Status.FAILED
+
+        job.refresh_from_db()
+        assert job.error
+        assert not job.file
+
+    def test_records_the_failure_to_load_the_exporter(self, db, monkeypatch):
+        monkeypatch.setattr(export_jobs, 'EXPORTERS', {})
+        job = _enqueue_report(UserFactory())
+
+        assert export_jobs.run(ExportJob.objects.claim().pk) == ExportJob.Status.FAILED
+
+        job.refresh_from_db()
+        assert (job.status, job.error) == (ExportJob.Status.FAILED, "'report'")
+
+    def test_serve_runs_the_queued_jobs_inline(self, db):
+        user = SuperUserFactory()
+        _enqueue_report(user)
+        _enqueue_report(user)
+
+        assert export_jobs.serve(0, once=True) == 2
+        assert set(ExportJob.objects.values_list('status', flat=True)) == {ExportJob.Status.DONE}
+
+
+class TestServe:
+    @pytest.fixture(autouse=True)
+    def no_report_cache(self, settings):
+        settings.CACHES = settings.CACHES | {'dummy': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        settings.REPORT_CACHE = 'dummy'
+        settings.REPORT_FRAGMENT_CACHE = 'dummy'
+
+    def test_runs_the_queued_jobs_in_the_pool(self, db, pools):
+        created = pools()
+        user = SuperUserFactory()
+        jobs = [_enqueue_report(user) for _ in range(3)]
+
+        assert export_jobs.serve(2, once=True) == 3
+
+        assert len(created) == 1
+        assert {job.status for job in ExportJob.objects.filter(pk__in=[job.pk for job in jobs])} == {
+            ExportJob.Status.DONE
+        }
+
+    def test_fails_the_jobs_of_a_broken_pool_and_replaces_it(self, db, pools):
+        created = pools(BrokenExecutor())
+        user = SuperUserFactory()
+        first, second = _enqueue_report(user), _enqueue_report(user)
+
+        assert export_jobs.serve(1, once=True) == 2
+
+        assert len(created) == 2
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert (first.status, first.error) == (ExportJob.Status.FAILED, 'The export worker stopped abruptly')
+        assert second.status == ExportJob.Status.DONE
+
+    def test_runs_the_job_claimed_by_a_pool_broken_meanwhile(self, db, pools):
+        created = pools(BrokenExecutor(on_submit=True))
+        job = _enqueue_report(SuperUserFactory())
+
+        assert export_jobs.serve(1, once=True) == 1
+
+        assert len(created) == 2
+        job.refresh_from_db()
+        assert job.status == ExportJob.Status.DONE
+
+    def test_fails_the_jobs_the_pool_could_not_run(self, db, pools, monkeypatch):
+        pools()
+        monkeypatch.setattr(export_jobs, 'run', lambda job_id: 1 / 0)
+        job = _enqueue_report(SuperUserFactory())
+
+        assert export_jobs.serve(1, once=True) == 1
+
+        job.refresh_from_db()
+        assert (job.status, job.error) == (ExportJob.Status.FAILED, 'division by zero')
+
+
+class TestExportJobViews:
+    def test_report_export_is_queued(self, admin_client):
+        response = admin_client.post(reverse('export-report-job', args=['202506']))
+
+        assert response.status_code == 202
+        job = ExportJob.objects.get()
+        assert job.params == {
+            'from_date': '2025-06-01',
+            'to_date': '2025-06-30',
+            'title': 'Resource report June 2025',
+            'filename': 'report_june-2025.xlsx',
+        }
+        assert response.json() == {
+            'id': job.pk,
+            'kind': 'report',
+            'status': 'queued',
+            'progress': 0,
+            'error': '',
+            'status_url': reverse('export-job', args=[job.pk]),
+            'download_url': None,
+        }
+
+    def test_status_and_download_of_a_done_job(self, client, db):
+        user = SuperUserFactory()
+        client.login(username=user.username, password='password')
+        job = _enqueue_report(user)
+        export_jobs.serve(0, once=True)
+
+        status = client.get(reverse('export-job', args=[job.pk])).json()
+        assert status['status'] == 'done'
+        assert status['download_url'] == reverse('media-auth:export-file', args=[job.pk])
+
+        response = client.get(status['download_url'])
+        job.refresh_from_db()
+        assert response['X-Accel-Redirect'] == f'{settings.PRIVATE_MEDIA_URL}{job.file.name}'
+
+    def test_jobs_of_other_users_are_hidden(self, client, db):
+        user = UserFactory()
+        client.login(username=user.username, password='password')
+        job = _enqueue_report(SuperUserFactory())
+        export_jobs.serve(0, once=True)
+
+        assert client.get(reverse('export-job', args=[job.pk])).status_code == 404
+        assert client.get(reverse('media-auth:export-file', args=[job.pk])).status_code == 403
+
+    def test_reimbursement_export_is_queued_from_the_admin(self, admin_client):
+        reimbursement = ReimbursementFactory()
+        url = reverse('admin:core_reimbursement_overview', args=[reimbursement.pk])
+
+        response = admin_client.get(url, {'_export': 'csv', '_background': '1'})
+
+        assert response.status_code == 302
+        job = ExportJob.objects.get()
+        assert job.params == {'reimbursement': reimbursement.pk, 'format': 'csv'}
+        export_jobs.serve(0, once=True)
+        job.refresh_from_db()
+        assert job.file.name.endswith(f'reimbursement_{reimbursement.year}_{reimbursement.number}_expenses.csv')
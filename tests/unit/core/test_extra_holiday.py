@@ -1,6 +1,7 @@
 from datetime import date
 import pytest
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from testutils.factories import ExtraHolidayFactory
 
 
@@ -15,3 +16,78 @@ def test_create_extra_holiday_with_correct_period():
     start_dt = date(2020, 1, 1)
     end_dt = date(2020, 1, 2)
     ExtraHolidayFactory(period=(start_dt, end_dt))
+
+
+@pytest.mark.django_db
+def test_index_is_loaded_once(extra_holiday_index, django_assert_num_queries):
+    ExtraHolidayFactory(period=(date(2020, 1, 2), date(2020, 1, 4)), country_codes=['IT-RM'])
+    ExtraHolidayFactory(period=(date(2020, 1, 10), date(2020, 1, 11)), country_codes=['IT'])
+    with django_assert_num_queries(1):
+        assert extra_holiday_index.is_extra_holiday(date(2020, 1, 2), 'IT-RM')
+        assert extra_holiday_index.is_extra_holiday(date(2020, 1, 3), 'IT-RM')
+        assert not extra_holiday_index.is_extra_holiday(date(2020, 1, 4), 'IT-RM')
+        assert not extra_holiday_index.is_extra_holiday(date(2020, 1, 2), 'IT-MI')
+        assert not extra_holiday_index.is_extra_holiday(date(2020, 1, 10), 'IT-RM')
+        assert extra_holiday_index.is_extra_holiday(date(2020, 1, 10), 'IT-RM', include_country=True)
+        assert [eh.lower for eh in extra_holiday_index.between(date(2020, 1, 1), date(2020, 1, 31))] == [
+            date(2020, 1, 2),
+            date(2020, 1, 10),
+        ]
+        assert extra_holiday_index.between(date(2020, 1, 4), date(2020, 1, 9)) == []
+        assert len(extra_holiday_index.between(date(2020, 1, 1), date(2020, 1, 31), ['IT-RM'])) == 1
+        assert len(extra_holiday_index.between(date(2020, 1, 1), date(2020, 1, 31), ['IT-RM'], True)) == 2
+
+
+@pytest.mark.django_db
+def test_index_follows_committed_saves_and_deletes(
+    extra_holiday_index, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    assert not extra_holiday_index.is_extra_holiday(date(2020, 1, 2), 'IT-RM')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        extra_holiday = ExtraHolidayFactory(period=(date(2020, 1, 2), date(2020, 1, 3)), country_codes=['IT-RM'])
+    with django_assert_num_queries(0):
+        assert extra_holiday_index.is_extra_holiday(date(2020, 1, 2), 'IT-RM')
+
+    extra_holiday.country_codes = ['IT-MI']
+    with django_capture_on_commit_callbacks(execute=True):
+        extra_holiday.save()
+    with django_assert_num_queries(0):
+        assert not extra_holiday_index.is_extra_holiday(date(2020, 1, 2), 'IT-RM')
+        assert extra_holiday_index.is_extra_holiday(date(2020, 1, 2), 'IT-MI')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        extra_holiday.delete()
+    with django_assert_num_queries(0):
+        assert not extra_holiday_index.is_extra_holiday(date(2020, 1, 2), 'IT-MI')
+
+
+@pytest.mark.django_db
+def test_index_handles_nested_intervals(extra_holiday_index):
+    ExtraHolidayFactory(period=(date(2020, 1, 1), date(2020, 2, 1)), country_codes=['IT-RM'])
+    ExtraHolidayFactory(period=(date(2020, 1, 5), date(2020, 1, 6)), country_codes=['IT-RM'])
+    assert extra_holiday_index.is_extra_holiday(date(2020, 1, 20), 'IT-RM')
+    assert not extra_holiday_index.is_extra_holiday(date(2020, 2, 1), 'IT-RM')
+
+
+@pytest.mark.django_db
+def test_index_ignores_uncommitted_saves(extra_holiday_index, django_capture_on_commit_callbacks):
+    assert not extra_holiday_index.is_extra_holiday(date(2020, 1, 2), 'IT-RM')
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        ExtraHolidayFactory(period=(date(2020, 1, 2), date(2020, 1, 3)), country_codes=['IT-RM'])
+
+    assert not extra_holiday_index.is_extra_holiday(date(2020, 1, 2), 'IT-RM')
+    for callback in callbacks:
+        callback()
+    assert extra_holiday_index.is_extra_holiday(date(2020, 1, 2), 'IT-RM')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_index_loaded_in_a_rolled_back_transaction_is_reloaded(extra_holiday_index):
+    with transaction.atomic():
+        ExtraHolidayFactory(period=(date(2020, 1, 2), date(2020, 1, 3)), country_codes=['IT-RM'])
+        assert extra_holiday_index.is_extra_holiday(date(2020, 1, 2), 'IT-RM')
+        transaction.set_rollback(True)
+
+    assert not extra_holiday_index.is_extra_holiday(date(2020, 1, 2), 'IT-RM')
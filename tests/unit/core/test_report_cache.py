@@ -0,0 +1,156 @@
+from datetime import date
+from functools import partial
+from unittest.mock import Mock
+
+import pytest
+from django.core.cache import caches
+from testutils.factories import (
+    ContractFactory,
+    ExtraHolidayFactory,
+    ResourceFactory,
+    TaskFactory,
+    TimeEntryFactory,
+    TimesheetSubmissionFactory,
+)
+
+from krm3.core.models import TimeEntry
+
+JUNE = (date(2025, 6, 1), date(2025, 6, 30))
+
+
+@pytest.fixture
+def committed(django_capture_on_commit_callbacks):
+    """Run the invalidations registered in the block, as if its changes were committed."""
+    return partial(django_capture_on_commit_callbacks, execute=True)
+
+
+def _get(report_cache, resource_ids=None, **filters):
+    build = Mock(return_value='output')
+    assert report_cache.get_or_build('report', *JUNE, resource_ids, build, **filters) == 'output'
+    return build.call_count
+
+
+def _entry(resource, day):
+    return TimeEntryFactory(resource=resource, date=day, day_shift_hours=0, holiday_hours=8)
+
+
+def test_output_is_cached_until_its_month_changes(report_cache, committed):
+    resource = ResourceFactory()
+    assert _get(report_cache) == 1
+    assert _get(report_cache) == 0
+    assert _get(report_cache, project=1) == 1
+
+    with committed():
+        _entry(resource, date(2025, 7, 1))
+    assert _get(report_cache) == 0
+
+    with committed():
+        entry = _entry(resource, date(2025, 6, 5))
+    assert _get(report_cache) == 1
+
+    # moving an entry out of the month changes it too
+    TimeEntry.objects.filter(pk=entry.pk).update(date=date(2025, 5, 5))
+    assert _get(report_cache) == 0
+    entry = TimeEntry.objects.get(pk=entry.pk)
+    entry.date = date(2025, 6, 6)
+    with committed():
+        entry.save()
+    assert _get(report_cache) == 1
+
+    with committed():
+        entry.delete()
+    assert _get(report_cache) == 1
+
+    assert report_cache.stats()._asdict() == {'hits': 3, 'misses': 5, 'invalidations': 4}
+
+
+def test_outputs_of_another_format_version_are_not_loaded(report_cache, monkeypatch):
+    assert _get(report_cache) == 1
+    monkeypatch.setattr('krm3.core.report_cache.FORMAT_VERSION', 0)
+    assert _get(report_cache) == 1
+    assert _get(report_cache) == 0
+
+
+@pytest.mark.parametrize(('items', 'builds'), [(2, 1), (3, 2)])
+def test_only_streamed_outputs_within_the_limit_are_cached(report_cache, settings, items, builds):
+    settings.REPORT_CACHE_MAX_ITEMS = 2
+    build = Mock(side_effect=lambda: iter(range(items)))
+
+    for _ in range(2):
+        assert [*report_cache.iter_or_build('report', *JUNE, None, build)] == [*range(items)]
+
+    assert build.call_count == builds
+
+
+def test_fragments_are_kept_in_their_own_cache(report_cache, settings, committed):
+    settings.CACHES = settings.CACHES | {
+        'fragments': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'fragments'}
+    }
+    settings.REPORT_FRAGMENT_CACHE = 'fragments'
+    resource = ResourceFactory()
+    build = Mock(return_value='<tr></tr>')
+
+    for _ in range(2):
+        assert report_cache.get_or_build_fragment('block', *JUNE, resource.pk, build) == '<tr></tr>'
+    assert build.call_count == 1
+    assert len(caches['fragments']._cache) == 1
+
+    with committed():
+        _entry(resource, date(2025, 6, 5))
+    report_cache.get_or_build_fragment('block', *JUNE, resource.pk, build)
+    assert build.call_count == 2
+    caches['fragments'].clear()
+
+
+def test_resource_output_only_follows_its_resource(report_cache, committed):
+    resource, other = ResourceFactory(), ResourceFactory()
+    assert _get(report_cache, {resource.pk}) == 1
+
+    with committed():
+        _entry(other, date(2025, 6, 5))
+        TimesheetSubmissionFactory(resource=other, period=(date(2025, 6, 1), date(2025, 7, 1)))
+    assert _get(report_cache, {resource.pk}) == 0
+
+    with committed():
+        TimesheetSubmissionFactory(resource=resource, period=(date(2025, 6, 1), date(2025, 7, 1)))
+    assert _get(report_cache, {resource.pk}) == 1
+
+
+def test_extra_holidays_change_all_outputs(report_cache, committed):
+    resource = ResourceFactory()
+    assert _get(report_cache) == 1
+    assert _get(report_cache, {resource.pk}) == 1
+
+    with committed():
+        ExtraHolidayFactory(period=(date(2025, 5, 30), date(2025, 6, 3)))
+    assert _get(report_cache) == 1
+    assert _get(report_cache, {resource.pk}) == 1
+
+
+def test_contracts_and_tasks_change_any_month(report_cache, committed):
+    resource = ResourceFactory()
+    assert _get(report_cache, {resource.pk}) == 1
+
+    with committed():
+        ContractFactory(resource=resource, period=(date(2020, 1, 1), None))
+    assert _get(report_cache, {resource.pk}) == 1
+
+    with committed():
+        TaskFactory(resource=resource)
+    assert _get(report_cache, {resource.pk}) == 1
+    assert _get(report_cache, {resource.pk}) == 0
+
+
+def test_outputs_are_discarded_once_the_change_is_committed(report_cache, django_capture_on_commit_callbacks):
+    resource = ResourceFactory()
+    assert _get(report_cache) == 1
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        _entry(resource, date(2025, 6, 5))
+        # built from the data as it was, by a process not seeing the change yet
+        assert _get(report_cache) == 0
+    assert _get(report_cache) == 0
+
+    for callback in callbacks:
+        callback()
+    assert _get(report_cache) == 1
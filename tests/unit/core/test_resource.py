@@ -273,3 +273,33 @@ def test_resource_vcard_validation(vcard_text, should_be_valid, test_description
         with pytest.raises(ValidationError) as exc_info:
             resource.clean()
         assert 'vcard_text' in exc_info.value.message_dict
+
+
+@override_config(
+    DEFAULT_RESOURCE_SCHEDULE=json.dumps({'mon': 1, 'tue': 2, 'wed': 3, 'thu': 4, 'fri': 5, 'sat': 6, 'sun': 7})
+)
+def test_schedules_match_the_per_resource_schedule(django_assert_max_num_queries):
+    from krm3.core.models import Resource
+
+    with_contracts = ResourceFactory()
+    ContractFactory(resource=with_contracts, period=(date(2020, 10, 1), date(2020, 11, 11)), country_calendar_code='PL')
+    ContractFactory(
+        resource=with_contracts,
+        period=(date(2020, 11, 20), None),
+        working_schedule={'mon': 8, 'tue': 8, 'wed': 8, 'thu': 8, 'fri': 8, 'sat': 0, 'sun': 0},
+    )
+    without_contracts = ResourceFactory()
+    start_day, end_day = date(2020, 10, 25), date(2020, 12, 10)
+
+    expected = {
+        resource.pk: resource.get_schedule(start_day, end_day) for resource in (with_contracts, without_contracts)
+    }
+    # the contracts and the default schedule from constance
+    with django_assert_max_num_queries(2):
+        schedules = Resource.objects.schedules([with_contracts, without_contracts.pk], start_day, end_day)
+
+    assert schedules == expected
+    assert schedules[with_contracts.pk][date(2020, 11, 1)] == 0  # All Saints' Day, also a holiday in Poland
+    assert schedules[with_contracts.pk][date(2020, 11, 11)] == 3  # the PL contract has ended
+    assert schedules[with_contracts.pk][date(2020, 11, 23)] == 8
+    assert schedules[without_contracts.pk][date(2020, 12, 8)] == 0  # Immaculate Conception
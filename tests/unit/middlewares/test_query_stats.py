@@ -0,0 +1,143 @@
+import logging
+
+import pytest
+import sentry_sdk
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from testutils.factories import ResourceFactory, UserFactory
+
+from krm3.core.models import Resource
+from krm3.middlewares.query_stats import QueryStats, QueryStatsMiddleware
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def query_stats(settings):
+    settings.FLAGS = settings.FLAGS | {'QUERY_STATS_ENABLED': [('boolean', True)]}
+    settings.QUERY_STATS_SAMPLE_RATE = 1
+    settings.QUERY_STATS_MAX_QUERIES = 0
+    settings.QUERY_STATS_MAX_DB_TIME = 0
+    settings.QUERY_STATS_MAX_DUPLICATES = 0
+    settings.QUERY_STATS_MAX_WALL_TIME = 0
+    return settings
+
+
+def one_by_one(request):
+    for pk in request.resource_ids:
+        Resource.objects.get(pk=pk)
+    return HttpResponse('ok')
+
+
+@pytest.fixture
+def request_(rf):
+    request = rf.get('/be/report/')
+    request.user = UserFactory(is_staff=True)
+    request.resource_ids = [ResourceFactory().pk for _ in range(3)]
+    return request
+
+
+def test_adds_the_server_timing_header(query_stats, request_):
+    response = QueryStatsMiddleware(one_by_one)(request_)
+
+    db, app = response['Server-Timing'].split(', ')
+    assert db.startswith('db;dur=')
+    assert db.endswith(';desc="3 queries (3 repeated)"')
+    assert app.startswith('app;dur=')
+
+
+@pytest.mark.parametrize(
+    ('debug', 'header'), [pytest.param(False, False, id='production'), pytest.param(True, True, id='debug')]
+)
+def test_sends_the_server_timing_header_to_staff_only(query_stats, request_, caplog, debug, header):
+    query_stats.DEBUG = debug
+    query_stats.QUERY_STATS_MAX_DUPLICATES = 2
+    request_.user = UserFactory()
+
+    with caplog.at_level(logging.WARNING, logger='krm3.middlewares.query_stats'):
+        response = QueryStatsMiddleware(one_by_one)(request_)
+
+    assert ('Server-Timing' in response) is header
+    assert caplog.records
+
+
+@pytest.mark.parametrize(
+    ('flag', 'sample_rate'),
+    [pytest.param(False, 1, id='flag-off'), pytest.param(True, 0, id='not-sampled')],
+)
+def test_skips_the_requests_off_or_not_sampled(query_stats, request_, flag, sample_rate):
+    query_stats.FLAGS = query_stats.FLAGS | {'QUERY_STATS_ENABLED': [('boolean', flag)]}
+    query_stats.QUERY_STATS_SAMPLE_RATE = sample_rate
+
+    response = QueryStatsMiddleware(one_by_one)(request_)
+
+    assert 'Server-Timing' not in response
+
+
+def test_logs_the_requests_over_the_thresholds(query_stats, request_, caplog):
+    query_stats.QUERY_STATS_MAX_DUPLICATES = 2
+
+    with caplog.at_level(logging.WARNING, logger='krm3.middlewares.query_stats'):
+        QueryStatsMiddleware(one_by_one)(request_)
+
+    [record] = caplog.records
+    assert record.getMessage().startswith('GET /be/report/ over the query thresholds (duplicates): 3 queries in ')
+    assert record.query_stats['queries'] == 3
+    assert record.query_stats['duplicated_queries'] == 3
+    assert record.query_stats['exceeded'] == ['duplicates']
+    [top] = record.query_stats['top_duplicates']
+    assert top['count'] == 3
+    assert top['sql'].startswith('SELECT "core_resource"."id"')
+
+
+def test_does_not_log_the_requests_within_the_thresholds(query_stats, request_, caplog):
+    query_stats.QUERY_STATS_MAX_QUERIES = 3
+
+    with caplog.at_level(logging.WARNING, logger='krm3.middlewares.query_stats'):
+        QueryStatsMiddleware(one_by_one)(request_)
+
+    assert not caplog.records
+
+
+def test_records_the_queries_of_streaming_responses(query_stats, request_, caplog):
+    query_stats.QUERY_STATS_MAX_QUERIES = 2
+
+    def streaming(request):
+        def content():
+            for pk in request.resource_ids:
+                yield str(Resource.objects.get(pk=pk))
+
+        return StreamingHttpResponse(content())
+
+    with caplog.at_level(logging.WARNING, logger='krm3.middlewares.query_stats'):
+        response = QueryStatsMiddleware(streaming)(request_)
+        assert response['Server-Timing'].startswith('db;dur=0.0;desc="0 queries (0 repeated)"')
+        assert not caplog.records
+
+        b''.join(response.streaming_content)
+
+    [record] = caplog.records
+    assert record.query_stats['queries'] == 3
+
+
+def test_stops_recording_when_a_streaming_response_is_closed_unread(query_stats, request_):
+    def recording():
+        return [wrapper for wrapper in connection.execute_wrappers if isinstance(wrapper, QueryStats)]
+
+    response = QueryStatsMiddleware(lambda request: StreamingHttpResponse(iter([b'ok'])))(request_)
+    assert recording()
+
+    response.close()
+
+    assert not recording()
+
+
+def test_attaches_the_stats_to_the_sentry_transaction(query_stats, request_):
+    with sentry_sdk.Hub(sentry_sdk.Client(traces_sample_rate=1.0)):
+        with sentry_sdk.start_transaction(name='report') as transaction:
+            QueryStatsMiddleware(one_by_one)(request_)
+
+    assert transaction._data['krm3.queries'] == 3
+    assert transaction._data['krm3.duplicated_queries'] == 3
+    assert transaction._data['krm3.db_time'] >= 0
+    assert transaction._data['krm3.wall_time'] >= transaction._data['krm3.db_time']
@@ -21,7 +21,8 @@ from testutils.factories import (
     TimesheetSubmissionFactory,
 )
 
-from krm3.core.models.timesheets import TimeEntry
+from krm3.core.models import Task
+from krm3.core.models.timesheets import BankHoursCheckpoint, DayContext, TimeEntry
 from tests._extras.testutils.factories import ContractFactory
 
 
@@ -852,6 +853,51 @@ class TestTimeEntry:
         with does_not_raise():
             TimeEntryFactory(date=datetime.date(2020, 6, 15), resource=resource, task=task, day_shift_hours=8)
 
+    def test_validators_share_the_day_context(self, django_assert_num_queries):
+        resource = ResourceFactory()
+        ContractFactory(resource=resource, period=(datetime.date(2020, 1, 1), None))
+        task = TaskFactory(resource=resource)
+        date = datetime.date(2020, 5, 15)
+        task_entry = TimeEntryFactory(date=date, resource=resource, task=task, day_shift_hours=4)
+        entry = TimeEntry(date=date, resource=resource, day_shift_hours=0, leave_hours=2, bank_from=2)
+        entry.full_clean()  # warm up the process-wide caches
+
+        # submission, same day entries, contract, settings and bank balance,
+        # plus the foreign key check
+        with django_assert_num_queries(6):
+            entry.full_clean()
+
+        context = DayContext(resource, date)
+        assert context.entries == [task_entry]
+        assert context.submitted is False
+        assert context.scheduled_hours == 8
+        assert context.bank_hours_balance == 0
+        entry.day_context = context
+        # only the foreign key check
+        with django_assert_num_queries(1):
+            entry.full_clean()
+
+    def test_validates_the_hours_ranges_without_queries(self, django_assert_num_queries):
+        resource = ResourceFactory()
+        task = TaskFactory(resource=resource)
+        entry = TimeEntry(date=datetime.date(2020, 5, 15), resource=resource, task=task, day_shift_hours=17)
+
+        with django_assert_num_queries(0):
+            with pytest.raises(exceptions.ValidationError, match='day_shift_hours_range'):
+                entry.validate_constraints()
+            entry.validate_constraints(exclude=['day_shift_hours'])
+
+    def test_day_context_accepts_precomputed_data(self):
+        resource = ResourceFactory()
+        context = DayContext(resource, datetime.date(2020, 5, 15), submitted=True)
+        entry = TimeEntry(date=datetime.date(2020, 5, 15), resource=resource, day_shift_hours=0, leave_hours=2)
+        entry.day_context = context
+
+        with pytest.raises(exceptions.ValidationError, match='Cannot modify time entries for submitted timesheets'):
+            entry.full_clean()
+        with pytest.raises(TypeError, match='Unknown day context data: contracts'):
+            DayContext(resource, datetime.date(2020, 5, 15), contracts=[])
+
 
 @freezegun.freeze_time(datetime.date(2025, 12, 10))
 class TestTimesheetSubmission:
@@ -1003,3 +1049,235 @@ class TestTimesheetSubmission:
         )
         days = Krm3Day.from_submission(submission)
         assert all(day.data_special_leave_reason is None for day in days)
+
+    def test_from_submissions_does_not_query_per_day(self, django_assert_num_queries):
+        reason = SpecialLeaveReasonFactory()
+        submissions = []
+        for month in (1, 2):
+            resource = ResourceFactory()
+            ContractFactory(resource=resource, period=(datetime.date(2024, 1, 1), None))
+            task = TaskFactory(resource=resource)
+            for day in range(1, 6):
+                TimeEntryFactory(resource=resource, task=task, date=datetime.date(2024, month, day), day_shift_hours=8)
+            TimeEntryFactory(
+                resource=resource,
+                date=datetime.date(2024, month, 8),
+                day_shift_hours=0,
+                special_leave_hours=8,
+                special_leave_reason=reason,
+            )
+            submissions.append(
+                TimesheetSubmissionFactory(
+                    resource=resource, period=(datetime.date(2024, month, 1), datetime.date(2024, month + 1, 1))
+                )
+            )
+
+        # one query for the time entries and their reasons, one for the contracts
+        with django_assert_num_queries(2):
+            days = list(Krm3Day.from_submissions(submissions))
+
+        assert all(day.contract.resource_id == day.resource.pk for day in days)
+        leave_days = [day for day in days if day.data_special_leave_reason]
+        assert [day.date for day in leave_days] == [datetime.date(2024, 1, 8), datetime.date(2024, 2, 8)]
+        assert all(day.data_special_leave_reason == reason for day in leave_days)
+        assert sum(day.data_day_shift for day in days) == 80
+        assert sum(day.has_data for day in days) == 12
+
+
+class TestBankHoursLedger:
+    @staticmethod
+    def _deposit(resource, date, hours):
+        task = TaskFactory(resource=resource)
+        TimeEntryFactory(date=date, resource=resource, task=task, day_shift_hours=16)
+        return TimeEntryFactory(date=date, resource=resource, day_shift_hours=0, bank_to=hours)
+
+    def test_ledger_follows_time_entries(self):
+        resource = ResourceFactory()
+        deposit = self._deposit(resource, datetime.date(2025, 1, 2), 4)
+        withdrawal = TimeEntryFactory(
+            date=datetime.date(2025, 2, 5), resource=resource, task=None, day_shift_hours=0, leave_hours=3, bank_from=2
+        )
+        assert resource.get_bank_hours_balance() == Decimal(2)
+
+        withdrawal = TimeEntry.objects.get(pk=withdrawal.pk)
+        withdrawal.date = datetime.date(2025, 3, 5)
+        withdrawal.bank_from = 1
+        withdrawal.save()
+        assert resource.get_bank_hours_balance() == Decimal(3)
+        assert resource.get_bank_hours_balance(datetime.date(2025, 2, 28)) == Decimal(4)
+
+        deposit.delete()
+        assert resource.get_bank_hours_balance() == Decimal(-1)
+        assert not BankHoursCheckpoint.objects.mismatches()
+
+    def test_balance_as_of_date(self):
+        resource = ResourceFactory()
+        self._deposit(resource, datetime.date(2025, 1, 2), 4)
+        self._deposit(resource, datetime.date(2025, 2, 4), 2)
+        self._deposit(resource, datetime.date(2025, 2, 11), 1)
+
+        assert resource.get_bank_hours_balance(datetime.date(2024, 12, 31)) == Decimal(0)
+        assert resource.get_bank_hours_balance(datetime.date(2025, 2, 10)) == Decimal(6)
+        assert resource.get_bank_hours_balance(datetime.date(2025, 2, 11)) == Decimal(7)
+        assert resource.get_bank_hours_balance() == Decimal(7)
+
+    def test_rebuild_fixes_mismatches(self):
+        resource = ResourceFactory()
+        self._deposit(resource, datetime.date(2025, 1, 2), 4)
+        # bulk updates bypass the ledger
+        TimeEntry.objects.filter(resource=resource, bank_to=4).update(bank_to=Decimal(0), bank_from=Decimal(1))
+
+        assert BankHoursCheckpoint.objects.mismatches() == {
+            (resource.pk, datetime.date(2025, 1, 1)): ((Decimal(0), Decimal(1)), (Decimal(4), Decimal(0)))
+        }
+
+        assert BankHoursCheckpoint.objects.rebuild() == 1
+        assert not BankHoursCheckpoint.objects.mismatches()
+        assert resource.get_bank_hours_balance() == Decimal(-1)
+
+
+class TestBulkLog:
+    def test_validates_the_related_objects(self):
+        resource = ResourceFactory()
+        task = TaskFactory(resource=resource)
+        Task.objects.filter(pk=task.pk).delete()
+        dates = [datetime.date(2025, 1, day) for day in range(1, 11)]
+
+        with pytest.raises(exceptions.ValidationError) as exc_info:
+            TimeEntry.objects.bulk_log(resource, dates, {'day_shift_hours': 8}, task=task)
+
+        assert list(exc_info.value.message_dict) == ['task']
+        assert not TimeEntry.objects.exists()
+
+    def test_overwrites_like_the_receivers(self):
+        resource = ResourceFactory()
+        task = TaskFactory(resource=resource)
+        date = datetime.date(2025, 1, 2)
+        TimeEntryFactory(date=date, resource=resource, day_shift_hours=0, holiday_hours=8)
+        TimeEntry.objects.bulk_log(resource, [date], {'day_shift_hours': 8}, task=task)
+        bulk = list(TimeEntry.objects.filter(resource=resource).values_list('task', 'day_shift_hours'))
+
+        TimeEntry.objects.all().delete()
+        TimeEntryFactory(date=date, resource=resource, day_shift_hours=0, holiday_hours=8)
+        TimeEntryFactory(date=date, resource=resource, task=task, day_shift_hours=8)
+        saved = list(TimeEntry.objects.filter(resource=resource).values_list('task', 'day_shift_hours'))
+
+        assert bulk == saved == [(task.pk, Decimal(8))]
+
+
+class TestBulkClear:
+    def test_clears_bank_deposits_left_without_work(self):
+        resource = ResourceFactory()
+        task = TaskFactory(resource=resource)
+        other_task = TaskFactory(resource=resource)
+        for day in (2, 3):
+            TimeEntryFactory(date=datetime.date(2025, 1, day), resource=resource, task=task, day_shift_hours=8)
+            TimeEntryFactory(date=datetime.date(2025, 1, day), resource=resource, task=other_task, day_shift_hours=4)
+            TimeEntryFactory(date=datetime.date(2025, 1, day), resource=resource, day_shift_hours=0, bank_to=2)
+
+        # only removing the 8 hours leaves the day without enough work
+        cleared = TimeEntry.objects.filter(resource=resource, task=task, date=datetime.date(2025, 1, 2)) | (
+            TimeEntry.objects.filter(resource=resource, task=other_task, date=datetime.date(2025, 1, 3))
+        )
+        summary = cleared.bulk_clear()
+
+        assert summary == (2, 1, [(resource.pk, datetime.date(2025, 1, 2)), (resource.pk, datetime.date(2025, 1, 3))])
+        assert list(
+            TimeEntry.objects.filter(resource=resource, date=datetime.date(2025, 1, 2)).values_list('task', flat=True)
+        ) == [other_task.pk]
+        assert TimeEntry.objects.filter(resource=resource, date=datetime.date(2025, 1, 3)).count() == 2
+        assert resource.get_bank_hours_balance() == Decimal(2)
+        assert not BankHoursCheckpoint.objects.mismatches()
+
+    def test_runs_one_query_per_entry_without_bank_hours(self, django_assert_max_num_queries):
+        resource = ResourceFactory()
+        task = TaskFactory(resource=resource)
+        for day in range(1, 29):
+            TimeEntryFactory(date=datetime.date(2025, 2, day), resource=resource, task=task, day_shift_hours=4)
+
+        # the post_delete receivers only look for a bank deposit on the day of each entry
+        with django_assert_max_num_queries(6 + 28):
+            summary = TimeEntry.objects.filter(resource=resource).bulk_clear()
+        assert summary.entries == 28
+
+
+class TestDayTotals:
+    @pytest.fixture
+    def entries(self):
+        resource = ResourceFactory()
+        task = TaskFactory(resource=resource)
+        other_task = TaskFactory(resource=resource)
+        reason = SpecialLeaveReasonFactory()
+        TimeEntryFactory(date=datetime.date(2025, 1, 2), resource=resource, task=task, day_shift_hours=3)
+        TimeEntryFactory(
+            date=datetime.date(2025, 1, 2), resource=resource, task=other_task, day_shift_hours=2, travel_hours=1
+        )
+        TimeEntryFactory(
+            date=datetime.date(2025, 1, 2),
+            resource=resource,
+            day_shift_hours=0,
+            special_leave_hours=2,
+            special_leave_reason=reason,
+        )
+        TimeEntryFactory(
+            date=datetime.date(2025, 1, 3), resource=resource, day_shift_hours=0, sick_hours=8, protocol_number='42'
+        )
+        TimeEntryFactory(date=datetime.date(2025, 1, 6), resource=resource, task=task, day_shift_hours=8)
+        return resource, task, other_task, reason
+
+    def test_sums_up_each_day(self, entries, django_assert_num_queries):
+        resource, _task, _other_task, reason = entries
+
+        with django_assert_num_queries(2):
+            totals = TimeEntry.objects.filter(resource=resource).day_totals()
+
+        assert [(row.date, row.total_task_hours, row.special_hours) for row in totals] == [
+            (datetime.date(2025, 1, 2), Decimal(6), Decimal(2)),
+            (datetime.date(2025, 1, 3), Decimal(0), Decimal(8)),
+            (datetime.date(2025, 1, 6), Decimal(8), Decimal(0)),
+        ]
+        assert [(row.task_id, row.special_leave_reason, row.protocol_number) for row in totals] == [
+            (None, reason, None),
+            (None, None, '42'),
+            (None, None, None),
+        ]
+
+    def test_sums_up_each_task(self, entries):
+        resource, task, other_task, reason = entries
+
+        totals = TimeEntry.objects.filter(resource=resource, date=datetime.date(2025, 1, 2)).day_totals(by_task=True)
+
+        assert [(row.task_id, row.day_shift_hours, row.travel_hours, row.special_leave_reason) for row in totals] == [
+            (task.pk, Decimal(3), Decimal(0), None),
+            (other_task.pk, Decimal(2), Decimal(1), None),
+            (None, Decimal(0), Decimal(0), reason),
+        ]
+
+    def test_skips_details_query_without_details(self, entries, django_assert_num_queries):
+        resource, *_ = entries
+
+        with django_assert_num_queries(1):
+            totals = TimeEntry.objects.filter(resource=resource, date=datetime.date(2025, 1, 6)).day_totals()
+
+        assert totals == [
+            (resource.pk, datetime.date(2025, 1, 6), None, 8, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, None, None),
+        ]
+
+    def test_streams_the_same_totals(self, entries):
+        resource, *_ = entries
+        entries = TimeEntry.objects.filter(resource=resource)
+
+        totals = entries.iter_day_totals(by_task=True, chunk_size=1)
+
+        assert [*totals] == entries.day_totals(by_task=True)
+
+    def test_streams_the_totals_in_order(self, entries):
+        resource, *_ = entries
+
+        totals = TimeEntry.objects.filter(resource=resource).iter_day_totals(order_by=['-date'])
+
+        assert [(row.date, row.protocol_number) for row in totals] == [
+            (datetime.date(2025, 1, 6), None),
+            (datetime.date(2025, 1, 3), '42'),
+            (datetime.date(2025, 1, 2), None),
+        ]
@@ -0,0 +1,175 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from testutils.factories import (
+    ContractFactory,
+    ResourceFactory,
+    SuperUserFactory,
+    TaskFactory,
+    TimeEntryFactory,
+    TimesheetSubmissionFactory,
+)
+
+from krm3.timesheet.report import html
+from krm3.timesheet.report.availability import AvailabilityReportOnline
+from krm3.timesheet.report.online import ReportCell, ReportRow
+from krm3.timesheet.report.payslip import TimesheetReportOnline
+from krm3.timesheet.report.payslip_report import TimesheetReportExport
+from krm3.timesheet.report.task import TimesheetTaskReportOnline
+
+
+@pytest.mark.django_db
+def test_calendar_covers_every_day_with_the_right_contract():
+    resource = ResourceFactory()
+    first = ContractFactory(resource=resource, period=(datetime.date(2024, 1, 1), datetime.date(2024, 1, 16)))
+    second = ContractFactory(resource=resource, period=(datetime.date(2024, 1, 16), None))
+    task_1, task_2 = TaskFactory.create_batch(2, resource=resource)
+    TimeEntryFactory(resource=resource, task=task_1, date=datetime.date(2024, 1, 10), day_shift_hours=3)
+    TimeEntryFactory(resource=resource, task=task_2, date=datetime.date(2024, 1, 10), day_shift_hours=2)
+    TimeEntryFactory(resource=resource, task=task_1, date=datetime.date(2024, 1, 22), day_shift_hours=8)
+
+    report = TimesheetReportOnline(datetime.date(2024, 1, 1), datetime.date(2024, 1, 31), SuperUserFactory())
+
+    calendar = report.calendars[resource.pk]
+    assert [kd.date for kd in calendar] == [datetime.date(2024, 1, day) for day in range(1, 32)]
+    assert all(kd.contract == first for kd in calendar[:15])
+    assert all(kd.contract == second for kd in calendar[15:])
+    assert calendar[9].data_day_shift == Decimal(5)
+    assert calendar[21].data_day_shift == Decimal(8)
+    assert calendar[0].holiday is True
+
+
+@pytest.mark.django_db
+def test_calendar_mixes_submitted_and_open_days():
+    resource = ResourceFactory()
+    ContractFactory(resource=resource, period=(datetime.date(2024, 1, 1), None))
+    task = TaskFactory(resource=resource)
+    TimeEntryFactory(resource=resource, task=task, date=datetime.date(2024, 1, 9), day_shift_hours=8)
+    TimesheetSubmissionFactory(resource=resource, period=(datetime.date(2024, 1, 1), datetime.date(2024, 1, 15)))
+    TimeEntryFactory(resource=resource, task=task, date=datetime.date(2024, 1, 23), day_shift_hours=6)
+
+    report = TimesheetReportOnline(datetime.date(2024, 1, 1), datetime.date(2024, 1, 31), SuperUserFactory())
+
+    calendar = report.calendars[resource.pk]
+    assert len(calendar) == 31
+    assert all(kd.submitted for kd in calendar[:14])
+    assert not any(kd.submitted for kd in calendar[16:])
+    assert calendar[8].data_day_shift == Decimal(8)
+    assert calendar[22].data_day_shift == Decimal(6)
+
+
+def _blocks_data(blocks):
+    return [
+        (
+            block.resource,
+            [[(str(value), flags) for value, flags in zip(row.values, row.flags, strict=True)] for row in block.rows],
+        )
+        for block in blocks
+    ]
+
+
+@pytest.mark.django_db
+def test_streaming_reports_match_the_loaded_ones():
+    for last_name, hours in (('Rossi', 4), ('Bianchi', 6), ('Verdi', 8)):
+        contract = ContractFactory(
+            period=(datetime.date(2024, 1, 1), None), resource__last_name=last_name, resource__preferred_in_report=True
+        )
+        task = TaskFactory(resource=contract.resource)
+        TimeEntryFactory(resource=contract.resource, task=task, date=datetime.date(2024, 1, 9), day_shift_hours=hours)
+        TimeEntryFactory(resource=contract.resource, task=task, date=datetime.date(2024, 2, 5), night_shift_hours=2)
+    TimesheetSubmissionFactory(
+        resource=contract.resource, period=(datetime.date(2024, 1, 1), datetime.date(2024, 2, 1))
+    )
+    args = (datetime.date(2024, 1, 1), datetime.date(2024, 2, 29), SuperUserFactory())
+
+    for report_class in (TimesheetReportOnline, TimesheetTaskReportOnline, AvailabilityReportOnline):
+        streamed = report_class(*args, streaming=True)
+        assert not streamed.calendars
+        assert _blocks_data(streamed.report_html()) == _blocks_data(report_class(*args, streaming=False).report_html())
+
+    streamed = TimesheetReportExport(*args, streaming=True)
+    assert [resource.last_name for resource in streamed.resources] == ['Bianchi', 'Rossi', 'Verdi']
+    assert [*streamed._iter_rows(None)] == [*TimesheetReportExport(*args, streaming=False)._iter_rows(None)]
+
+
+@pytest.mark.django_db
+def test_long_reports_are_streamed(settings):
+    settings.REPORT_STREAMING_DAYS = 31
+    user = SuperUserFactory()
+
+    assert not TimesheetReportOnline(datetime.date(2024, 1, 1), datetime.date(2024, 1, 31), user).streaming
+    assert TimesheetReportOnline(datetime.date(2024, 1, 1), datetime.date(2024, 2, 1), user).streaming
+
+
+def test_report_row_cells_are_views_over_its_columns():
+    row = ReportRow()
+    row.add_cell('Label')
+    total = row.add_cell(None)
+    row.add_cell('-2', nwd=True)
+    row.add_cell(Decimal(3)).nwd = True
+
+    total.value = Decimal(-1)
+
+    assert row.values == ['Label', Decimal(-1), '-2', Decimal(3)]
+    assert [(cell.render(), cell.nwd, cell.negative) for cell in row.cells[1:]] == [
+        ('-1', False, True),
+        ('-2', True, True),
+        ('3', True, False),
+    ]
+    assert row.cells[-1].value == Decimal(3)
+    with pytest.raises(IndexError):
+        row.cells[4]
+
+
+def test_report_row_keeps_report_cell_objects():
+    row = ReportRow()
+    cell = row.add_cell(ReportCell(Decimal(0)))
+
+    cell.value += 2
+
+    assert row.cells[0] is cell
+    assert row.cells[0].render() == '2'
+
+
+@pytest.mark.django_db
+def test_report_blocks_are_rendered_to_html():
+    contract = ContractFactory(period=(datetime.date(2024, 1, 1), None), resource__last_name='<Rossi>')
+    task = TaskFactory(resource=contract.resource)
+    TimeEntryFactory(resource=contract.resource, task=task, date=datetime.date(2024, 1, 6), day_shift_hours=2)
+    report = TimesheetReportOnline(datetime.date(2024, 1, 1), datetime.date(2024, 1, 7), SuperUserFactory())
+    block = report.report_html()[0]
+    block.rows[1].cells[1].value = Decimal(-2)
+
+    rendered = html.render_block(block, 3)
+
+    assert '<strong>3 - &lt;Rossi&gt;</strong>' in rendered
+    assert rendered.count('<td>X</td>') == 3  # New Year's Day and the weekend
+    assert rendered.count('<td class=" pending">') == 3  # the holiday and the weekend
+    assert '<td class="cell-data "><span class="text-red-500">-2</span></td>' in rendered
+    assert '<td class="cell-data non-workday">2</td>' in rendered
+
+    del block.rows[1:]
+    assert 'No time entries available' in html.render_block(block, 3)
+
+
+@pytest.mark.django_db
+def test_rendered_report_blocks_are_cached_until_their_data_changes(
+    monkeypatch, report_cache, django_capture_on_commit_callbacks
+):
+    contract = ContractFactory(period=(datetime.date(2024, 1, 1), None))
+    task = TaskFactory(resource=contract.resource)
+    args = (datetime.date(2024, 1, 1), datetime.date(2024, 1, 31), SuperUserFactory())
+    rendered = []
+    monkeypatch.setattr(html, 'render_block', lambda block, counter: rendered.append(counter) or str(counter))
+
+    for counter in (1, 1, 2):
+        assert html.render_block_cached(TimesheetReportOnline(*args).report_html()[0], counter) == str(counter)
+    with django_capture_on_commit_callbacks(execute=True):
+        TimeEntryFactory(resource=contract.resource, task=task, date=datetime.date(2024, 2, 1), day_shift_hours=2)
+    html.render_block_cached(TimesheetReportOnline(*args).report_html()[0], 1)
+    with django_capture_on_commit_callbacks(execute=True):
+        TimeEntryFactory(resource=contract.resource, task=task, date=datetime.date(2024, 1, 9), day_shift_hours=2)
+    html.render_block_cached(TimesheetReportOnline(*args).report_html()[0], 1)
+
+    assert rendered == [1, 2, 1]
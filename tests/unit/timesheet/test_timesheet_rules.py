@@ -2,6 +2,7 @@ from collections.abc import Iterator
 from dataclasses import dataclass
 import datetime
 from decimal import Decimal
+import random
 
 from krm3.core.models import SpecialLeaveReason
 import pytest
@@ -199,3 +200,48 @@ def test_calculate_from_ods(due_hours, meal_threshold, time_entries, expected, d
     result = TimesheetRule.calculate(False, due_hours, meal_threshold, time_entries)
 
     assert result == expected
+
+
+def test_calculate_many_matches_calculate_on_ods_scenarios():
+    raw_scenarios = _get_raw_scenarios('tests/examples/ReportPresenze (scenari).ods')
+    days = [
+        (True, due_hours, meal_threshold, [time_entry])
+        for _name, due_hours, meal_threshold, time_entry, _expected in iterate_scenarios(raw_scenarios)
+    ]
+
+    assert TimesheetRule.calculate_many(days) == [TimesheetRule.calculate(*day) for day in days]
+
+
+def test_calculate_many_matches_calculate_on_random_days():
+    rng = random.Random(42)
+    special_leave_reason = SpecialLeaveReasonFactory.build(title='Wedding')
+
+    def hours(probability: float) -> Decimal | None:
+        return Decimal(rng.randrange(1, 33)) / 4 if rng.random() < probability else None
+
+    days = []
+    for _ in range(500):
+        time_entries = [
+            TimeEntryMock(
+                date=dt('2020-04-13'),
+                protocol_number=str(rng.randrange(1000)) if rng.random() < 0.1 else None,
+                bank_to=hours(0.1),
+                bank_from=hours(0.1),
+                day_shift_hours=hours(0.5),
+                night_shift_hours=hours(0.2),
+                on_call_hours=hours(0.1),
+                travel_hours=hours(0.2),
+                holiday_hours=hours(0.1),
+                leave_hours=hours(0.1),
+                rest_hours=hours(0.1),
+                sick_hours=hours(0.1),
+                special_leave_reason=special_leave_reason if rng.random() < 0.1 else None,
+                special_leave_hours=hours(0.1),
+            )
+            for _ in range(rng.randrange(4))
+        ]
+        due_hours = rng.choice([0, 4, 6, 7.5, 8])
+        meal_threshold = rng.choice([None, 0, 6, 6.5])
+        days.append((bool(due_hours), due_hours, meal_threshold, time_entries))
+
+    assert TimesheetRule.calculate_many(days) == [TimesheetRule.calculate(*day) for day in days]
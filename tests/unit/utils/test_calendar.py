@@ -3,9 +3,10 @@ import datetime
 
 from dateutil.relativedelta import relativedelta
 import freezegun
+import holidays
 import pytest
 
-from krm3.utils.dates import KrmDay, dt, KrmCalendar
+from krm3.utils.dates import HolidayCalendarRegistry, KrmDay, dt, KrmCalendar
 from testutils.date_utils import _dt
 
 
@@ -187,3 +188,49 @@ class TestKrmCalendar:
         cal = KrmCalendar()
         with expectation:
             assert cal.get_work_days(start, end) == [KrmDay(x) for x in result]
+
+
+class TestHolidayCalendarRegistry:
+    def test_builds_each_calendar_once(self):
+        registry = HolidayCalendarRegistry()
+        cal = registry.get('IT-RM')
+        assert registry.get('IT-RM') is cal
+        assert registry.get('IT-RM', weekend=None) is not cal
+        assert registry.get('GB-ENG') is not cal
+        info = registry.cache_info()
+        assert (info.hits, info.misses, info.currsize) == (1, 3, 3)
+
+    def test_evicts_least_recently_used(self):
+        registry = HolidayCalendarRegistry(maxsize=2)
+        it = registry.get('IT')
+        registry.get('GB')
+        registry.get('IT')
+        registry.get('FR')
+        assert registry.cache_info().currsize == 2
+        assert registry.get('IT') is it
+        assert registry.cache_info().misses == 3
+        registry.get('GB')
+        assert registry.cache_info().misses == 4
+
+    def test_unsupported_country(self):
+        with pytest.raises(NotImplementedError):
+            HolidayCalendarRegistry().get('XX-YY')
+
+    @pytest.mark.parametrize(
+        'code, weekend',
+        [
+            pytest.param('IT-RM', {6}, id='it-sunday-only'),
+            pytest.param('IT-RM', None, id='it-default-weekend'),
+            pytest.param('GB-NIR', {6}, id='gb-sunday-only'),
+        ],
+    )
+    def test_matches_holidays_library(self, code, weekend):
+        country, subdiv = code.split('-')
+        expected = holidays.country_holidays(country, subdiv)
+        if weekend is not None:
+            expected.weekend = weekend
+        cal = HolidayCalendarRegistry().get(code, weekend=weekend, years=[2024])
+
+        for day in KrmDay('2024-01-01').range_to(KrmDay('2025-12-31')):
+            assert cal.is_working_day(day.date) == expected.is_working_day(day.date)
+            assert (day.date in cal) == (day.date in expected)
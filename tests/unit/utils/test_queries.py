@@ -0,0 +1,65 @@
+import pytest
+from testutils.factories import ResourceFactory
+from testutils.query_budget import QueryBudgetExceededError, query_budget
+
+from krm3.core.models import Resource
+from krm3.utils.queries import duplicates, fingerprint
+
+
+@pytest.mark.parametrize(
+    'sql',
+    [
+        pytest.param('SELECT "id" FROM "core_timeentry" WHERE "date" = %s AND "resource_id" = %s', id='placeholders'),
+        pytest.param(
+            'SELECT "id" FROM "core_timeentry" WHERE "date" = \'2025-05-01\' AND "resource_id" = 12', id='literals'
+        ),
+        pytest.param('SELECT "id"\n  FROM "core_timeentry"\n WHERE "date" = %s AND "resource_id" = 3', id='mixed'),
+    ],
+)
+def test_fingerprint_replaces_values(sql):
+    assert fingerprint(sql) == 'SELECT "id" FROM "core_timeentry" WHERE "date" = ? AND "resource_id" = ?'
+
+
+def test_fingerprint_collapses_lists():
+    assert fingerprint('SELECT "id" FROM "core_task" WHERE "id" IN (%s, %s, %s)') == fingerprint(
+        'SELECT "id" FROM "core_task" WHERE "id" IN (1)'
+    )
+
+
+def test_fingerprint_keeps_names_with_digits():
+    assert fingerprint('SELECT U0."id" FROM "core_task" U0 LIMIT 21') == 'SELECT U0."id" FROM "core_task" U0 LIMIT ?'
+
+
+def test_duplicates_counts_the_repeated_queries_only():
+    queries = [
+        'SELECT "id" FROM "core_project" WHERE "id" = 1',
+        'SELECT "id" FROM "core_resource"',
+        'SELECT "id" FROM "core_project" WHERE "id" = 2',
+        'SELECT "id" FROM "core_project" WHERE "id" = 3',
+    ]
+    assert duplicates(queries) == {'SELECT "id" FROM "core_project" WHERE "id" = ?': 3}
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    def test_passes_within_budget(self):
+        with query_budget('resources', 1) as queries:
+            list(Resource.objects.all())
+        assert len(queries) == 1
+
+    def test_reports_the_repeated_queries_and_where_they_come_from(self):
+        ids = [ResourceFactory().pk for _ in range(3)]
+
+        @query_budget('resources', 2)
+        def fetch_one_by_one():
+            for pk in ids:
+                Resource.objects.get(pk=pk)
+
+        with pytest.raises(QueryBudgetExceededError) as exc_info:
+            fetch_one_by_one()
+
+        message = str(exc_info.value)
+        assert message.startswith('resources: 3 queries, over the budget of 2\nqueries run more than once:')
+        assert '3 x SELECT "core_resource"."id"' in message
+        assert 'test_queries.py' in message
+        assert 'Resource.objects.get(pk=pk)' in message
@@ -0,0 +1,54 @@
+import pytest
+from django.urls import reverse
+from testutils.datasets import build_dataset
+from testutils.factories import DocumentFactory, DocumentGrantFactory
+from testutils.query_budget import query_budget
+
+pytestmark = pytest.mark.django_db
+
+# NOTE: the same budget holds for every dataset shape, the queries must not
+#       grow with the resources and the days in the report
+SHAPES = [pytest.param(1, id='1-resource'), pytest.param(5, id='5-resources')]
+
+
+@pytest.fixture(autouse=True)
+def no_report_cache(settings):
+    """Keep the queries of the report cache, a database one, out of the budgets of building the reports."""
+    settings.CACHES = settings.CACHES | {'dummy': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    settings.REPORT_CACHE = 'dummy'
+    settings.REPORT_FRAGMENT_CACHE = 'dummy'
+
+
+def _get(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    # progressive pages query while streaming
+    return b''.join(response.streaming_content) if response.streaming else response.content
+
+
+@pytest.mark.parametrize('size', SHAPES)
+@pytest.mark.parametrize(
+    ('name', 'url_name', 'budget'),
+    [
+        pytest.param('/be/report', 'report-month', 13, id='report'),
+        pytest.param('/be/task_report', 'task-report-month', 20, id='task_report'),
+        pytest.param('/be/availability', 'availability-report-month', 12, id='availability'),
+    ],
+)
+def test_report_query_budget(client, size, name, url_name, budget):
+    dataset = build_dataset(size)
+    client.force_login(dataset.admin)
+    url = reverse(url_name, args=[f'{dataset.month:%Y%m}'])
+
+    with query_budget(name, budget):
+        _get(client, url)
+
+
+@pytest.mark.parametrize('size', [pytest.param(1, id='1-document'), pytest.param(20, id='20-documents')])
+def test_document_list_query_budget(client, regular_user, size):
+    for _ in range(size):
+        DocumentGrantFactory(user=regular_user, document=DocumentFactory(admin=regular_user))
+    client.force_login(regular_user)
+
+    with query_budget('/be/documents', 7):
+        _get(client, reverse('document_list'))
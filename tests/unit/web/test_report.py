@@ -1,5 +1,7 @@
 import datetime
 import io
+import pickle
+import re
 
 import openpyxl
 import pytest
@@ -11,8 +13,12 @@ from testutils.factories import (
     SuperUserFactory,
     TaskFactory,
     TimeEntryFactory,
+    TimesheetSubmissionFactory,
 )
 
+from krm3.core.models import ReportArtifact
+from krm3.core.report_cache import FORMAT_VERSION
+from krm3.timesheet.report.availability import AvailabilityReportOnline
 from krm3.timesheet.report.payslip_report import report_timeentry_key_mapping
 from tests.unit.web.test_views import _assert_homepage_content
 
@@ -108,8 +114,10 @@ def test_report_creation(admin_client):  # noqa: PLR0915
     response = admin_client.get(url)
     assert response.status_code == 200
     assert response['Content-Type'] == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    assert response['Content-Disposition'] == 'attachment; filename="report_june-2025.xlsx"'
+    assert response.streaming
 
-    workbook = openpyxl.load_workbook(filename=io.BytesIO(response.content))
+    workbook = openpyxl.load_workbook(filename=io.BytesIO(response.getvalue()))
     r1_name = f'{r1.last_name.upper()} {r1.first_name}'
     r2_name = f'{r2.last_name.upper()} {r2.first_name}'
     assert len(workbook.sheetnames) == 1
@@ -156,3 +164,155 @@ def test_report_creation(admin_client):  # noqa: PLR0915
     assert sheet[f'K{sick_hours_data_row + 1}'].value == 8
     assert sheet[f'B{sick_hours_data_row}'].value == 16
     assert sheet[f'O{nigh_shift_hours_data_row}'].value == 7
+
+
+class TestReportArtifacts:
+    @pytest.fixture(autouse=True)
+    def no_report_cache(self, settings):
+        settings.CACHES = settings.CACHES | {'dummy': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        settings.REPORT_CACHE = 'dummy'
+        settings.REPORT_FRAGMENT_CACHE = 'dummy'
+
+    @pytest.fixture
+    def closed_month(self):
+        resource = ContractFactory().resource
+        TimeEntryFactory(
+            date=datetime.date(2025, 6, 5), day_shift_hours=8, task=TaskFactory(resource=resource), resource=resource
+        )
+        return TimesheetSubmissionFactory(
+            resource=resource, period=(datetime.date(2025, 6, 1), datetime.date(2025, 7, 1)), closed=True
+        )
+
+    @pytest.mark.parametrize(
+        'url_name, kind',
+        [
+            pytest.param('report-month', ReportArtifact.Kind.REPORT, id='report'),
+            pytest.param('task-report-month', ReportArtifact.Kind.TASK_REPORT, id='task_report'),
+        ],
+    )
+    def test_online_report_of_closed_month_is_stored(self, admin_client, closed_month, url_name, kind):
+        url = reverse(url_name, args=['202506'])
+        rendered_resource = f'{closed_month.resource.last_name}</strong>'
+        assert rendered_resource in admin_client.get(url).content.decode()
+
+        artifact = ReportArtifact.objects.get()
+        assert (artifact.kind, artifact.month) == (kind, datetime.date(2025, 6, 1))
+        assert pickle.loads(artifact.content)[0].resource == closed_month.resource
+
+        ReportArtifact.objects.update(content=pickle.dumps([]))
+        assert rendered_resource not in admin_client.get(url).content.decode()
+
+    def test_export_is_served_from_artifact(self, admin_client, closed_month):
+        url = reverse('export_report', args=['202506'])
+        admin_client.get(url)
+        ReportArtifact.objects.update(content=b'stored')
+
+        assert admin_client.get(url).getvalue() == b'stored'
+
+    def test_open_month_is_not_stored(self, admin_client, closed_month):
+        ContractFactory()  # a resource that did not close its timesheet
+
+        assert admin_client.get(reverse('report-month', args=['202506'])).status_code == 200
+        assert not ReportArtifact.objects.exists()
+
+    def test_artifacts_are_discarded_on_reopen(self, admin_client, closed_month):
+        admin_client.get(reverse('export_report', args=['202506']))
+        admin_client.get(reverse('export_report', args=['202507']))
+        assert ReportArtifact.objects.count() == 1
+
+        closed_month.closed = False
+        closed_month.save()
+        assert not ReportArtifact.objects.exists()
+
+    def test_artifacts_are_discarded_on_delete(self, admin_client, closed_month):
+        admin_client.get(reverse('export_report', args=['202506']))
+
+        closed_month.delete()
+        assert not ReportArtifact.objects.exists()
+
+    def test_artifacts_are_discarded_on_contract_change(self, admin_client, closed_month):
+        admin_client.get(reverse('export_report', args=['202506']))
+        contract = closed_month.resource.contract_set.get()
+
+        contract.save()
+        assert not ReportArtifact.objects.exists()
+
+    def test_long_filters_fit_the_scope(self, admin_client, closed_month):
+        response = admin_client.get(reverse('task-report-month', args=['202506']), {'task': 'x' * 300})
+
+        assert response.status_code == 200
+        assert ReportArtifact.objects.get().scope.startswith(f'v{FORMAT_VERSION}:')
+
+
+@pytest.mark.parametrize(
+    'url_name', ['report-month', 'task-report-month', 'availability-report-month', 'export_report']
+)
+def test_report_views_are_cached(admin_client, report_cache, django_capture_on_commit_callbacks, url_name):
+    resource = ContractFactory().resource
+    url = reverse(url_name, args=['202506'])
+    first = admin_client.get(url)
+    admin_client.get(url)
+    assert report_cache.stats()[:2] == (1, 1)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        TimeEntryFactory(resource=resource, date=datetime.date(2025, 6, 5), day_shift_hours=0, holiday_hours=8)
+    assert admin_client.get(url).status_code == first.status_code == 200
+    assert report_cache.stats()[:2] == (1, 2)
+
+
+def _normalized(html):
+    return ' '.join(re.sub(r'name="csrfmiddlewaretoken" value="[^"]*"', '', html).split())
+
+
+@pytest.mark.parametrize(
+    ('url_name', 'lookups'),
+    [
+        ('report-month', 1),
+        ('task-report-month', 1),
+        # the header of the table and its rows
+        ('availability-report-month', 2),
+    ],
+)
+def test_progressive_report_views_match_the_rendered_ones(admin_client, report_cache, settings, url_name, lookups):
+    for last_name in ('Rossi', 'Bianchi'):
+        resource = ContractFactory(period=(datetime.date(2025, 1, 1), None), resource__last_name=last_name).resource
+        TimeEntryFactory(resource=resource, date=datetime.date(2025, 6, 5), day_shift_hours=0, holiday_hours=8)
+    url = reverse(url_name, args=['202506'])
+
+    settings.REPORT_PROGRESSIVE_RENDERING = True
+    built = admin_client.get(url)
+    assert built.streaming
+    built = b''.join(built.streaming_content).decode()
+    cached = b''.join(admin_client.get(url).streaming_content).decode()
+    assert report_cache.stats()[:2] == (lookups, lookups)
+
+    settings.REPORT_PROGRESSIVE_RENDERING = False
+    rendered = admin_client.get(url).content.decode()
+    assert built.index('Bianchi') < built.index('Rossi')
+    assert _normalized(built) == _normalized(cached) == _normalized(rendered)
+
+
+def test_cached_progressive_availability_report_is_not_built(admin_client, report_cache, settings, monkeypatch):
+    settings.REPORT_PROGRESSIVE_RENDERING = True
+    resource = ContractFactory(period=(datetime.date(2025, 1, 1), None)).resource
+    url = reverse('availability-report-month', args=['202506'])
+    b''.join(admin_client.get(url).streaming_content)
+
+    def build(*args, **kwargs):
+        raise AssertionError('The report was built')
+
+    monkeypatch.setattr(AvailabilityReportOnline, '__init__', build)
+    assert resource.last_name in b''.join(admin_client.get(url).streaming_content).decode()
+
+
+def test_progressive_report_of_closed_month_is_stored(admin_client, settings):
+    settings.REPORT_PROGRESSIVE_RENDERING = True
+    resource = ContractFactory().resource
+    TimesheetSubmissionFactory(
+        resource=resource, period=(datetime.date(2025, 6, 1), datetime.date(2025, 7, 1)), closed=True
+    )
+
+    response = admin_client.get(reverse('report-month', args=['202506']))
+
+    assert f'{resource.last_name}</strong>' in b''.join(response.streaming_content).decode()
+    assert pickle.loads(ReportArtifact.objects.get(kind=ReportArtifact.Kind.REPORT).content)[0].resource == resource
@@ -1,10 +1,13 @@
 import datetime
+from decimal import Decimal
+from types import SimpleNamespace
 
 import pytest
 from django.urls import reverse
 from freezegun import freeze_time
 
-from krm3.timesheet.report.task import TimesheetTaskReportOnline
+from krm3.timesheet.report.task import TaskHours, TimesheetTaskReportOnline
+from krm3.timesheet.rules import Krm3Day
 from tests._extras.testutils.factories import ContractFactory, SuperUserFactory, TaskFactory, TimeEntryFactory
 from tests.unit.web.test_views import _assert_homepage_content
 
@@ -152,6 +155,19 @@ class TestTimesheetTaskReport:
         total_hours_cell = tot_row.cells[2].render()
         assert total_hours_cell == '30'
 
+    @pytest.mark.parametrize(
+        ('label', 'expected_days', 'expected_hours'), [('Night shift', '0.875', '7'), ('Travel', '0.625', '5')]
+    )
+    def test_timeentry_type_rows(self, label, expected_days, expected_hours):
+        """Test that night shift and travel rows sum the hours of all tasks."""
+        report = TimesheetTaskReportOnline(self.start_date, self.end_date, self.user)
+        blocks = report.report_html()
+
+        resource1_block = next(b for b in blocks if b.resource and b.resource.pk == self.r1.id)
+        row = next(row for row in resource1_block.rows if row.cells[0].render() == label)
+
+        assert [cell.render() for cell in row.cells[1:3]] == [expected_days, expected_hours]
+
     def test_absence_row(self):
         """Test that absence row exists and shows correct markers."""
         report = TimesheetTaskReportOnline(self.start_date, self.end_date, self.user)
@@ -279,3 +295,34 @@ def test_task_report_view_next_previous_month(client, month, expected_result):
     _assert_homepage_content(response)
     assert response.status_code == 200
     assert expected_result in response.content.decode()
+
+
+def test_task_hours_sum_the_entries_of_the_tasks_and_days():
+    tasks = [SimpleNamespace(id=1), SimpleNamespace(id=2)]
+    days = [Krm3Day(datetime.date(2025, 6, day)) for day in (2, 3)]
+    task_hours = TaskHours(tasks, days)
+
+    def entry(task_id, day, worked, night_shift=0, travel=0):
+        return SimpleNamespace(
+            task_id=task_id,
+            date=datetime.date(2025, 6, day),
+            total_task_hours=Decimal(worked),
+            night_shift_hours=Decimal(night_shift),
+            travel_hours=Decimal(travel),
+        )
+
+    task_hours.add(
+        [
+            entry(1, 2, '6.5', night_shift='1.25'),
+            entry(1, 2, '1.5', travel='0.5'),
+            entry(2, 3, '4'),
+            entry(3, 3, '8'),  # another task
+            entry(1, 4, '8'),  # another day
+        ]
+    )
+
+    assert task_hours.per_task(task_hours.worked) == [[Decimal(8), Decimal(0)], [Decimal(0), Decimal(4)]]
+    assert task_hours.per_day(task_hours.worked) == [Decimal(8), Decimal(4)]
+    assert task_hours.per_day(task_hours.night_shift) == [Decimal('1.25'), Decimal(0)]
+    assert task_hours.per_day(task_hours.travel) == [Decimal('0.5'), Decimal(0)]
+    assert TaskHours([], days).per_day(TaskHours([], days).worked) == [Decimal(0), Decimal(0)]